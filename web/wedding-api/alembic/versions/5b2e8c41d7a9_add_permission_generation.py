@@ -0,0 +1,33 @@
+"""add permission_generation table
+
+Revision ID: 5b2e8c41d7a9
+Revises: 0a7e6e8fc12a
+Create Date: 2026-10-18 10:12:41.503127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c41d7a9'
+down_revision: Union[str, Sequence[str], None] = '0a7e6e8fc12a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('permission_generation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False, comment='当前权限矩阵版本号'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO permission_generation (id, generation) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('permission_generation')
@@ -0,0 +1,47 @@
+"""add lead_imports (bulk CSV/XLSX import jobs)
+
+Revision ID: a3f61d2c8b47
+Revises: e7a2b5c90f14
+Create Date: 2026-10-18 17:12:40.508193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f61d2c8b47'
+down_revision: Union[str, Sequence[str], None] = 'e7a2b5c90f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lead_imports',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='导入任务ID'),
+    sa.Column('filename', sa.String(), nullable=False, comment='原始文件名'),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='leadimportstatus'), nullable=False, comment='任务状态'),
+    sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=True, comment='导入线索的负责人ID'),
+    sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=False, comment='发起人'),
+    sa.Column('processed_rows', sa.Integer(), nullable=False, comment='已处理行数'),
+    sa.Column('inserted', sa.Integer(), nullable=False, comment='成功导入数'),
+    sa.Column('duplicates', sa.Integer(), nullable=False, comment='重复手机号行数 (文件内或已存在)'),
+    sa.Column('failed', sa.Integer(), nullable=False, comment='校验失败行数'),
+    sa.Column('errors', sa.JSON(), nullable=True, comment='逐行报告 [{row, phone, error}] (最多 LEAD_IMPORT_MAX_ERRORS 条)'),
+    sa.Column('error', sa.Text(), nullable=True, comment='任务级错误 (status=FAILED 时)'),
+    sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+    sa.Column('finished_at', sa.DateTime(), nullable=True, comment='完成时间'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lead_imports')
+    sa.Enum(name='leadimportstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,32 @@
+"""add users.auth_version for per-user token claim freshness
+
+Revision ID: a8d2f5c1e734
+Revises: f1d6b8e2c593
+Create Date: 2026-10-19 14:20:37.118562
+
+Tokens issued with TOKEN_PERMISSION_CLAIMS carry the user's auth_version; a role
+or active-status change bumps only that user's value, so other users' tokens
+stay usable. Added with a constant default (no table rewrite on PostgreSQL 11+).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2f5c1e734'
+down_revision: Union[str, Sequence[str], None] = 'f1d6b8e2c593'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('auth_version', sa.Integer(), server_default='0', nullable=False,
+                                     comment='认证信息版本号 (角色/启用状态)'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'auth_version')
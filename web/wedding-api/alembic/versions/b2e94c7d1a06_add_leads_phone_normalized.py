@@ -0,0 +1,72 @@
+"""add leads.phone_normalized with a unique index
+
+Revision ID: b2e94c7d1a06
+Revises: d85c2f4a9e13
+Create Date: 2026-10-18 20:14:37.502118
+
+Duplicate detection on create/import compares normalized phones
+(app.core.phone.normalize_phone). Existing rows are backfilled with the SQL
+version of the same rules on PostgreSQL (in Python elsewhere). When several
+existing leads normalize to the same phone only the first (by id) keeps the
+value; the others stay NULL and can be found with
+`WHERE phone_normalized IS NULL` for manual merging. The unique index is
+built CONCURRENTLY so the leads table stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.phone import normalize_phone, POSTGRES_BACKFILL_SQL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e94c7d1a06'
+down_revision: Union[str, Sequence[str], None] = 'd85c2f4a9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _backfill_in_python(batch_size: int = 5000) -> None:
+    bind = op.get_bind()
+    leads = bind.execute(sa.text("SELECT id, phone FROM leads ORDER BY id")).fetchall()
+    seen = set()
+    values = []
+    for lead_id, phone in leads:
+        normalized = normalize_phone(phone)
+        if normalized is None or normalized in seen:
+            continue
+        seen.add(normalized)
+        values.append({"lead_id": lead_id, "normalized": normalized})
+    update = sa.text("UPDATE leads SET phone_normalized = :normalized WHERE id = :lead_id")
+    for i in range(0, len(values), batch_size):
+        bind.execute(update, values[i:i + batch_size])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leads', sa.Column('phone_normalized', sa.String(), nullable=True,
+                                     comment='规范化手机号 (纯数字，由 ORM 事件维护，用于撞单检测)'))
+    if _is_postgresql():
+        op.execute(POSTGRES_BACKFILL_SQL)
+        with op.get_context().autocommit_block():
+            op.create_index('ix_leads_phone_normalized', 'leads', ['phone_normalized'], unique=True,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        _backfill_in_python()
+        op.create_index('ix_leads_phone_normalized', 'leads', ['phone_normalized'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_leads_phone_normalized', table_name='leads',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index('ix_leads_phone_normalized', table_name='leads')
+    op.drop_column('leads', 'phone_normalized')
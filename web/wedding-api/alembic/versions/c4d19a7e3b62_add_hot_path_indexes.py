@@ -0,0 +1,75 @@
+"""add indexes for hot filter/sort paths
+
+Revision ID: c4d19a7e3b62
+Revises: 5b2e8c41d7a9
+Create Date: 2026-10-18 14:05:22.817340
+
+Matched to the queries in app/crud/*:
+- leads: owner_id (+ status) for planner lists/counts, status for admin filters
+- budget_items.project_id, proposals.project_id: per-project lists
+- proposal_versions (proposal_id, created_at): version history ORDER BY created_at DESC
+- approvals (status, requester_id) and requester_id: manager / requester lists
+- role_permissions (role, permission_id): permission matrix join; replaces ix_role_permissions_role
+projects.lead_id needs nothing: its UNIQUE constraint is already backed by an index.
+
+On PostgreSQL the indexes are built CONCURRENTLY (outside the migration
+transaction) so large tables stay writable. If a concurrent build is interrupted,
+drop the INVALID index and re-run the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d19a7e3b62'
+down_revision: Union[str, Sequence[str], None] = '5b2e8c41d7a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_leads_owner_id_status', 'leads', ['owner_id', 'status']),
+    ('ix_leads_status', 'leads', ['status']),
+    ('ix_budget_items_project_id', 'budget_items', ['project_id']),
+    ('ix_proposals_project_id', 'proposals', ['project_id']),
+    ('ix_proposal_versions_proposal_id_created_at', 'proposal_versions', ['proposal_id', 'created_at']),
+    ('ix_approvals_status_requester_id', 'approvals', ['status', 'requester_id']),
+    ('ix_approvals_requester_id', 'approvals', ['requester_id']),
+    ('ix_role_permissions_role_permission_id', 'role_permissions', ['role', 'permission_id']),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _is_postgresql():
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('ix_role_permissions_role', table_name='role_permissions',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+        op.drop_index('ix_role_permissions_role', table_name='role_permissions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index('ix_role_permissions_role', 'role_permissions', ['role'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index('ix_role_permissions_role', 'role_permissions', ['role'], unique=False)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
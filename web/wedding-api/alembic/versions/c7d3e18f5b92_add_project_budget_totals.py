@@ -0,0 +1,48 @@
+"""add denormalized budget totals to projects
+
+Revision ID: c7d3e18f5b92
+Revises: b2e94c7d1a06
+Create Date: 2026-10-18 21:05:12.884310
+
+Project.budget_item_count / budget_sale_total / budget_cost_total /
+budget_gross_profit, kept up to date by app.crud.budget. Columns are added with
+a constant default (no table rewrite on PostgreSQL 11+), then projects that have
+items are filled from budget_items.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3e18f5b92'
+down_revision: Union[str, Sequence[str], None] = 'b2e94c7d1a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_SQL = """
+UPDATE projects SET
+    budget_item_count = (SELECT count(*) FROM budget_items b WHERE b.project_id = projects.id),
+    budget_sale_total = (SELECT coalesce(sum(b.unit_price * b.quantity), 0) FROM budget_items b WHERE b.project_id = projects.id),
+    budget_cost_total = (SELECT coalesce(sum(b.cost_price * b.quantity), 0) FROM budget_items b WHERE b.project_id = projects.id)
+WHERE EXISTS (SELECT 1 FROM budget_items b WHERE b.project_id = projects.id)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('budget_item_count', sa.Integer(), server_default='0', nullable=False, comment='报价单明细项数'))
+    op.add_column('projects', sa.Column('budget_sale_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False, comment='报价单销售总额 (元)'))
+    op.add_column('projects', sa.Column('budget_cost_total', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False, comment='报价单成本总额 (元) - 仅Admin/Manager可见'))
+    op.add_column('projects', sa.Column('budget_gross_profit', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False, comment='报价单毛利 (元) - 仅Admin/Manager可见'))
+    op.execute(BACKFILL_SQL)
+    op.execute("UPDATE projects SET budget_gross_profit = budget_sale_total - budget_cost_total WHERE budget_item_count > 0")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'budget_gross_profit')
+    op.drop_column('projects', 'budget_cost_total')
+    op.drop_column('projects', 'budget_sale_total')
+    op.drop_column('projects', 'budget_item_count')
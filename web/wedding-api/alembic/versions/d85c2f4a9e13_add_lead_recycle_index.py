@@ -0,0 +1,44 @@
+"""add leads (status, last_contact_at) index for the public-pool recycler
+
+Revision ID: d85c2f4a9e13
+Revises: a3f61d2c8b47
+Create Date: 2026-10-18 18:02:51.339024
+
+Serves app.crud.lead.recycle_stale_leads: status IN (...) AND last_contact_at < cutoff.
+Built CONCURRENTLY on PostgreSQL so the leads table stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd85c2f4a9e13'
+down_revision: Union[str, Sequence[str], None] = 'a3f61d2c8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index('ix_leads_status_last_contact_at', 'leads', ['status', 'last_contact_at'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_leads_status_last_contact_at', 'leads', ['status', 'last_contact_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_leads_status_last_contact_at', table_name='leads',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index('ix_leads_status_last_contact_at', table_name='leads')
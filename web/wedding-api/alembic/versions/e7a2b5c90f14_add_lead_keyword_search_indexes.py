@@ -0,0 +1,77 @@
+"""add lead keyword search: pg_trgm indexes and bigram side table
+
+Revision ID: e7a2b5c90f14
+Revises: c4d19a7e3b62
+Create Date: 2026-10-18 15:31:08.264913
+
+- lead_search_grams: lower-cased character bigrams of customer_name/phone -> lead_id,
+  maintained by ORM events on Lead (app.models.lead); backfilled here
+- PostgreSQL: pg_trgm extension + GIN trigram indexes on leads.customer_name/phone,
+  built CONCURRENTLY
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.search import lead_grams, POSTGRES_BACKFILL_SQL
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2b5c90f14'
+down_revision: Union[str, Sequence[str], None] = 'c4d19a7e3b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _backfill_in_python(batch_size: int = 5000) -> None:
+    bind = op.get_bind()
+    grams_table = sa.table('lead_search_grams', sa.column('gram'), sa.column('lead_id'))
+    leads = bind.execute(sa.text("SELECT id, customer_name, phone FROM leads")).fetchall()
+    rows = []
+    for lead_id, customer_name, phone in leads:
+        rows.extend({'gram': g, 'lead_id': lead_id} for g in lead_grams((customer_name, phone)))
+        if len(rows) >= batch_size:
+            op.bulk_insert(grams_table, rows)
+            rows = []
+    if rows:
+        op.bulk_insert(grams_table, rows)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lead_search_grams',
+    sa.Column('gram', sa.String(), nullable=False, comment='小写二元字符片段'),
+    sa.Column('lead_id', postgresql.UUID(as_uuid=True), nullable=False, comment='线索ID'),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('gram', 'lead_id')
+    )
+    op.create_index(op.f('ix_lead_search_grams_lead_id'), 'lead_search_grams', ['lead_id'], unique=False)
+
+    if _is_postgresql():
+        op.execute(POSTGRES_BACKFILL_SQL)
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        with op.get_context().autocommit_block():
+            op.create_index('ix_leads_customer_name_trgm', 'leads', ['customer_name'], unique=False,
+                            postgresql_using='gin', postgresql_ops={'customer_name': 'gin_trgm_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.create_index('ix_leads_phone_trgm', 'leads', ['phone'], unique=False,
+                            postgresql_using='gin', postgresql_ops={'phone': 'gin_trgm_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        _backfill_in_python()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_leads_phone_trgm', table_name='leads', postgresql_concurrently=True, if_exists=True)
+            op.drop_index('ix_leads_customer_name_trgm', table_name='leads', postgresql_concurrently=True, if_exists=True)
+    op.drop_index(op.f('ix_lead_search_grams_lead_id'), table_name='lead_search_grams')
+    op.drop_table('lead_search_grams')
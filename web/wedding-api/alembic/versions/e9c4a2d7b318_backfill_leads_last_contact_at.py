@@ -0,0 +1,37 @@
+"""backfill leads.last_contact_at for owned leads never contacted
+
+Revision ID: e9c4a2d7b318
+Revises: c7d3e18f5b92
+Create Date: 2026-10-19 10:12:44.218407
+
+The public-pool recycler compares last_contact_at with its cutoff, so owned leads
+with NULL there (created, imported or assigned without a follow-up) were never
+recycled. New assignments now set it; existing rows start their recycle window
+at migration time (UTC, like datetime.utcnow() in the application).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c4a2d7b318'
+down_revision: Union[str, Sequence[str], None] = 'c7d3e18f5b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        now = "timezone('utc', now())"
+    else:
+        now = "CURRENT_TIMESTAMP"
+    op.execute(f"UPDATE leads SET last_contact_at = {now} WHERE last_contact_at IS NULL AND owner_id IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Backfilled values are indistinguishable from real follow-ups; nothing to undo
+    pass
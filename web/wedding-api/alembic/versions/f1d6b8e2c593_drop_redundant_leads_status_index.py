@@ -0,0 +1,45 @@
+"""drop ix_leads_status (covered by ix_leads_status_last_contact_at)
+
+Revision ID: f1d6b8e2c593
+Revises: e9c4a2d7b318
+Create Date: 2026-10-19 10:48:03.561920
+
+ix_leads_status_last_contact_at leads on status, so status filters and the
+per-status counts can use it; the single-column index only added write cost to
+every lead insert / status change. Dropped CONCURRENTLY on PostgreSQL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d6b8e2c593'
+down_revision: Union[str, Sequence[str], None] = 'e9c4a2d7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_leads_status', table_name='leads',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index('ix_leads_status', table_name='leads')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index('ix_leads_status', 'leads', ['status'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_leads_status', 'leads', ['status'], unique=False)
@@ -1,38 +1,142 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import hashlib
+from typing import Callable, Generator, Optional
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
+from jose import JWTError
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, RoleType
+from app.models.project import Project
+from app.models.proposal import Proposal
+from app.models.budget import BudgetItem
+from app.crud import project as crud_project
+from app.crud import proposal as crud_proposal
+from app.crud import budget as crud_budget
+from app.crud.aio import project as crud_project_async
+from app.core.permissions import (
+    Principal, load_principal, principal_from_claims, user_auth_versions
+)
 from app.schemas.token import TokenPayload
-from app.core.security import settings
-from app.database import get_db
+from app.crud.pagination import Page
+from app.core.security import settings, decode_access_token
+from app.core.replica import primary_pins
+from app import database
+from app.database import get_db, get_async_db
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+async def get_token_payload(token: str = Depends(reusable_oauth2)) -> TokenPayload:
+    # async so it runs on the event loop: verification is cheap (LRU-cached)
+    # and AsyncSession endpoints never touch the threadpool
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        return decode_access_token(token)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    if not user:
+
+def get_current_principal(
+    request: Request,
+    db: Session = Depends(get_db, scope="function"),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> Principal:
+    """
+    Resolve the caller once per request (user + roles in one query, permissions cached).
+    The result is kept on request.state, so every check in the request shares it.
+    """
+    db.info["user_id"] = token_data.sub
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    principal = _checked_principal(load_principal(db, token_data.sub))
+    request.state.principal = principal
+    return principal
+
+def _checked_principal(principal: Optional[Principal]) -> Principal:
+    if not principal:
         raise HTTPException(status_code=404, detail="User not found")
-    if not user.is_active:
+    if not principal.user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return user
+    return principal
+
+def _claims_usable(request: Request, token_data: TokenPayload) -> bool:
+    return (
+        settings.TOKEN_PERMISSION_CLAIMS
+        and request.method in ("GET", "HEAD")
+        and token_data.roles is not None
+    )
+
+def get_current_reader_principal(
+    request: Request,
+    db: Session = Depends(get_db, scope="function"),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> Principal:
+    """
+    Principal for read-only endpoints.
+    With TOKEN_PERMISSION_CLAIMS enabled, GET/HEAD requests are authorized from the
+    token's role claims while the user's auth_version still matches the token's
+    (checked per user, cached). Role or active-status changes bump that user's
+    version only, so their stale tokens fall back to the DB.
+    The user is then a stand-in (see principal_from_claims): endpoints on this
+    dependency must only read `id` and `role_list`.
+    """
+    if (
+        _claims_usable(request, token_data)
+        and token_data.gen == user_auth_versions.get(db, token_data.sub)
+    ):
+        return principal_from_claims(db, token_data.sub, token_data.roles)
+    return get_current_principal(request, db=db, token_data=token_data)
+
+def get_read_db(
+    db: Session = Depends(get_db, scope="function"),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> Generator:
+    """
+    Session for read-only endpoints: the replica when one is configured, unless the
+    caller committed a write within REPLICA_STICKY_SECONDS. Otherwise the request's
+    primary session is reused (sessions connect lazily, so no extra checkout).
+    """
+    factory = database.ReplicaSessionLocal
+    if factory is None or primary_pins.is_pinned(token_data.sub):
+        yield db
+        return
+    replica = factory()
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def set_next_cursor(response: Response, page: Page) -> None:
+    """List endpoints returning a bare array report the keyset cursor in a header."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+
+def etag_response(request: Request, content: BaseModel) -> Response:
+    """
+    JSON response with a content-hash ETag; 304 without a body when the client's
+    If-None-Match already has it. Role-masked payloads hash differently, and
+    `private, no-cache` keeps shared caches out and makes browsers revalidate.
+    """
+    body = content.model_dump_json().encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+) -> User:
+    return principal.user
 
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -40,3 +144,105 @@ def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def get_current_reader(
+    principal: Principal = Depends(get_current_reader_principal),
+) -> User:
+    return principal.user
+
+# --- AsyncSession variants ---
+# The principal is still built by the sync loaders, run inside the AsyncSession's
+# greenlet via run_sync, so the DB round trip itself is non-blocking.
+
+async def get_current_principal_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db, scope="function"),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> Principal:
+    db.sync_session.info["user_id"] = token_data.sub
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    principal = _checked_principal(await db.run_sync(load_principal, token_data.sub))
+    request.state.principal = principal
+    return principal
+
+async def get_current_reader_principal_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db, scope="function"),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> Principal:
+    if _claims_usable(request, token_data):
+        version = await db.run_sync(user_auth_versions.get, token_data.sub)
+        if token_data.gen == version:
+            return await db.run_sync(principal_from_claims, token_data.sub, token_data.roles)
+    return await get_current_principal_async(request, db=db, token_data=token_data)
+
+async def get_current_user_async(
+    principal: Principal = Depends(get_current_principal_async),
+) -> User:
+    return principal.user
+
+async def get_current_reader_async(
+    principal: Principal = Depends(get_current_reader_principal_async),
+) -> User:
+    return principal.user
+
+# --- Resource access guards ---
+# Each guard loads the entity together with its owning lead in one joined SELECT,
+# then applies the standard rule: ADMIN/MANAGER see everything, others only
+# projects whose lead they own.
+
+def check_project_access(
+    db: Session,
+    principal: Principal,
+    project_id: UUID,
+    load: Callable[..., Optional[Project]] = crud_project.get_project_with_lead,
+) -> Project:
+    # `load` must populate project.lead (e.g. crud_project.get_project_detail)
+    project = load(db, project_id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    _ensure_owner(principal, project)
+    return project
+
+def _ensure_owner(principal: Principal, project: Project) -> None:
+    if not principal.is_admin_or_manager and project.lead.owner_id != principal.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+def accessible_project(
+    project_id: UUID,
+    db: Session = Depends(get_db, scope="function"),
+    principal: Principal = Depends(get_current_reader_principal),
+) -> Project:
+    return check_project_access(db, principal, project_id)
+
+def accessible_proposal(
+    proposal_id: UUID,
+    db: Session = Depends(get_db, scope="function"),
+    principal: Principal = Depends(get_current_reader_principal),
+) -> Proposal:
+    proposal = crud_proposal.get_proposal_with_project(db, proposal_id=proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    _ensure_owner(principal, proposal.project)
+    return proposal
+
+def accessible_budget_item(
+    item_id: UUID,
+    db: Session = Depends(get_db, scope="function"),
+    principal: Principal = Depends(get_current_reader_principal),
+) -> BudgetItem:
+    # Only used by item writes: lock the row the totals delta is computed from
+    item = crud_budget.get_budget_item_with_project(db, item_id=item_id, for_update=True)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    _ensure_owner(principal, item.project)
+    return item
+
+async def check_project_access_async(db: AsyncSession, principal: Principal, project_id: UUID) -> Project:
+    project = await crud_project_async.get_project_with_lead(db, project_id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    _ensure_owner(principal, project)
+    return project
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, leads, projects, budgets, approvals, proposals, assets, users, permissions
+from app.api.v1.endpoints import auth, leads, projects, budgets, approvals, proposals, assets, users, permissions, system
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -11,3 +11,4 @@ api_router.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 api_router.include_router(approvals.router, prefix="/approvals", tags=["approvals"])
 api_router.include_router(proposals.router, prefix="/proposals", tags=["proposals"])
 api_router.include_router(assets.router, prefix="/assets", tags=["assets"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
@@ -1,29 +1,32 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.api import deps
 from app.schemas.approval import ApprovalCreate, ApprovalResponse, ApprovalUpdate
-from app.crud import approval as crud_approval
-from app.crud import project as crud_project
+from app.crud.aio import approval as crud_approval
+from app.core.permissions import Principal
 from app.models.user import User, RoleType
 from app.models.approval import ApprovalStatus
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ApprovalResponse])
-def read_approvals(
-    db: Session = Depends(deps.get_db),
+async def read_approvals(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db, scope="function"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opt-in keyset pagination: pass an empty value for the first page, then the returned next cursor"),
     status_filter: ApprovalStatus = None,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_reader_async),
 ) -> Any:
     """
     获取审批列表。
     - PLANNER: 仅看自己发起的
     - MANAGER/ADMIN: 看所有
+    - 游标分页: 下一页游标在 X-Next-Cursor 响应头
     """
     requester_id = None
     is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
@@ -31,38 +34,32 @@ def read_approvals(
     if not is_admin_or_manager:
         requester_id = current_user.id
         
-    approvals = crud_approval.get_approvals(
-        db, skip=skip, limit=limit, requester_id=requester_id, status=status_filter
+    approvals = await crud_approval.get_approvals_page(
+        db, skip=skip, limit=limit, cursor=cursor, requester_id=requester_id, status=status_filter
     )
-    return approvals
+    deps.set_next_cursor(response, approvals)
+    return approvals.items
 
 @router.post("/", response_model=ApprovalResponse)
-def create_approval(
+async def create_approval(
     approval_in: ApprovalCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db, scope="function"),
+    principal: Principal = Depends(deps.get_current_principal_async),
 ) -> Any:
     """
     发起审批。
     """
-    # Check Project Existence
-    project = crud_project.get_project(db, project_id=approval_in.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    # Check Project Existence & Permission (Planner must own project)
+    await deps.check_project_access_async(db, principal, approval_in.project_id)
         
-    # Permission: Planner must own project
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-        
-    return crud_approval.create_approval(db, approval_in=approval_in, requester_id=current_user.id)
+    return await crud_approval.create_approval(db, approval_in=approval_in, requester_id=principal.id)
 
 @router.put("/{approval_id}/process", response_model=ApprovalResponse)
-def process_approval(
+async def process_approval(
     approval_id: UUID,
     approval_in: ApprovalUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db, scope="function"),
+    current_user: User = Depends(deps.get_current_user_async),
 ) -> Any:
     """
     审批处理 (通过/驳回)。
@@ -72,13 +69,13 @@ def process_approval(
     if not is_admin_or_manager:
         raise HTTPException(status_code=403, detail="Only managers can process approvals")
         
-    approval = crud_approval.get_approval(db, approval_id=approval_id)
+    approval = await crud_approval.get_approval(db, approval_id=approval_id)
     if not approval:
         raise HTTPException(status_code=404, detail="Approval not found")
         
     if approval.status != ApprovalStatus.PENDING:
         raise HTTPException(status_code=400, detail="Approval already processed")
         
-    return crud_approval.update_approval(
+    return await crud_approval.update_approval(
         db, db_approval=approval, approval_update=approval_in, approver_id=current_user.id
     )
@@ -13,7 +13,7 @@ router = APIRouter()
 @router.post("/upload", response_model=AssetRead)
 async def upload_file(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user = Depends(deps.get_current_active_user),
     file: UploadFile = File(...)
 ):
@@ -45,8 +45,7 @@ async def upload_file(
         uploaded_by=current_user.id
     )
     db.add(asset)
-    db.commit()
-    db.refresh(asset)
+    db.flush()
 
     # 4. Construct Response manually to include the URL (which is not in DB)
     return AssetRead(
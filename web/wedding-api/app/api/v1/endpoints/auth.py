@@ -1,5 +1,6 @@
 from email import message
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -9,21 +10,38 @@ from app.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserRead
 from app.schemas.token import Token
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_password_async, create_access_token
 from app.config import settings
 
 router = APIRouter()
 
+# Async handlers: the bcrypt wait happens on the event loop (no threadpool thread
+# held while queued for the hashing pool); the sync Session work runs through
+# run_in_threadpool.
+
+def _user_by_username(db: Session, username: str):
+    return db.query(User).filter(User.username == username).first()
+
+def _issue_token(db: Session, user: User) -> str:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {}
+    if settings.TOKEN_PERMISSION_CLAIMS:
+        claims = {"roles": user.role_list, "generation": user.auth_version}
+    return create_access_token(
+        subject=user.id, expires_delta=access_token_expires, **claims
+    )
+
 @router.post("/login/access-token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db), 
+async def login_access_token(
+    db: Session = Depends(get_db, scope="function"), 
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 兼容的 Token 登录接口，获取 Access Token
+    密码校验在独立的 bcrypt 线程池中执行，池满时返回 503
     """
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await run_in_threadpool(_user_by_username, db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -35,44 +53,37 @@ def login_access_token(
             detail="Inactive user"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
+    access_token = await run_in_threadpool(_issue_token, db, user)
     return {
         "access_token": access_token,
         "token_type": "bearer",
     }
 
+def _add_user(db: Session, user: UserCreate, hashed_password: str) -> UserRead:
+    new_user = User(
+        username=user.username,
+        password_hash=hashed_password,
+        is_active=user.is_active,
+        roles=[UserRole(role=r.value) for r in user.roles],
+    )
+    db.add(new_user)
+    db.flush()
+    # Serialized here, so nothing lazy-loads on the event loop
+    return UserRead.model_validate(new_user)
+
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db, scope="function")):
     """
     注册新用户
     """
     # 1. Check if user already exists
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await run_in_threadpool(_user_by_username, db, user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
-    # 2. Create new user
-    hashed_password = get_password_hash(user.password)
-    new_user = User(
-        username=user.username,
-        password_hash=hashed_password,
-        is_active=user.is_active
-    )
-    
-    db.add(new_user)
-    db.flush()
-    
-    # 3. Add roles
-    for r in user.roles:
-        db.add(UserRole(user_id=new_user.id, role=r.value))
-
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
\ No newline at end of file
+    # 2. Create new user with its roles
+    hashed_password = await get_password_hash_async(user.password)
+    return await run_in_threadpool(_add_user, db, user, hashed_password)
@@ -1,5 +1,5 @@
 from typing import Any, List, Union
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -8,90 +8,139 @@ from app.schemas.budget import (
     BudgetItemCreate, 
     BudgetItemUpdate, 
     BudgetItemResponse, 
-    BudgetItemAdminResponse
+    BudgetItemAdminResponse,
+    BudgetItemBatchUpdate,
+    BudgetItemBatchResponse,
+    BudgetItemBatchAdminResponse,
+    BudgetSummary,
+    BudgetAdminSummary,
+    budget_items_json,
+    budget_batch_json,
 )
 from app.crud import budget as crud_budget
-from app.crud import project as crud_project
+from app.core.permissions import Principal
 from app.models.user import User, RoleType
+from app.models.project import Project
+from app.models.budget import BudgetItem
 
 router = APIRouter()
 
 @router.get("/project/{project_id}", response_model=Union[List[BudgetItemAdminResponse], List[BudgetItemResponse]])
 def read_project_budget(
-    project_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    project: Project = Depends(deps.accessible_project),
+    db: Session = Depends(deps.get_read_db, scope="function"),
+    current_user: User = Depends(deps.get_current_reader),
 ) -> Any:
     """
     获取项目报价单。
-    - PLANNER: 仅返回销售价相关字段
+    - PLANNER: 仅返回销售价相关字段 (且只能看自己负责项目的报价单)
     - ADMIN/MANAGER: 返回包含成本价和毛利的完整数据
     """
-    # 1. Check Project Existence & Permissions
-    project = crud_project.get_project(db, project_id=project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
     is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    
-    if not is_admin_or_manager:
-        # 策划师只能看自己负责项目的报价单
-        # Check through lead relation
-        if project.lead.owner_id != current_user.id:
-             raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    # 2. Get Items
-    items = crud_budget.get_budget_items(db, project_id=project_id)
-    
-    # 3. Dynamic Response based on Role
+    # 1. Get Items: only the columns the role may see, as row tuples
+    rows = crud_budget.get_budget_item_rows(db, project_id=project.id, include_cost=is_admin_or_manager)
+
+    # 2. Dynamic Response based on Role
+    # Serialized directly (same shape as BudgetItemAdminResponse / BudgetItemResponse);
+    # per-item models plus FastAPI's Union re-validation dominated large quotations
+    return Response(content=budget_items_json(rows, include_cost=is_admin_or_manager), media_type="application/json")
+
+@router.get("/project/{project_id}/summary", response_model=Union[BudgetAdminSummary, BudgetSummary])
+def read_project_budget_summary(
+    project: Project = Depends(deps.accessible_project),
+    db: Session = Depends(deps.get_read_db, scope="function"),
+    current_user: User = Depends(deps.get_current_reader),
+) -> Any:
+    """
+    报价单汇总: 总计与按分类 (category) 小计，由数据库 SUM/GROUP BY 计算，金额全程 Decimal。
+    - PLANNER: 仅返回销售额相关字段
+    - ADMIN/MANAGER: 另含成本、毛利与毛利率 (%)
+    """
+    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
+
+    summary = crud_budget.get_budget_summary(db, project_id=project.id)
     if is_admin_or_manager:
-        return [BudgetItemAdminResponse.model_validate(item) for item in items]
+        return BudgetAdminSummary.model_validate(summary)
     else:
-        return [BudgetItemResponse.model_validate(item) for item in items]
+        return BudgetSummary.model_validate(summary)
 
 @router.post("/", response_model=BudgetItemResponse)
 def create_budget_item(
     item_in: BudgetItemCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: Session = Depends(deps.get_db, scope="function"),
+    principal: Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     创建报价单明细项。
     """
-    # Check Project Permission
-    project = crud_project.get_project(db, project_id=item_in.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    # Check Project Permission (project_id comes from the body)
+    deps.check_project_access(db, principal, item_in.project_id)
         
     # If Planner, ensure cost_price is handled safely (e.g. they can set it if they know, or it defaults)
     # The schema allows it. Logic is fine.
     
     return crud_budget.create_budget_item(db, item_in=item_in)
 
+@router.put("/project/{project_id}/batch", response_model=Union[BudgetItemBatchAdminResponse, BudgetItemBatchResponse])
+def batch_update_budget_items(
+    project_id: UUID,
+    batch_in: BudgetItemBatchUpdate,
+    db: Session = Depends(deps.get_db, scope="function"),
+    principal: Principal = Depends(deps.get_current_principal),
+) -> Any:
+    """
+    批量新建/更新/删除报价单明细 (报价单编辑器自动保存, D2)。
+    - 整批一次鉴权、一个事务: 任一条目不合法则整批不生效
+    - 已锁定 (is_locked) 的明细不可修改或删除
+    - PLANNER 的 cost_price 修改被忽略 (与单条更新一致)
+    - 字段显式传 null 返回 422
+    - 返回新建/更新后的明细 (字段按角色裁剪，同 GET /budgets/project/{id})
+    """
+    project = deps.check_project_access(db, principal, project_id)
+
+    # Locked: the totals delta is computed from these rows' current values
+    existing = crud_budget.get_project_items_by_ids(
+        db, project.id, [entry.id for entry in batch_in.items if entry.id is not None], for_update=True
+    )
+    creates, updates, deletes = [], [], []
+    for entry in batch_in.items:
+        if entry.id is None:
+            creates.append(BudgetItemCreate(project_id=project.id, **entry.model_dump(include=set(crud_budget.BATCH_FIELDS), exclude_none=True)))
+            continue
+        item = existing.get(entry.id)
+        if item is None:
+            raise HTTPException(status_code=404, detail=f"Item {entry.id} not found in this project")
+        if item.is_locked:
+            raise HTTPException(status_code=400, detail=f"Item {entry.id} is locked")
+        if entry.is_deleted:
+            deletes.append(item)
+            continue
+        # Sent fields only; explicit nulls were already rejected by BudgetItemBatchEntry
+        fields = entry.model_fields_set & set(crud_budget.BATCH_FIELDS)
+        if not principal.is_admin_or_manager:
+            fields.discard("cost_price")
+        updates.append((item, BudgetItemUpdate(**{f: getattr(entry, f) for f in fields})))
+
+    created, updated, deleted = crud_budget.apply_budget_batch(db, project.id, creates, updates, deletes)
+    include_cost = principal.is_admin_or_manager
+    rows = crud_budget.get_budget_item_rows(db, project.id, include_cost=include_cost, item_ids=created + updated)
+    return Response(
+        content=budget_batch_json(created, updated, deleted, rows, include_cost=include_cost),
+        media_type="application/json",
+    )
+
 @router.put("/{item_id}", response_model=BudgetItemResponse)
 def update_budget_item(
-    item_id: UUID,
     item_in: BudgetItemUpdate,
-    db: Session = Depends(deps.get_db),
+    item: BudgetItem = Depends(deps.accessible_budget_item),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     更新报价单明细。
     """
-    item = crud_budget.get_budget_item(db, item_id=item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-        
-    # Check Project Permission via item -> project
-    project = crud_project.get_project(db, project_id=item.project_id)
     is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
         
     # Security: If Planner tries to update cost_price?
     # Ideally, we should ignore cost_price updates from Planner if strict.
@@ -104,20 +153,11 @@ def update_budget_item(
 
 @router.delete("/{item_id}", response_model=BudgetItemResponse)
 def delete_budget_item(
-    item_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    item: BudgetItem = Depends(deps.accessible_budget_item),
+    db: Session = Depends(deps.get_db, scope="function"),
 ) -> Any:
     """
     删除报价单明细。
     """
-    item = crud_budget.get_budget_item(db, item_id=item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-        
-    project = crud_project.get_project(db, project_id=item.project_id)
-    if current_user.role == RoleType.PLANNER and project.lead.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-        
     crud_budget.delete_budget_item(db, db_item=item)
     return item
@@ -1,28 +1,39 @@
+import os
+import shutil
+import tempfile
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, status, Query, UploadFile
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.api import deps
-from app.schemas.lead import LeadCreate, LeadResponse, LeadUpdate, LeadPagination
+from app.core import lead_import
+from app.schemas.lead import LeadCreate, LeadFollowUp, LeadResponse, LeadUpdate, LeadPagination, LeadImportResponse
 from app.crud import lead as crud_lead
+from app.models.lead import LeadStatus
+from app.models.lead_import import LeadImport
 from app.models.user import User, RoleType
 
 router = APIRouter()
 
 @router.get("/", response_model=LeadPagination)
 def read_leads(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db, scope="function"),
     page: int = 1,
     size: int = 10,
     status: Optional[str] = None,
     keyword: Optional[str] = None,
-    current_user: User = Depends(deps.get_current_active_user),
+    estimate: bool = Query(False, description="Approximate counts from planner statistics for large unfiltered lists"),
+    cursor: Optional[str] = Query(None, description="Opt-in keyset pagination: pass an empty value for the first page, then the returned next cursor"),
+    current_user: User = Depends(deps.get_current_reader),
 ) -> Any:
     """
     获取线索列表。
     - ADMIN/MANAGER: 获取所有线索
     - PLANNER: 仅获取自己负责的线索
+    - 传入 cursor 时使用游标分页 (忽略 page)，返回 next_cursor
+    - 分页数据、总数和各状态数量 (status_counts) 由同一条 SQL 返回
     """
     owner_id = None
     is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
@@ -31,40 +42,145 @@ def read_leads(
         
     skip = (page - 1) * size
     
-    leads = crud_lead.get_leads(db, skip=skip, limit=size, owner_id=owner_id, status=status, keyword=keyword)
-    total = crud_lead.count_leads(db, owner_id=owner_id, status=status, keyword=keyword)
+    result = crud_lead.get_leads_with_counts(
+        db, skip=skip, limit=size, cursor=cursor,
+        owner_id=owner_id, status=status, keyword=keyword, estimate=estimate,
+    )
     
-    return {"total": total, "list": leads}
+    return {
+        "total": result.total,
+        "list": result.page.items,
+        "next_cursor": result.page.next_cursor,
+        "status_counts": result.status_counts,
+        "estimated": result.estimated,
+    }
 
 @router.post("/", response_model=LeadResponse)
 def create_lead(
     lead_in: LeadCreate,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     创建新线索。
-    自动检测手机号冲突。
+    自动检测手机号冲突 (按规范化手机号，"+86 138-0000-0000" 与 "13800000000" 视为同一客户)。
     """
+    conflict = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Lead with this phone already exists."
+    )
     # 1. Check Conflict
     existing_lead = crud_lead.get_lead_by_phone(db, phone=lead_in.phone)
     if existing_lead:
         # 简单冲突检测，实际业务可能需要返回 conflict: true
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Lead with this phone already exists."
-        )
+        raise conflict
 
     # 2. Create
     # 如果是 Planner 创建，默认归属自己；Admin/Manager 创建如果不指定则可能归公海(这里简化为归属创建者)
     owner_id = current_user.id 
-    return crud_lead.create_lead(db, lead=lead_in, owner_id=owner_id)
+    try:
+        return crud_lead.create_lead(db, lead=lead_in, owner_id=owner_id)
+    except IntegrityError:
+        # 并发创建 (或其他进程刚写入、本进程 bloom filter 尚未知晓) 由唯一索引兜底
+        raise conflict
+
+def _ensure_can_own_leads(current_user: User) -> None:
+    if not any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value, RoleType.PLANNER.value] for r in current_user.role_list):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+@router.post("/claim", response_model=List[LeadResponse])
+def claim_leads(
+    count: int = Query(1, ge=1, le=50, description="Number of leads to take from the public pool"),
+    db: Session = Depends(deps.get_db, scope="function"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    从公海池批量捞取线索。
+    原子操作：并发捞取时每条线索只会分配给一个人；公海不足时返回的条数少于 count。
+    捞取后归属当前用户，状态改为 CONTACTING，并刷新最后跟进时间。
+    """
+    _ensure_can_own_leads(current_user)
+    return crud_lead.claim_leads(db, owner_id=current_user.id, limit=count)
+
+@router.put("/{lead_id}/claim", response_model=LeadResponse)
+def claim_lead(
+    lead_id: UUID,
+    db: Session = Depends(deps.get_db, scope="function"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    从公海池捞取指定线索。已被他人捞走或不在公海时返回 409。
+    """
+    _ensure_can_own_leads(current_user)
+    lead = crud_lead.claim_lead(db, lead_id=lead_id, owner_id=current_user.id)
+    if lead is None:
+        if not crud_lead.get_lead(db, lead_id=lead_id):
+            raise HTTPException(status_code=404, detail="Lead not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Lead is not in the public pool")
+    return lead
+
+@router.post("/import", response_model=LeadImportResponse, status_code=status.HTTP_202_ACCEPTED)
+def import_leads(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    owner_id: Optional[UUID] = Query(None, description="ADMIN/MANAGER: owner of the imported leads; omit to put them in the public pool"),
+    db: Session = Depends(deps.get_db, scope="function"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    批量导入线索 (CSV / XLSX)。
+    - 表头需包含 客户姓名/customer_name 和 手机号/phone 列，可选 婚期、最低预算、最高预算、来源
+    - 手机号统一规范化后查重 (文件内重复、已存在的线索均跳过)
+    - PLANNER 导入的线索归属自己；ADMIN/MANAGER 可指定 owner_id，否则进入公海
+    - 异步处理：返回导入任务，通过 GET /leads/import/{job_id} 查看进度和逐行报告
+    """
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in lead_import.SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Only .csv and .xlsx files can be imported")
+
+    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
+    if not is_admin_or_manager:
+        if owner_id is not None and owner_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        owner_id = current_user.id
+    elif owner_id is not None and db.get(User, owner_id) is None:
+        # Checked up front: the background job would only fail on the foreign key
+        raise HTTPException(status_code=400, detail="Owner not found")
+
+    # The upload is closed once the request ends; the import runs after the response
+    fd, path = tempfile.mkstemp(suffix=extension)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(file.file, out)
+
+    job = LeadImport(filename=file.filename, owner_id=owner_id, created_by=current_user.id, errors=[])
+    db.add(job)
+    db.flush()
+    # Runs after the request's transaction (with the job row) has been committed
+    background_tasks.add_task(lead_import.run_lead_import, job.id, path, remove_file=True)
+    return job
+
+@router.get("/import/{job_id}", response_model=LeadImportResponse)
+def read_lead_import(
+    job_id: UUID,
+    db: Session = Depends(deps.get_db, scope="function"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    查看导入任务的进度和逐行错误报告。
+    """
+    job = db.get(LeadImport, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
+    if not is_admin_or_manager and job.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return job
 
 @router.get("/{lead_id}", response_model=LeadResponse)
 def read_lead(
     lead_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    db: Session = Depends(deps.get_read_db, scope="function"),
+    current_user: User = Depends(deps.get_current_reader),
 ) -> Any:
     """
     获取特定线索详情。
@@ -80,10 +196,38 @@ def read_lead(
         
     return lead
 
+# 跟进记录可推进到的状态 (WON 由创建项目产生, PUBLIC_POOL 由放弃/回收产生)
+FOLLOW_UP_STATUSES = (LeadStatus.CONTACTING, LeadStatus.VISITED, LeadStatus.INTENTIONAL, LeadStatus.LOST)
+
+@router.post("/{lead_id}/follow-up", response_model=LeadResponse)
+def follow_up_lead(
+    lead_id: UUID,
+    follow_up: LeadFollowUp,
+    db: Session = Depends(deps.get_db, scope="function"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    记录一次跟进：刷新最后跟进时间 (公海回收从此重新计时)，可同时推进线索状态。
+    只有负责人 (或 ADMIN/MANAGER) 可以记录；公海中的线索需先捞取。
+    """
+    lead = crud_lead.get_lead(db, lead_id=lead_id)
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
+    if not is_admin_or_manager and lead.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if lead.owner_id is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Lead is in the public pool")
+    if follow_up.status is not None and follow_up.status not in FOLLOW_UP_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status {follow_up.status.value} cannot be set by a follow-up")
+
+    return crud_lead.record_follow_up(db, lead, status=follow_up.status)
+
 @router.delete("/{lead_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_lead(
     lead_id: UUID,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
@@ -23,7 +23,7 @@ class PermissionRead(BaseModel):
 
 @router.post("/sync", status_code=200)
 def sync_permissions_db(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
@@ -37,7 +37,7 @@ def sync_permissions_db(
 
 @router.get("/", response_model=List[PermissionRead])
 def list_permissions(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     if RoleType.ADMIN.value not in current_user.role_list:
@@ -46,7 +46,7 @@ def list_permissions(
 
 @router.get("/matrix", response_model=dict[str, List[str]])
 def get_permission_matrix(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
@@ -70,7 +70,7 @@ def get_permission_matrix(
 def update_role_permissions(
     role_code: str,
     permission_codes: List[str],
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
@@ -99,5 +99,8 @@ def update_role_permissions(
     for p in perms:
         db.add(RolePermission(role=role_code, permission_id=p.id))
         
+    # 3. Bump generation so every worker drops its cached matrix
+    permissions.bump_permission_generation(db)
     db.commit()
+    permissions.role_permission_cache.invalidate()
     return {"message": "Permissions updated"}
\ No newline at end of file
@@ -1,27 +1,35 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.api import deps
-from app.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
+from app.schemas.project import (
+    ProjectCreate, ProjectResponse, ProjectAdminResponse, ProjectUpdate, ProjectDetailResponse
+)
+from app.schemas.budget import BudgetTotals
 from app.crud import project as crud_project
 from app.crud import lead as crud_lead
+from app.core.permissions import Principal
 from app.models.user import User, RoleType
+from app.models.project import Project
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ProjectResponse])
+@router.get("/", response_model=Union[List[ProjectAdminResponse], List[ProjectResponse]])
 def read_projects(
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: Session = Depends(deps.get_read_db, scope="function"),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = Query(None, description="Opt-in keyset pagination: pass an empty value for the first page, then the returned next cursor"),
+    current_user: User = Depends(deps.get_current_reader),
 ) -> Any:
     """
     获取项目列表。
     - ADMIN/MANAGER: 获取所有项目
-    - PLANNER: 仅获取自己负责的线索转化成的项目
+    - PLANNER: 仅获取自己负责的线索转化成的项目 (不含成本与毛利汇总)
+    - 游标分页: 下一页游标在 X-Next-Cursor 响应头
     """
     owner_id = None
     is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
@@ -29,13 +37,15 @@ def read_projects(
     if not is_admin_or_manager:
         owner_id = current_user.id
         
-    projects = crud_project.get_projects(db, skip=skip, limit=limit, owner_id=owner_id)
-    return projects
+    projects = crud_project.get_projects_page(db, skip=skip, limit=limit, cursor=cursor, owner_id=owner_id)
+    deps.set_next_cursor(response, projects)
+    schema = ProjectAdminResponse if is_admin_or_manager else ProjectResponse
+    return [schema.model_validate(project) for project in projects.items]
 
 @router.post("/", response_model=ProjectResponse)
 def create_project(
     project_in: ProjectCreate,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -59,46 +69,56 @@ def create_project(
     # 4. Create
     return crud_project.create_project(db, project_in=project_in)
 
-@router.get("/{project_id}", response_model=ProjectResponse)
+@router.get("/{project_id}", response_model=Union[ProjectAdminResponse, ProjectResponse])
 def read_project(
-    project_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    project: Project = Depends(deps.accessible_project),
+    principal: Principal = Depends(deps.get_current_reader_principal),
 ) -> Any:
     """
     获取项目详情。
+    - PLANNER: 不含成本与毛利汇总
     """
-    project = crud_project.get_project(db, project_id=project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Permission Check
-    # Need to check the owner of the associated lead
-    if current_user.role == RoleType.PLANNER:
-        # We need to load the lead to check owner. 
-        # Since 'lead' is a relationship, it might be lazy loaded.
-        # But accessing project.lead should work if session is open.
-        if project.lead.owner_id != current_user.id:
-             raise HTTPException(status_code=403, detail="Not enough permissions")
-        
-    return project
+    schema = ProjectAdminResponse if principal.is_admin_or_manager else ProjectResponse
+    return schema.model_validate(project)
+
+@router.get("/{project_id}/overview", response_model=ProjectDetailResponse)
+def read_project_overview(
+    project_id: UUID,
+    request: Request,
+    db: Session = Depends(deps.get_read_db, scope="function"),
+    principal: Principal = Depends(deps.get_current_reader_principal),
+) -> Any:
+    """
+    项目详情聚合数据 (C1)，替代分别请求项目、报价单、方案与审批列表。
+    - 报价汇总: PLANNER 不返回成本与毛利
+    - 方案概要: 不含 current_data
+    - 待审批: 该项目 PENDING 状态的审批单
+    - 支持 ETag / If-None-Match (未变化时返回 304)
+    """
+    project = deps.check_project_access(db, principal, project_id, load=crud_project.get_project_detail)
+
+    # 报价汇总直接取项目上的冗余字段, 无需加载明细
+    totals = {"item_count": project.budget_item_count, "total_sale_price": project.budget_sale_total}
+    if principal.is_admin_or_manager:
+        totals.update(total_cost_price=project.budget_cost_total, gross_profit=project.budget_gross_profit)
+    schema = ProjectAdminResponse if principal.is_admin_or_manager else ProjectResponse
+
+    detail = ProjectDetailResponse(
+        project=schema.model_validate(project),
+        lead=project.lead,
+        budget=BudgetTotals(**totals),
+        proposals=sorted(project.proposals, key=lambda p: p.created_at, reverse=True),
+        pending_approvals=project.approvals,
+    )
+    return deps.etag_response(request, detail)
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 def update_project(
-    project_id: UUID,
     project_in: ProjectUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    project: Project = Depends(deps.accessible_project),
+    db: Session = Depends(deps.get_db, scope="function"),
 ) -> Any:
     """
     更新项目信息。
     """
-    project = crud_project.get_project(db, project_id=project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-        
-    return project.update_project(db, db_project=project, project_update=project_in)
+    return crud_project.update_project(db, db_project=project, project_update=project_in)
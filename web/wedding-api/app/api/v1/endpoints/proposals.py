@@ -1,5 +1,5 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -9,9 +9,9 @@ from app.schemas.proposal import (
     ProposalVersionCreate, ProposalVersionResponse
 )
 from app.crud import proposal as crud_proposal
-from app.crud import project as crud_project
 from app.models.user import User, RoleType
-from app.models.proposal import VersionActionType
+from app.models.project import Project
+from app.models.proposal import Proposal, VersionActionType
 
 router = APIRouter()
 
@@ -19,160 +19,96 @@ router = APIRouter()
 
 @router.post("/project/{project_id}", response_model=ProposalResponse)
 def create_proposal(
-    project_id: UUID,
     proposal_in: ProposalCreate,
-    db: Session = Depends(deps.get_db),
+    project: Project = Depends(deps.accessible_project),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     为项目创建新方案 (Plan A / Plan B)。
     """
-    # 1. Check Project & Permission
-    project = crud_project.get_project(db, project_id=project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     # Ensure payload project_id matches path
-    proposal_in.project_id = project_id
+    proposal_in.project_id = project.id
     
     return crud_proposal.create_proposal(db, proposal_in=proposal_in, creator_id=current_user.id)
 
 @router.get("/project/{project_id}", response_model=List[ProposalResponse])
 def read_proposals(
-    project_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    project: Project = Depends(deps.accessible_project),
+    db: Session = Depends(deps.get_read_db, scope="function"),
 ) -> Any:
     """
     获取项目的所有方案。
     """
-    project = crud_project.get_project(db, project_id=project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
-         
-    return crud_proposal.get_proposals_by_project(db, project_id=project_id)
+    return crud_proposal.get_proposals_by_project(db, project_id=project.id)
 
 @router.get("/{proposal_id}", response_model=ProposalResponse)
 def read_proposal(
-    proposal_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    proposal: Proposal = Depends(deps.accessible_proposal),
 ) -> Any:
     """
     获取方案详情 (含当前草稿数据)。
     """
-    proposal = crud_proposal.get_proposal(db, proposal_id=proposal_id)
-    if not proposal:
-        raise HTTPException(status_code=404, detail="Proposal not found")
-    
-    # Check Permission via Project
-    project = crud_project.get_project(db, project_id=proposal.project_id)
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
-         
     return proposal
 
 @router.put("/{proposal_id}", response_model=ProposalResponse)
 def update_proposal(
-    proposal_id: UUID,
     proposal_in: ProposalUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    proposal: Proposal = Depends(deps.accessible_proposal),
+    db: Session = Depends(deps.get_db, scope="function"),
 ) -> Any:
     """
     更新方案 (Auto-Save 接口)。
     前端应定时调用此接口保存 current_data。
     """
-    proposal = crud_proposal.get_proposal(db, proposal_id=proposal_id)
-    if not proposal:
-        raise HTTPException(status_code=404, detail="Proposal not found")
-        
-    project = crud_project.get_project(db, project_id=proposal.project_id)
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
-         
     return crud_proposal.update_proposal(db, db_proposal=proposal, proposal_update=proposal_in)
 
 # --- Version Control Endpoints ---
 
 @router.post("/{proposal_id}/versions", response_model=ProposalVersionResponse)
 def create_version(
-    proposal_id: UUID,
     version_in: ProposalVersionCreate,
-    db: Session = Depends(deps.get_db),
+    proposal: Proposal = Depends(deps.accessible_proposal),
+    db: Session = Depends(deps.get_db, scope="function"),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     创建新版本 (Snapshot)。
     用于手动保存节点、发布等。
     """
-    proposal = crud_proposal.get_proposal(db, proposal_id=proposal_id)
-    if not proposal:
-        raise HTTPException(status_code=404, detail="Proposal not found")
-    
-    project = crud_project.get_project(db, project_id=proposal.project_id)
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    version_in.proposal_id = proposal_id
+    version_in.proposal_id = proposal.id
     return crud_proposal.create_version(db, version_in=version_in, editor_id=current_user.id)
 
 @router.get("/{proposal_id}/versions", response_model=List[ProposalVersionResponse])
 def read_versions(
-    proposal_id: UUID,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = Query(None, description="Opt-in keyset pagination: pass an empty value for the first page, then the returned next cursor"),
+    proposal: Proposal = Depends(deps.accessible_proposal),
+    db: Session = Depends(deps.get_read_db, scope="function"),
 ) -> Any:
     """
-    获取方案的历史版本列表。
+    获取方案的历史版本列表 (最新在前)。
+    游标分页: 下一页游标在 X-Next-Cursor 响应头
     """
-    proposal = crud_proposal.get_proposal(db, proposal_id=proposal_id)
-    if not proposal:
-        raise HTTPException(status_code=404, detail="Proposal not found")
-    
-    project = crud_project.get_project(db, project_id=proposal.project_id)
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
-         
-    return crud_proposal.get_versions(db, proposal_id=proposal_id, skip=skip, limit=limit)
+    versions = crud_proposal.get_versions_page(db, proposal_id=proposal.id, skip=skip, limit=limit, cursor=cursor)
+    deps.set_next_cursor(response, versions)
+    return versions.items
 
 @router.post("/{proposal_id}/restore/{version_id}", response_model=ProposalResponse)
 def restore_version(
-    proposal_id: UUID,
     version_id: UUID,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    proposal: Proposal = Depends(deps.accessible_proposal),
+    db: Session = Depends(deps.get_db, scope="function"),
 ) -> Any:
     """
     恢复到指定版本。
     Current Draft (current_data) 将被覆盖。
     """
-    proposal = crud_proposal.get_proposal(db, proposal_id=proposal_id)
-    if not proposal:
-        raise HTTPException(status_code=404, detail="Proposal not found")
-        
     version = crud_proposal.get_version(db, version_id=version_id)
-    if not version or version.proposal_id != proposal_id:
+    if not version or version.proposal_id != proposal.id:
         raise HTTPException(status_code=404, detail="Version not found")
-        
-    project = crud_project.get_project(db, project_id=proposal.project_id)
-    is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
-    if not is_admin_or_manager and project.lead.owner_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     # Restore logic: Update Proposal.current_data = Version.snapshot_data
     update_data = ProposalUpdate(current_data=version.snapshot_data)
@@ -0,0 +1,90 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app import database
+from app.api import deps
+from app.config import settings
+from app.core.budget_totals import repair_budget_totals
+from app.core.db_pool import pool_metrics
+from app.core.lead_recycler import lead_recycler
+from app.models.user import User, RoleType
+
+router = APIRouter()
+
+@router.get("/db-pool")
+def read_db_pool_metrics(
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Connection pool metrics of this worker process. (Admin only)
+    Each uvicorn worker owns its own pools; `pid` tells the samples apart.
+    """
+    if RoleType.ADMIN.value not in current_user.role_list:
+         raise HTTPException(status_code=403, detail="Not authorized")
+
+    return {
+        "pid": os.getpid(),
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        },
+        "sync": pool_metrics(database.engine.pool),
+        "async": pool_metrics(database.async_engine.sync_engine.pool),
+    }
+
+@router.get("/slow-queries")
+def read_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Slowest statement fingerprints of this worker process. (Admin only)
+    Full statements, redacted parameters and plans are in SLOW_QUERY_LOG_PATH.
+    """
+    if RoleType.ADMIN.value not in current_user.role_list:
+         raise HTTPException(status_code=403, detail="Not authorized")
+
+    return {
+        "pid": os.getpid(),
+        "threshold_ms": database.slow_query_log.threshold_ms,
+        "fingerprints": database.slow_query_log.top(limit),
+    }
+
+@router.get("/lead-recycler")
+def read_lead_recycler_metrics(
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Public-pool recycling job of this worker process: last run, totals, next run. (Admin only)
+    """
+    if RoleType.ADMIN.value not in current_user.role_list:
+         raise HTTPException(status_code=403, detail="Not authorized")
+
+    return {"pid": os.getpid(), **lead_recycler.metrics()}
+
+@router.post("/lead-recycler/run")
+def run_lead_recycler(
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Run the public-pool recycling sweep now instead of waiting for the schedule. (Admin only)
+    """
+    if RoleType.ADMIN.value not in current_user.role_list:
+         raise HTTPException(status_code=403, detail="Not authorized")
+
+    return lead_recycler.run_once()
+
+@router.post("/budget-totals/repair")
+def run_budget_totals_repair(
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Recompute drifted project budget totals from their items. (Admin only)
+    """
+    if RoleType.ADMIN.value not in current_user.role_list:
+         raise HTTPException(status_code=403, detail="Not authorized")
+
+    return repair_budget_totals()
@@ -1,17 +1,22 @@
 from typing import List, Optional
 from uuid import UUID
 import time
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
 
 from app.api import deps
 from app.core import security
+from app.core.permissions import bump_user_auth_version, user_auth_versions
 from app.models.user import User, RoleType, UserRole
 from app.schemas.user import UserCreate, UserRead, UserUpdate
+from app.crud.pagination import SortKey, paginate
 
 router = APIRouter()
 
+USER_ORDER = (SortKey(User.id),)
+
 # -----------------------------------------------------------------------------
 # User Management (Admin / Manager only mostly)
 # -----------------------------------------------------------------------------
@@ -27,9 +32,11 @@ def read_user_me(
 
 @router.get("/", response_model=List[UserRead])
 def read_users(
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: Session = Depends(deps.get_db, scope="function"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opt-in keyset pagination: pass an empty value for the first page, then the returned next cursor"),
     current_user: User = Depends(deps.get_current_active_user),
     role: Optional[RoleType] = None
 ):
@@ -48,23 +55,20 @@ def read_users(
             detail="Not enough permissions",
         )
         
-    query = db.query(User).filter(User.username.notilike('deleted_%'))
+    # Roles eager-loaded in one extra SELECT instead of one per user
+    query = db.query(User).options(selectinload(User.roles)).filter(User.username.notilike('deleted_%'))
     if role:
         # Filter users who have this specific role
         query = query.join(UserRole).filter(UserRole.role == role.value)
         
-    return query.offset(skip).limit(limit).all()
+    users = paginate(query, USER_ORDER, limit, cursor, skip)
+    deps.set_next_cursor(response, users)
+    return users.items
 
-@router.post("/", response_model=UserRead)
-def create_user(
-    *,
-    db: Session = Depends(deps.get_db),
-    user_in: UserCreate,
-    current_user: User = Depends(deps.get_current_active_user),
-):
-    """
-    Create new user.
-    """
+# create_user / update_user are async so the bcrypt wait happens on the event loop
+# (see app.core.security); the sync Session work runs through run_in_threadpool.
+
+def _check_new_user(db: Session, user_in: UserCreate, current_user: User) -> None:
     is_admin_or_manager = any(r in [RoleType.ADMIN.value, RoleType.MANAGER.value] for r in current_user.role_list)
     if not is_admin_or_manager:
         raise HTTPException(
@@ -78,34 +82,34 @@ def create_user(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
-        
+
+def _add_user(db: Session, user_in: UserCreate, password_hash: str) -> UserRead:
     user = User(
         username=user_in.username,
-        password_hash=security.get_password_hash(user_in.password),
+        password_hash=password_hash,
         is_active=user_in.is_active,
+        # Roles through the relationship: one flush, and role_list needs no reload
+        roles=[UserRole(role=r.value) for r in user_in.roles],
     )
     db.add(user)
-    db.flush() # Generate ID
-    
-    # Add roles
-    for r in user_in.roles:
-        db.add(UserRole(user_id=user.id, role=r.value))
-
-    db.commit()
-    db.refresh(user)
-    return user
+    db.flush()
+    return UserRead.model_validate(user)
 
-@router.put("/{user_id}", response_model=UserRead)
-def update_user(
+@router.post("/", response_model=UserRead)
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
-    user_id: UUID,
-    user_in: UserUpdate,
+    db: Session = Depends(deps.get_db, scope="function"),
+    user_in: UserCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
-    Update a user.
+    Create new user.
     """
+    await run_in_threadpool(_check_new_user, db, user_in, current_user)
+    password_hash = await security.get_password_hash_async(user_in.password)
+    return await run_in_threadpool(_add_user, db, user_in, password_hash)
+
+def _check_user_update(db: Session, user_id: UUID, user_in: UserUpdate, current_user: User) -> None:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
@@ -128,36 +132,70 @@ def update_user(
                 status_code=400,
                 detail="Username already registered",
             )
-        user.username = user_in.username
-        
-    if user_in.password is not None:
-        user.password_hash = security.get_password_hash(user_in.password)
-        
-    if user_in.roles is not None:
-        if not is_admin:
+
+    if user_in.roles is not None and not is_admin:
+         raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin can change roles",
+        )
+
+    if user_in.is_active is not None:
+        # Admin or Manager can change active status
+        is_manager = RoleType.MANAGER.value in current_user.role_list
+        if not (is_admin or is_manager):
              raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only Admin can change roles",
+                detail="Not enough permissions to change active status",
             )
+
+def _apply_user_update(db: Session, user_id: UUID, user_in: UserUpdate, password_hash: Optional[str]) -> UserRead:
+    user = db.query(User).filter(User.id == user_id).first()
+    if user_in.username is not None:
+        user.username = user_in.username
+        
+    if password_hash is not None:
+        user.password_hash = password_hash
+        
+    # This user's tokens carrying role claims must fall back to the DB, but only
+    # when roles / active status really change
+    auth_changed = False
+    if user_in.roles is not None and {r.value for r in user_in.roles} != set(user.role_list):
         # Clear old roles
         db.query(UserRole).filter(UserRole.user_id == user_id).delete()
         # Add new roles
         for r in user_in.roles:
             db.add(UserRole(user_id=user_id, role=r.value))
+        auth_changed = True
         
-    if user_in.is_active is not None:
-        # Admin or Manager can change active status
-        is_manager = RoleType.MANAGER.value in current_user.role_list
-        if not (is_admin or is_manager):
-             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to change active status",
-            )
+    if user_in.is_active is not None and user_in.is_active != user.is_active:
         user.is_active = user_in.is_active
+        auth_changed = True
 
+    if auth_changed:
+        bump_user_auth_version(db, user_id)
     db.commit()
+    user_auth_versions.invalidate(user_id)
+    security.token_cache.invalidate_user(user_id)
     db.refresh(user)
-    return user
+    return UserRead.model_validate(user)
+
+@router.put("/{user_id}", response_model=UserRead)
+async def update_user(
+    *,
+    db: Session = Depends(deps.get_db, scope="function"),
+    user_id: UUID,
+    user_in: UserUpdate,
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Update a user.
+    """
+    # Checks first: no hashing for requests that are refused anyway
+    await run_in_threadpool(_check_user_update, db, user_id, user_in, current_user)
+    password_hash = None
+    if user_in.password is not None:
+        password_hash = await security.get_password_hash_async(user_in.password)
+    return await run_in_threadpool(_apply_user_update, db, user_id, user_in, password_hash)
 
 from pydantic import BaseModel
 
@@ -184,7 +222,7 @@ def read_roles(
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db, scope="function"),
     user_id: UUID,
     current_user: User = Depends(deps.get_current_active_user),
 ):
@@ -241,6 +279,10 @@ def delete_user(
         # We can leave roles as is for audit purposes.
         
         db.add(user)
+        bump_user_auth_version(db, user_id)
         db.commit()
         
+    # A deleted user has no auth_version, so their claims tokens stop matching too
+    user_auth_versions.invalidate(user_id)
+    security.token_cache.invalidate_user(user_id)
     return None
\ No newline at end of file
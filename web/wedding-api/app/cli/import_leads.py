@@ -0,0 +1,66 @@
+"""
+Import leads from a CSV/XLSX file without going through the HTTP upload, e.g. a
+partner's migration spreadsheet on the server. Same parser, batching and report as
+POST /leads/import; the job is recorded in lead_imports, so progress is also visible
+via GET /leads/import/{job_id}.
+
+Usage:
+    python -m app.cli.import_leads leads.xlsx --created-by admin
+    python -m app.cli.import_leads leads.csv --created-by admin --owner alice
+"""
+import argparse
+import os
+import sys
+
+from app import database
+from app.core import lead_import
+import app.models  # noqa: F401 - register all mappers
+from app.models.lead_import import LeadImport, LeadImportStatus
+from app.models.user import User
+
+
+def _user_id(db, username: str):
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        sys.exit(f"Unknown user: {username}")
+    return user.id
+
+
+def _progress(job: LeadImport) -> None:
+    print(f"  {job.processed_rows:>9} rows  {job.inserted:>9} inserted  "
+          f"{job.duplicates:>7} duplicates  {job.failed:>7} invalid", flush=True)
+
+
+def main(args: argparse.Namespace) -> int:
+    with database.SessionLocal() as db:
+        job = LeadImport(
+            filename=os.path.basename(args.file),
+            created_by=_user_id(db, args.created_by),
+            owner_id=_user_id(db, args.owner) if args.owner else None,
+            errors=[],
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+    print(f"Import {job_id}: {args.file}")
+
+    lead_import.run_lead_import(job_id, args.file, on_progress=_progress)
+
+    with database.SessionLocal() as db:
+        job = db.get(LeadImport, job_id)
+        if job.status == LeadImportStatus.FAILED:
+            print(f"Failed: {job.error}", file=sys.stderr)
+            return 1
+        for problem in (job.errors or [])[:args.show_errors]:
+            print(f"  row {problem['row']}: {problem['error']} ({problem['phone']})")
+        print(f"Done: {job.inserted} inserted, {job.duplicates} duplicates, {job.failed} invalid")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help=".csv or .xlsx file; header row with customer_name/客户姓名 and phone/手机号")
+    parser.add_argument("--created-by", required=True, help="username recorded as the importer")
+    parser.add_argument("--owner", help="username owning the imported leads (default: public pool)")
+    parser.add_argument("--show-errors", type=int, default=20, help="row problems to print at the end")
+    sys.exit(main(parser.parse_args()))
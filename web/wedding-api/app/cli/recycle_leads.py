@@ -0,0 +1,30 @@
+"""
+Run the public-pool recycling sweep once (for system cron while
+LEAD_RECYCLE_ENABLED=false, the default, keeps the API processes from scheduling it).
+
+Usage:
+    python -m app.cli.recycle_leads
+"""
+import argparse
+import sys
+
+import app.models  # noqa: F401 - register all mappers
+from app.core.lead_recycler import lead_recycler
+
+
+def main(args: argparse.Namespace) -> int:
+    run = lead_recycler.run_once()
+    if run.skipped:
+        print("Another process is already recycling leads")
+        return 0
+    print(f"Recycled {run.recycled} leads in {run.batches} batches ({run.duration_ms:.0f} ms)"
+          f"{'; per-run cap reached' if run.capped else ''}")
+    if run.error:
+        print(f"Failed: {run.error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,24 @@
+"""
+Recompute drifted project budget totals (Project.budget_*) from their items.
+
+Usage:
+    python -m app.cli.repair_budget_totals [--batch-size 500]
+"""
+import argparse
+import sys
+
+import app.models  # noqa: F401 - register all mappers
+from app.core.budget_totals import repair_budget_totals
+
+
+def main(args: argparse.Namespace) -> int:
+    run = repair_budget_totals(batch_size=args.batch_size)
+    print(f"Checked {run.checked} projects in {run.batches} batches, repaired {run.repaired} "
+          f"({run.duration_ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=None, help="projects per UPDATE (default: BUDGET_TOTALS_REPAIR_BATCH_SIZE)")
+    sys.exit(main(parser.parse_args()))
@@ -16,12 +16,93 @@ class Settings(BaseSettings):
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{quote_plus(self.POSTGRES_USER)}:{quote_plus(self.POSTGRES_PASSWORD)}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        # Same database, asyncpg driver (used by AsyncSession endpoints)
+        return self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    # Connection pool (per engine, per worker process). Size it so that
+    # uvicorn workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below max_connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0   # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800     # seconds; -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+
+    # Optional read replica (full SQLAlchemy URL). When set, read-only endpoints
+    # use it via deps.get_read_db; a user who just committed a write keeps
+    # reading from the primary for REPLICA_STICKY_SECONDS. The pin is kept per
+    # worker process (app.core.replica): use sticky routing with several workers.
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_STICKY_SECONDS: float = 5.0
     
+    # Lead list: ?estimate=true serves unfiltered counts from planner statistics
+    # once the table has at least this many rows (PostgreSQL only)
+    LEAD_COUNT_ESTIMATE_THRESHOLD: int = 100_000
+
+    # Bulk lead import (CSV/XLSX): rows per INSERT batch / commit, and how many
+    # per-row problems are kept in the job's report (counters are always exact)
+    LEAD_IMPORT_BATCH_SIZE: int = 1000
+    LEAD_IMPORT_MAX_ERRORS: int = 1000
+
+    # Optional per-process bloom filter of existing phones (app.core.bloom): phones it
+    # has never seen skip the duplicate lookup on create / import. Rebuilt from the
+    # database every LEAD_PHONE_BLOOM_REFRESH_SECONDS; ~1.2 MB per million phones at 1%.
+    LEAD_PHONE_BLOOM_ENABLED: bool = False
+    LEAD_PHONE_BLOOM_CAPACITY: int = 1_000_000
+    LEAD_PHONE_BLOOM_ERROR_RATE: float = 0.01
+    LEAD_PHONE_BLOOM_REFRESH_SECONDS: float = 300.0
+
+    # Public-pool recycling: leads whose owner hasn't contacted them for
+    # LEAD_RECYCLE_STALE_DAYS go back to PUBLIC_POOL. When enabled it runs daily at
+    # LEAD_RECYCLE_HOUR (server local time) in the API process, one worker at a time
+    # on PostgreSQL; or leave it off and run app.cli.recycle_leads from cron.
+    # Off by default: enable it once planners record follow-ups
+    # (POST /leads/{id}/follow-up), otherwise worked leads look untouched.
+    LEAD_RECYCLE_ENABLED: bool = False
+    LEAD_RECYCLE_HOUR: int = 2
+    LEAD_RECYCLE_STALE_DAYS: int = 15
+    LEAD_RECYCLE_BATCH_SIZE: int = 1000       # rows per UPDATE / transaction
+    LEAD_RECYCLE_MAX_PER_RUN: int = 100_000   # the rest waits for the next run
+    LEAD_RECYCLE_BATCH_PAUSE_SECONDS: float = 0.1
+
+    # Project budget totals repair (app.cli.repair_budget_totals / POST
+    # /system/budget-totals/repair): projects recomputed per UPDATE / transaction
+    BUDGET_TOTALS_REPAIR_BATCH_SIZE: int = 500
+
+    # Per-request SQL instrumentation (Server-Timing header + N+1 warning)
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_REPEAT_WARN_THRESHOLD: int = 10
+
+    # Slow-query log (rotating file, redacted parameters + EXPLAIN). Negative threshold disables logging.
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_PATH: str = "logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    SLOW_QUERY_EXPLAIN: bool = True
+
     # JWT
     SECRET_KEY: str = "YOUR_SECRET_KEY_HERE" # Change this in production!
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8 # 8 days
 
+    # Verified-token LRU: max cached tokens per process (0 disables the cache)
+    TOKEN_CACHE_SIZE: int = 4096
+
+    # Password hashing pool: bcrypt runs on a dedicated bounded executor.
+    # Requests beyond WORKERS + MAX_QUEUE in flight fail fast with 503.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # Opt-in: embed role codes + the user's auth_version in access tokens so hot
+    # read-only endpoints can authorize without loading the user and roles
+    TOKEN_PERMISSION_CLAIMS: bool = False
+
+    # Permission caches: how often (seconds) a worker re-reads the DB generation
+    # counter and each user's auth_version
+    PERMISSION_CACHE_TTL_SECONDS: float = 5.0
+
     # MinIO / S3
     MINIO_ENDPOINT: str = "172.31.6.137" # IP:Port without http://
     MINIO_ACCESS_KEY: str = "demo"
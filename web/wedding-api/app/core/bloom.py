@@ -0,0 +1,158 @@
+"""
+Per-process bloom filter over leads.phone_normalized, used to skip the duplicate
+lookup for phones that are certainly new (the common case when creating or
+importing leads).
+
+A bloom filter never forgets a phone it has seen, but this one only sees the
+phones that existed when it was built plus those inserted by this process; leads
+created by other workers in between are unknown to it until the next rebuild
+(LEAD_PHONE_BLOOM_REFRESH_SECONDS). It is therefore only used in front of writes,
+where the unique index on leads.phone_normalized still rejects such duplicates.
+
+Builds scan every phone, so they run on a background thread with their own
+session: until the first build finishes every phone "might exist" (plain DB
+lookups), and a stale filter keeps answering until its replacement is swapped in.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.lead import Lead
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (blake2b, double hashing)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for p in self._positions(item):
+            self._bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+class PhoneBloom:
+    """Background-built, periodically rebuilt bloom filter of existing normalized phones."""
+
+    def __init__(self, enabled: bool, capacity: int, error_rate: float, refresh_seconds: float):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self._filter: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        # Phones added while a build is scanning; replayed into the new filter
+        self._pending: Optional[List[str]] = None
+
+    def _stale(self) -> bool:
+        return (
+            self._filter is None
+            or time.monotonic() - self._built_at > self.refresh_seconds
+            # Past capacity the false-positive rate climbs quickly
+            or self._filter.count > self._filter.capacity
+        )
+
+    def build(self, db: Session) -> BloomFilter:
+        start = time.perf_counter()
+        total = db.scalar(select(func.count()).select_from(Lead).where(Lead.phone_normalized.isnot(None)))
+        bloom = BloomFilter(max(self.capacity, total * 2), self.error_rate)
+        bloom.update(db.scalars(
+            select(Lead.phone_normalized).where(Lead.phone_normalized.isnot(None))
+            .execution_options(yield_per=10_000)
+        ))
+        logger.info("Phone bloom filter built: %d phones in %.0f ms", bloom.count, (time.perf_counter() - start) * 1000)
+        return bloom
+
+    def refresh(self, db: Session) -> None:
+        """Build a new filter (without holding the lock) and swap it in."""
+        with self._lock:
+            self._pending = []
+        try:
+            bloom = self.build(db)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            bloom.update(self._pending)
+            self._pending = None
+            self._filter = bloom
+            self._built_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        from app.database import SessionLocal
+        try:
+            with SessionLocal() as db:
+                self.refresh(db)
+        except Exception:
+            logger.exception("Phone bloom filter build failed; keeping the previous filter")
+        finally:
+            with self._lock:
+                self._refresh_thread = None
+
+    def might_exist(self, db: Session, phone: str) -> bool:
+        """False only if no lead known to this process has `phone` (already normalized)."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self._stale() and self._refresh_thread is None:
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_in_background, name="phone-bloom-refresh", daemon=True
+                )
+                self._refresh_thread.start()
+            bloom = self._filter
+            return bloom is None or phone in bloom
+
+    def add(self, phones: Iterable[str]) -> None:
+        """Record phones inserted by this process (a rolled-back insert only costs a false positive)."""
+        phones = [p for p in phones if p]
+        with self._lock:
+            if self._filter is not None:
+                self._filter.update(phones)
+            if self._pending is not None:
+                self._pending.extend(phones)
+
+    def wait_for_refresh(self, timeout: Optional[float] = None) -> None:
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def reset(self) -> None:
+        self.wait_for_refresh()
+        with self._lock:
+            self._filter = None
+
+phone_bloom = PhoneBloom(
+    enabled=settings.LEAD_PHONE_BLOOM_ENABLED,
+    capacity=settings.LEAD_PHONE_BLOOM_CAPACITY,
+    error_rate=settings.LEAD_PHONE_BLOOM_ERROR_RATE,
+    refresh_seconds=settings.LEAD_PHONE_BLOOM_REFRESH_SECONDS,
+)
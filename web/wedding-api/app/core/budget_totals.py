@@ -0,0 +1,52 @@
+"""
+Repair job for the denormalized budget totals on projects (Project.budget_*).
+
+crud.budget keeps them up to date incrementally; this recomputes them from the
+items for every project, in batches of BUDGET_TOTALS_REPAIR_BATCH_SIZE projects
+(one UPDATE and one short transaction each), and only rewrites rows that
+drifted, e.g. after manual SQL edits or a restore.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+
+from app import database
+from app.config import settings
+from app.crud import budget as crud_budget
+from app.models.project import Project
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BudgetTotalsRepair:
+    checked: int = 0
+    repaired: int = 0
+    batches: int = 0
+    duration_ms: float = 0.0
+
+def repair_budget_totals(batch_size: Optional[int] = None) -> BudgetTotalsRepair:
+    """Walk all projects by id and fix drifted totals; safe to run while the API serves writes."""
+    batch_size = batch_size or settings.BUDGET_TOTALS_REPAIR_BATCH_SIZE
+    run = BudgetTotalsRepair()
+    start = time.perf_counter()
+    last_id = None
+    while True:
+        with database.SessionLocal() as db:
+            query = select(Project.id).order_by(Project.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(Project.id > last_id)
+            project_ids = list(db.scalars(query))
+            if not project_ids:
+                break
+            run.repaired += crud_budget.repair_budget_totals(db, project_ids)
+            db.commit()
+        run.checked += len(project_ids)
+        run.batches += 1
+        last_id = project_ids[-1]
+    run.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+    if run.repaired:
+        logger.warning("Budget totals: repaired %d of %d projects", run.repaired, run.checked)
+    return run
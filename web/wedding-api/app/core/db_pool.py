@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+class _CheckoutTimingMixin:
+    """
+    Times every checkout (queue wait + connect/pre-ping) and counts pool timeouts.
+    Stats live on the pool instance, so they are per engine and per worker process.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += elapsed
+                if elapsed > self._wait_max:
+                    self._wait_max = elapsed
+
+    def wait_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            checkouts = self._checkouts
+            return {
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "wait_avg_ms": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_metrics(pool: Pool) -> Dict[str, Any]:
+    """
+    Snapshot of a pool: checked-out / idle / overflow counts plus checkout wait stats.
+    """
+    metrics: Dict[str, Any] = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # QueuePool.overflow() goes negative while the base pool is not full
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, _CheckoutTimingMixin):
+        metrics.update(pool.wait_stats())
+    return metrics
+
+def engine_pool_kwargs(settings, async_engine: bool = False) -> Dict[str, Any]:
+    """
+    create_engine()/create_async_engine() keyword arguments from Settings.DB_POOL_*
+    """
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if async_engine else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,217 @@
+"""
+Streaming bulk lead import (CSV / XLSX).
+
+Rows are read one at a time (csv module / openpyxl read-only mode), validated and
+phone-normalized, and written LEAD_IMPORT_BATCH_SIZE at a time with
+crud.lead.bulk_create_leads: one INSERT ... ON CONFLICT DO NOTHING per batch instead
+of a SELECT + INSERT per lead. Progress and the per-row report live on the
+LeadImport row and are committed together with each batch.
+"""
+import csv
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+
+from app import database
+from app.config import settings
+from app.core.phone import normalize_phone
+from app.crud import lead as crud_lead
+from app.models.lead_import import LeadImport, LeadImportStatus
+from app.schemas.lead import LeadCreate
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+# Accepted header names per field (compared case-insensitively)
+HEADER_ALIASES = {
+    "customer_name": ("customer_name", "name", "客户姓名", "姓名", "客户"),
+    "phone": ("phone", "mobile", "手机号", "手机", "电话", "联系电话"),
+    "wedding_date": ("wedding_date", "婚期", "预计婚期"),
+    "budget_min": ("budget_min", "最低预算"),
+    "budget_max": ("budget_max", "最高预算"),
+    "source": ("source", "来源", "线索来源"),
+}
+REQUIRED_FIELDS = ("customer_name", "phone")
+
+class ImportFileError(ValueError):
+    """The file as a whole can't be imported (unsupported type, missing columns)."""
+
+def _blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _columns(header) -> Dict[str, int]:
+    positions = {str(name).strip().lower(): i for i, name in enumerate(header) if not _blank(name)}
+    columns = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                columns[field] = positions[alias]
+                break
+    missing = [f for f in REQUIRED_FIELDS if f not in columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}")
+    return columns
+
+def _sniff_encoding(path: str) -> str:
+    # Excel on Chinese Windows exports CSV as GBK; everything else is UTF-8 (with or without BOM)
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(head) - 3:  # not just a character cut at the sample boundary
+            return "gb18030"
+    return "utf-8-sig"
+
+def _csv_rows(path: str) -> Iterator[Tuple]:
+    with open(path, newline="", encoding=_sniff_encoding(path)) as f:
+        yield from csv.reader(f)
+
+def _xlsx_rows(path: str) -> Iterator[Tuple]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportFileError("XLSX import requires openpyxl") from e
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def read_rows(path: str, filename: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, {field: raw value}) for every non-empty data row; line 1 is the header."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        rows = _csv_rows(path)
+    elif extension == ".xlsx":
+        rows = _xlsx_rows(path)
+    else:
+        raise ImportFileError(f"Unsupported file type: {extension or filename}")
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError("Empty file")
+    columns = _columns(header)
+    for line, row in enumerate(rows, start=2):
+        values = {field: row[i] if i < len(row) else None for field, i in columns.items()}
+        if not all(_blank(v) for v in values.values()):
+            yield line, values
+
+def parse_row(values: Dict[str, Any]) -> LeadCreate:
+    """Validate one row; ValueError carries the message for the row report."""
+    cleaned = {
+        field: None if _blank(value) else value.strip() if isinstance(value, str) else value
+        for field, value in values.items()
+    }
+    if cleaned.get("customer_name") is None:
+        raise ValueError("customer_name is required")
+    if cleaned.get("phone") is None:
+        raise ValueError("phone is required")
+    phone = normalize_phone(cleaned["phone"])
+    if phone is None:
+        raise ValueError("invalid phone number")
+    cleaned["phone"] = phone
+    cleaned["customer_name"] = str(cleaned["customer_name"])
+    if cleaned.get("source") is not None:
+        cleaned["source"] = str(cleaned["source"])
+    if isinstance(cleaned.get("wedding_date"), datetime):
+        cleaned["wedding_date"] = cleaned["wedding_date"].date()
+    try:
+        return LeadCreate.model_validate(cleaned)
+    except ValidationError as e:
+        error = e.errors()[0]
+        raise ValueError(f"{'.'.join(str(p) for p in error['loc'])}: {error['msg']}") from None
+
+def _report(line: int, phone: Any, message: str) -> Dict[str, Any]:
+    return {"row": line, "phone": None if _blank(phone) else str(phone), "error": message}
+
+def import_batch(db, job: LeadImport, chunk: List[Tuple[int, Dict[str, Any]]], seen: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Validate and insert one chunk of rows, updating the job counters.
+    `seen` maps normalized phones to the line that first used them (whole file).
+    Returns the report entries for rows that were not imported.
+    """
+    problems = []
+    batch: Dict[str, Tuple[int, LeadCreate]] = {}
+    for line, values in chunk:
+        try:
+            lead = parse_row(values)
+        except ValueError as e:
+            job.failed += 1
+            problems.append(_report(line, values.get("phone"), str(e)))
+            continue
+        first = seen.get(lead.phone)
+        if first is not None:
+            job.duplicates += 1
+            problems.append(_report(line, lead.phone, f"duplicate phone (row {first})"))
+            continue
+        seen[lead.phone] = line
+        batch[lead.phone] = (line, lead)
+
+    inserted = crud_lead.bulk_create_leads(db, [lead for _, lead in batch.values()], owner_id=job.owner_id)
+    for phone, (line, _) in batch.items():
+        if phone not in inserted:
+            job.duplicates += 1
+            problems.append(_report(line, phone, "phone already exists"))
+    job.inserted += len(inserted)
+    job.processed_rows += len(chunk)
+    problems.sort(key=lambda p: p["row"])
+    return problems
+
+def run_lead_import(
+    job_id: UUID,
+    path: str,
+    on_progress: Optional[Callable[[LeadImport], None]] = None,
+    remove_file: bool = False,
+) -> None:
+    """
+    Process the file of a LeadImport job in its own session, committing after every
+    batch so progress is visible while it runs. Used as a BackgroundTasks job by the
+    API and inline by app.cli.import_leads. Failures are recorded on the job.
+    """
+    db = database.SessionLocal()
+    try:
+        job = db.get(LeadImport, job_id)
+        job.status = LeadImportStatus.RUNNING
+        db.commit()
+
+        seen: Dict[str, int] = {}
+        errors = list(job.errors or [])
+        rows = read_rows(path, job.filename)
+        while True:
+            chunk = list(islice(rows, settings.LEAD_IMPORT_BATCH_SIZE))
+            if not chunk:
+                break
+            problems = import_batch(db, job, chunk, seen)
+            if len(errors) < settings.LEAD_IMPORT_MAX_ERRORS and problems:
+                errors = errors + problems[:settings.LEAD_IMPORT_MAX_ERRORS - len(errors)]
+                job.errors = errors
+            db.commit()
+            if on_progress:
+                on_progress(job)
+
+        job.status = LeadImportStatus.DONE
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if not isinstance(e, ImportFileError):
+            logger.exception("Lead import %s failed", job_id)
+        job = db.get(LeadImport, job_id)
+        if job is not None:
+            job.status = LeadImportStatus.FAILED
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+        if remove_file:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,148 @@
+"""
+Public-pool recycling job: owned leads nobody contacted for LEAD_RECYCLE_STALE_DAYS
+go back to PUBLIC_POOL with owner_id cleared (管理后台设计: 15 天未跟进自动掉回公海).
+
+The sweep is a series of short transactions, each one batched UPDATE of at most
+LEAD_RECYCLE_BATCH_SIZE rows (crud.lead.recycle_stale_leads), so no lock is held
+for longer than one batch and rows being edited concurrently are skipped.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, text
+
+from app import database
+from app.config import settings
+from app.crud import lead as crud_lead
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key: one sweep at a time across all workers and hosts
+ADVISORY_LOCK_KEY = 0x1EAD_2EC1
+
+@dataclass
+class RecycleRun:
+    started_at: datetime
+    cutoff: datetime
+    recycled: int = 0
+    batches: int = 0
+    duration_ms: float = 0.0
+    # Stopped at max_per_run; the remaining stale leads wait for the next run
+    capped: bool = False
+    # Another process was already sweeping
+    skipped: bool = False
+    error: Optional[str] = None
+
+@dataclass
+class _Totals:
+    runs: int = 0
+    recycled: int = 0
+    failures: int = 0
+    last_run: Optional[RecycleRun] = None
+    next_run_at: Optional[datetime] = None
+
+class LeadRecycler:
+    def __init__(
+        self,
+        stale_days: int,
+        batch_size: int,
+        max_per_run: int,
+        batch_pause: float = 0.0,
+        lock_timeout_ms: int = 2000,
+    ):
+        self.stale_days = stale_days
+        self.batch_size = batch_size
+        self.max_per_run = max_per_run
+        self.batch_pause = batch_pause
+        self.lock_timeout_ms = lock_timeout_ms
+        self._lock = threading.Lock()
+        self._totals = _Totals()
+
+    def run_once(self, now: Optional[datetime] = None) -> RecycleRun:
+        """One sweep on the primary. Safe to call from several processes at once."""
+        now = now or datetime.utcnow()
+        run = RecycleRun(started_at=now, cutoff=now - timedelta(days=self.stale_days))
+        start = time.perf_counter()
+        try:
+            with database.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+                postgres = lock_conn.dialect.name == "postgresql"
+                if postgres and not lock_conn.scalar(select(func.pg_try_advisory_lock(ADVISORY_LOCK_KEY))):
+                    run.skipped = True
+                else:
+                    try:
+                        self._sweep(run, postgres)
+                    finally:
+                        if postgres:
+                            lock_conn.execute(select(func.pg_advisory_unlock(ADVISORY_LOCK_KEY)))
+        except Exception as e:
+            run.error = str(e)
+            logger.exception("Lead recycling failed after %d leads", run.recycled)
+        run.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+        self._record(run)
+        if not run.skipped:
+            logger.info(
+                "Lead recycling: %d leads in %d batches, %.0f ms%s",
+                run.recycled, run.batches, run.duration_ms, " (capped)" if run.capped else "",
+            )
+        return run
+
+    def _sweep(self, run: RecycleRun, postgres: bool) -> None:
+        while run.recycled < self.max_per_run:
+            limit = min(self.batch_size, self.max_per_run - run.recycled)
+            with database.SessionLocal() as db:
+                if postgres:
+                    # Give up on a batch rather than queue behind DDL / long table locks
+                    db.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+                count = crud_lead.recycle_stale_leads(db, run.cutoff, limit)
+                db.commit()
+            run.recycled += count
+            run.batches += 1
+            if count < limit:
+                return
+            if self.batch_pause:
+                time.sleep(self.batch_pause)
+        run.capped = True
+
+    def _record(self, run: RecycleRun) -> None:
+        with self._lock:
+            self._totals.last_run = run
+            if run.skipped:
+                return
+            self._totals.runs += 1
+            self._totals.recycled += run.recycled
+            if run.error:
+                self._totals.failures += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = asdict(self._totals)
+        totals.update(
+            stale_days=self.stale_days,
+            batch_size=self.batch_size,
+            max_per_run=self.max_per_run,
+        )
+        return totals
+
+    async def run_daily(self, hour: int) -> None:
+        """Run once a day at `hour`:00 server local time until cancelled."""
+        while True:
+            now = datetime.now()
+            next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            with self._lock:
+                self._totals.next_run_at = next_run
+            await asyncio.sleep((next_run - now).total_seconds())
+            await asyncio.to_thread(self.run_once)
+
+lead_recycler = LeadRecycler(
+    stale_days=settings.LEAD_RECYCLE_STALE_DAYS,
+    batch_size=settings.LEAD_RECYCLE_BATCH_SIZE,
+    max_per_run=settings.LEAD_RECYCLE_MAX_PER_RUN,
+    batch_pause=settings.LEAD_RECYCLE_BATCH_PAUSE_SECONDS,
+)
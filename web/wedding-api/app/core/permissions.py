@@ -1,7 +1,13 @@
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from app.models.user import RoleType
-from app.models.permission import Permission, RolePermission
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Dict, FrozenSet, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.orm import Session, contains_eager
+from app.config import settings
+from app.models.user import User, UserRole, RoleType
+from app.models.permission import Permission, RolePermission, PermissionGeneration
 
 # Permission Constants
 class Permissions:
@@ -124,14 +130,231 @@ def sync_permissions(db: Session):
                     rp = RolePermission(role=role.value, permission_id=perm_map[code])
                     db.add(rp)
     
+    bump_permission_generation(db)
     db.commit()
+    role_permission_cache.invalidate()
+
+# --- Role -> Permission cache ---
+
+def get_permission_generation(db: Session) -> int:
+    """
+    Read the DB-stored permission generation (single-row PK lookup).
+    """
+    generation = db.query(PermissionGeneration.generation)\
+                   .filter(PermissionGeneration.id == 1)\
+                   .scalar()
+    return generation or 0
+
+def bump_permission_generation(db: Session) -> None:
+    """
+    Increment the permission generation inside the caller's transaction.
+    Other workers notice the new value on their next generation check.
+    """
+    updated = db.execute(
+        update(PermissionGeneration)
+        .where(PermissionGeneration.id == 1)
+        .values(generation=PermissionGeneration.generation + 1)
+    ).rowcount
+    if not updated:
+        db.add(PermissionGeneration(id=1, generation=1))
+
+class RolePermissionCache:
+    """
+    Process-wide role -> frozenset(permission codes) cache.
+
+    `version` is the DB generation the cached matrix was loaded from. The generation
+    is re-read at most once per PERMISSION_CACHE_TTL_SECONDS, so steady-state
+    permission checks cost no DB work.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version: Optional[int] = None
+        self._matrix: Optional[Dict[str, FrozenSet[str]]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the local matrix and force a generation check on next access."""
+        with self._lock:
+            self._matrix = None
+            self.version = None
+            self._checked_at = 0.0
+
+    def generation(self, db: Session) -> int:
+        self._refresh(db)
+        return self.version
+
+    def _refresh(self, db: Session) -> Dict[str, FrozenSet[str]]:
+        now = time.monotonic()
+        with self._lock:
+            matrix = self._matrix
+            if matrix is not None and now - self._checked_at < self.ttl_seconds:
+                return matrix
+
+        generation = get_permission_generation(db)
+        if matrix is None or generation != self.version:
+            results = db.query(RolePermission.role, Permission.code)\
+                        .join(Permission, RolePermission.permission_id == Permission.id)\
+                        .all()
+            loaded: Dict[str, set] = {}
+            for role, code in results:
+                loaded.setdefault(role, set()).add(code)
+            matrix = {role: frozenset(codes) for role, codes in loaded.items()}
+
+        with self._lock:
+            self._matrix = matrix
+            self.version = generation
+            self._checked_at = now
+        return matrix
+
+    def peek_many(self, roles: Iterable[str]) -> Optional[FrozenSet[str]]:
+        """
+        Merged permissions from a fresh cache, or None when the DB must be consulted.
+        Lets callers without a session skip checking out a connection.
+        """
+        with self._lock:
+            matrix = self._matrix
+            if matrix is None or time.monotonic() - self._checked_at >= self.ttl_seconds:
+                return None
+        merged = set()
+        for role in roles:
+            merged.update(matrix.get(role, ()))
+        return frozenset(merged)
+
+    def get(self, db: Session, role: str) -> FrozenSet[str]:
+        return self._refresh(db).get(role, frozenset())
+
+    def get_many(self, db: Session, roles: Iterable[str]) -> FrozenSet[str]:
+        matrix = self._refresh(db)
+        merged = set()
+        for role in roles:
+            merged.update(matrix.get(role, ()))
+        return frozenset(merged)
+
+role_permission_cache = RolePermissionCache(settings.PERMISSION_CACHE_TTL_SECONDS)
+
+# --- Per-user auth version (token claim freshness) ---
+
+def bump_user_auth_version(db: Session, user_id: UUID) -> None:
+    """
+    Invalidate the role claims of one user's outstanding tokens, inside the caller's
+    transaction. Call only when roles or is_active actually change.
+    """
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(auth_version=User.auth_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+class UserAuthVersionCache:
+    """
+    Process-wide user_id -> users.auth_version, each entry re-read at most once per
+    PERMISSION_CACHE_TTL_SECONDS (a PK lookup of one column). None: no such user.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: UUID) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None and now - entry[1] < self.ttl_seconds:
+            return entry[0]
+        version = db.query(User.auth_version).filter(User.id == user_id).scalar()
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                self._entries = {k: v for k, v in self._entries.items() if now - v[1] < self.ttl_seconds}
+            self._entries[user_id] = (version, now)
+        return version
+
+    def invalidate(self, user_id: Optional[UUID] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+user_auth_versions = UserAuthVersionCache(settings.PERMISSION_CACHE_TTL_SECONDS)
 
 def get_role_permissions(db: Session, role: RoleType) -> List[str]:
     """
-    Fetch permissions for a role from DB
+    Fetch permissions for a role (served from the process-wide cache)
+    """
+    return sorted(role_permission_cache.get(db, role.value))
+
+def get_permissions_for_roles(db: Session, roles: Iterable[str]) -> FrozenSet[str]:
+    """
+    Merged permission set of several roles. Unknown role strings are ignored.
+    """
+    valid_roles = [r for r in roles if r in RoleType._value2member_map_]
+    if not valid_roles:
+        return frozenset()
+    return role_permission_cache.get_many(db, valid_roles)
+
+@dataclass
+class Principal:
+    """
+    Request-scoped identity: the user, its role rows and merged permissions.
+    Built once per request by `deps.get_current_principal` and reused by every check.
+    """
+    user: User
+    roles: List[UserRole]
+    permissions: FrozenSet[str]
+
+    @property
+    def id(self) -> UUID:
+        return self.user.id
+
+    @property
+    def role_list(self) -> List[str]:
+        return [r.role for r in self.roles]
+
+    def has_role(self, *roles: RoleType) -> bool:
+        codes = self.role_list
+        return any(r.value in codes for r in roles)
+
+    @property
+    def is_admin_or_manager(self) -> bool:
+        return self.has_role(RoleType.ADMIN, RoleType.MANAGER)
+
+    def has_permission(self, code: str) -> bool:
+        return code in self.permissions
+
+def load_principal(db: Session, user_id: UUID) -> Optional[Principal]:
+    """
+    Load user + user_roles in one joined query; permissions come from the role cache.
+    """
+    # No LIMIT here: it would truncate the joined user_roles rows
+    users = db.query(User)\
+              .outerjoin(User.roles)\
+              .options(contains_eager(User.roles))\
+              .filter(User.id == user_id)\
+              .all()
+    if not users:
+        return None
+
+    user = users[0]
+
+    codes = get_permissions_for_roles(db, user.role_list)
+    return Principal(user=user, roles=list(user.roles), permissions=codes)
+
+def principal_from_claims(db: Session, user_id: UUID, roles: List[str]) -> Principal:
+    """
+    Build a Principal from signed token claims without querying `users`.
+    The user is a detached stand-in carrying only id, roles and is_active: username,
+    team_id etc. are None. Only endpoints that read nothing but `id` / `role_list`
+    may use the claims path (deps.get_current_reader*).
     """
-    results = db.query(Permission.code)\
-                .join(RolePermission, RolePermission.permission_id == Permission.id)\
-                .filter(RolePermission.role == role.value)\
-                .all()
-    return [r[0] for r in results]
\ No newline at end of file
+    user = User(id=user_id, is_active=True)
+    user.roles = [UserRole(user_id=user_id, role=r) for r in roles]
+    return Principal(
+        user=user,
+        roles=list(user.roles),
+        permissions=get_permissions_for_roles(db, roles),
+    )
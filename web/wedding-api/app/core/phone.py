@@ -0,0 +1,51 @@
+"""
+Phone number normalization for lead de-duplication.
+"+86 138-0000-0000", "0086 13800000000" and "13800000000" all normalize to
+"13800000000"; spreadsheet cells that arrive as numbers (13800000000.0) too.
+"""
+import re
+from typing import Any, Optional
+
+_SEPARATORS = re.compile(r"[\s\-().]")
+_COUNTRY_PREFIXES = ("+86", "0086", "86")
+
+MIN_DIGITS = 7
+MAX_DIGITS = 15
+
+def normalize_phone(raw: Any) -> Optional[str]:
+    """Digits-only form of a phone number, or None if it doesn't look like one."""
+    if raw is None:
+        return None
+    if isinstance(raw, float) and raw.is_integer():
+        raw = int(raw)
+    phone = _SEPARATORS.sub("", str(raw).strip())
+    for prefix in _COUNTRY_PREFIXES:
+        # 86 + 11-digit mainland mobile; bare "86..." only when the rest is a full mobile number
+        if phone.startswith(prefix) and (prefix != "86" or len(phone) == 13):
+            phone = phone[len(prefix):]
+            break
+    if phone.startswith("+") or not phone.isdigit():
+        return None
+    if not MIN_DIGITS <= len(phone) <= MAX_DIGITS:
+        return None
+    return phone
+
+# Same rules as normalize_phone() in SQL, for backfilling leads.phone_normalized on
+# PostgreSQL. When several leads share a normalized phone only the oldest id gets it.
+POSTGRES_BACKFILL_SQL = r"""
+UPDATE leads SET phone_normalized = t.normalized
+FROM (
+    SELECT id, normalized, row_number() OVER (PARTITION BY normalized ORDER BY id) AS rn
+    FROM (
+        SELECT id, CASE
+            WHEN s LIKE '+86%' THEN substr(s, 4)
+            WHEN s LIKE '0086%' THEN substr(s, 5)
+            WHEN s LIKE '86%' AND char_length(s) = 13 THEN substr(s, 3)
+            ELSE s
+        END AS normalized
+        FROM (SELECT id, regexp_replace(btrim(phone), '[\s\-().]', '', 'g') AS s FROM leads) raw
+    ) stripped
+    WHERE normalized ~ '^[0-9]{7,15}$'
+) t
+WHERE leads.id = t.id AND t.rn = 1
+"""
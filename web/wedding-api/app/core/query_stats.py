@@ -0,0 +1,116 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.query_stats")
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """
+    Statement text with whitespace collapsed and expanded IN lists folded,
+    so the same query with different parameters maps to one shape.
+    """
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+class QueryStats:
+    """
+    SQL statements issued while handling one request (or one capture block).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int):
+        """Shapes executed more than `threshold` times (likely N+1)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_seconds * 1000:.2f};desc="{self.count} queries"'
+
+# Set per request by QueryStatsMiddleware. Sync endpoints run in the threadpool
+# with a copy of the context, which still points at the same QueryStats object.
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Record statements issued inside the block (scripts, tests, background jobs).
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._query_stats_start = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    start = getattr(context, "_query_stats_start", None)
+    if start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware: counts statements and DB time per request, reports them in a
+    `Server-Timing` header and logs a warning when one statement shape repeats
+    more than QUERY_REPEAT_WARN_THRESHOLD times.
+    """
+    def __init__(self, app, repeat_threshold: Optional[int] = None):
+        self.app = app
+        self.repeat_threshold = (
+            settings.QUERY_REPEAT_WARN_THRESHOLD if repeat_threshold is None else repeat_threshold
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            for shape, n in stats.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Possible N+1 on %s %s: statement executed %d times: %s",
+                    scope.get("method"), scope.get("path"), n, shape[:500],
+                )
@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+class PrimaryPins:
+    """
+    Read-your-own-writes for replica routing: after a user commits a write on the
+    primary, their reads stay on the primary for `ttl_seconds` (>= replica lag).
+    Pins live in process memory, so the guarantee only holds for requests served
+    by the same worker: with several workers behind the replica, route each user
+    to one worker (sticky sessions) or accept that another worker may read stale
+    data for up to the replica lag. The sticky window should cover the worst
+    expected lag.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._until: Dict[str, float] = {}
+
+    def pin(self, user_id) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+            self._until[str(user_id)] = now + self.ttl_seconds
+
+    def is_pinned(self, user_id: Optional[object]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._until.get(str(user_id))
+        return until is not None and until > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+def _attach(pins: PrimaryPins) -> None:
+    # session.info["user_id"] is set by the auth dependencies (app.api.deps)
+    @event.listens_for(Session, "after_flush")
+    def _mark_write(session, flush_context):
+        session.info["wrote"] = True
+
+    # Core DML via session.execute(insert/update/delete) never flushes
+    # (claim_leads' UPDATE ... RETURNING, budget batch executemany, totals deltas)
+    @event.listens_for(Session, "do_orm_execute")
+    def _mark_dml(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info["wrote"] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _pin_writer(session):
+        if session.info.pop("wrote", False) and session.info.get("user_id"):
+            pins.pin(session.info["user_id"])
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard_write(session):
+        session.info.pop("wrote", None)
+
+primary_pins = PrimaryPins(settings.REPLICA_STICKY_SECONDS)
+_attach(primary_pins)
@@ -0,0 +1,43 @@
+"""
+N-gram helpers for lead keyword search (app.models.lead.LeadSearchGram).
+Names are indexed as character bigrams so 2-character Chinese names and any
+2+ character phone substring can be looked up without scanning `leads`.
+"""
+from typing import Iterable, Set
+
+GRAM_SIZE = 2
+
+# Keywords at least this long go to pg_trgm GIN indexes on PostgreSQL
+# (trigrams need 3 characters); shorter ones use the bigram side table.
+TRGM_MIN_LENGTH = 3
+
+def ngrams(text: str, n: int = GRAM_SIZE) -> Set[str]:
+    """Lower-cased character n-grams of `text`, skipping grams that contain whitespace."""
+    if not text:
+        return set()
+    s = text.lower()
+    return {
+        s[i:i + n]
+        for i in range(len(s) - n + 1)
+        if not any(c.isspace() for c in s[i:i + n])
+    }
+
+def lead_grams(values: Iterable[str]) -> Set[str]:
+    grams: Set[str] = set()
+    for value in values:
+        grams |= ngrams(value or "")
+    return grams
+
+# Same rule as ngrams() in SQL, for bulk (re)building the side table on PostgreSQL
+POSTGRES_BACKFILL_SQL = """
+INSERT INTO lead_search_grams (gram, lead_id)
+SELECT DISTINCT substr(t.s, i, 2), t.id
+FROM (
+    SELECT id, lower(customer_name) AS s FROM leads
+    UNION ALL
+    SELECT id, lower(phone) AS s FROM leads
+) t
+CROSS JOIN LATERAL generate_series(1, char_length(t.s) - 1) AS i
+WHERE substr(t.s, i, 2) !~ '\\s'
+ON CONFLICT DO NOTHING
+"""
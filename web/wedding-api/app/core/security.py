@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from uuid import UUID
 from jose import jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.schemas.token import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -12,12 +20,141 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+# --- Bounded hashing pool ---
+# bcrypt is CPU-bound; running it on the shared request threadpool lets a login
+# storm starve unrelated endpoints. It gets its own small executor instead, and
+# callers beyond the queue limit are rejected rather than piling up.
+# Callers are `async def` endpoints that await the result on the event loop, so
+# a waiting login holds no threadpool thread; their DB work goes through
+# run_in_threadpool.
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing pool is saturated (mapped to 503)."""
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+def _submit_hashing(fn, *args) -> asyncio.Future:
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    # Release on completion, not on await, so cancelled requests still hold their slot
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return asyncio.wrap_future(future)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _submit_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _submit_hashing(get_password_hash, password)
+
+def create_access_token(
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    roles: Optional[List[str]] = None,
+    generation: Optional[int] = None,
+) -> str:
+    """
+    Issue a JWT. When `roles` is given (TOKEN_PERMISSION_CLAIMS mode) the role codes
+    and the user's auth_version they were valid for are embedded as claims.
+    """
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if roles is not None:
+        to_encode["roles"] = list(roles)
+        to_encode["gen"] = generation
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+# --- Verified-token cache ---
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already verified tokens: sha256(token) -> (payload, exp).
+    Entries are dropped once `exp` passes and can be purged per user.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[TokenPayload, float]]" = OrderedDict()
+        self._by_user: Dict[UUID, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[TokenPayload]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token: str, payload: TokenPayload, exp: float) -> None:
+        if self.maxsize <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, exp)
+            self._entries.move_to_end(key)
+            if payload.sub is not None:
+                self._by_user.setdefault(payload.sub, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            for key in self._by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: str) -> None:
+        payload, _ = self._entries.pop(key)
+        keys = self._by_user.get(payload.sub)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[payload.sub]
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    Verify a JWT and return its payload, skipping signature verification for
+    tokens already seen. Raises JWTError / ValidationError on invalid tokens.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    token_data = TokenPayload(**payload)
+    if "exp" in payload:
+        token_cache.put(token, token_data, float(payload["exp"]))
+    return token_data
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.query_stats import statement_shape
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    Keep the shape of bound parameters (names, positions, types) but drop the values:
+    phone numbers and customer names must not end up in log files.
+    """
+    if isinstance(parameters, dict):
+        return {k: redact_parameters(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > 20:
+            return [redact_parameters(p) for p in parameters[:20]] + [f"... {len(parameters) - 20} more"]
+        return [redact_parameters(p) for p in parameters]
+    if parameters is None:
+        return None
+    return f"<{type(parameters).__name__}>"
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class _FingerprintStats:
+    __slots__ = ("count", "slow_count", "total", "max", "samples", "last_explained")
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.slow_count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=sample_size)
+        self.last_explained = 0.0
+
+class SlowQueryLog:
+    """
+    Times every statement on the engines it listens to.
+    - per-fingerprint counts and recent durations (for percentiles)
+    - statements slower than the threshold are written with redacted parameters and
+      an EXPLAIN plan (at most once per fingerprint per explain_interval) to a rotating file
+    """
+    def __init__(
+        self,
+        threshold_ms: float,
+        log_path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        explain: bool = True,
+        explain_interval: float = 60.0,
+        max_fingerprints: int = 1000,
+        sample_size: int = 512,
+    ):
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.max_fingerprints = max_fingerprints
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _FingerprintStats] = {}
+        self._shapes: Dict[str, str] = {}
+        self._logger: Optional[logging.Logger] = None
+
+    def listen(self, target) -> None:
+        event.listen(target, "before_cursor_execute", self._before)
+        event.listen(target, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_slow_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        fingerprint = self._fingerprint(statement)
+        slow = self.threshold_ms >= 0 and elapsed * 1000 >= self.threshold_ms
+        explain_due = False
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    return
+                stats = self._stats[fingerprint] = _FingerprintStats(self.sample_size)
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.samples.append(elapsed)
+            if slow:
+                stats.slow_count += 1
+                now = time.monotonic()
+                if self.explain and now - stats.last_explained >= self.explain_interval:
+                    stats.last_explained = now
+                    explain_due = True
+        if slow:
+            plan = self._explain(conn, statement, parameters) if explain_due and not executemany else None
+            self._write(fingerprint, elapsed, parameters, plan)
+
+    def _fingerprint(self, statement: str) -> str:
+        shape = self._shapes.get(statement)
+        if shape is None:
+            shape = statement_shape(statement)
+            if len(self._shapes) < self.max_fingerprints * 4:
+                self._shapes[statement] = shape
+        return shape
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[str]:
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        # Raw DBAPI cursor: bypasses engine events, runs on the same connection/transaction
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+        except Exception as e:
+            return f"EXPLAIN failed: {e}"
+        finally:
+            cursor.close()
+
+    def _write(self, fingerprint: str, elapsed: float, parameters, plan: Optional[str]) -> None:
+        record = {
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": fingerprint,
+            "parameters": redact_parameters(parameters),
+        }
+        if plan is not None:
+            record["plan"] = plan
+        self._get_logger().warning(json.dumps(record, ensure_ascii=False, default=str))
+
+    def _get_logger(self) -> logging.Logger:
+        # Created lazily so processes that never see a slow query never create the file
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    directory = os.path.dirname(self.log_path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    handler = RotatingFileHandler(
+                        self.log_path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(process)d %(message)s"))
+                    logger = logging.getLogger(f"app.slow_query.{id(self)}")
+                    logger.propagate = False
+                    logger.setLevel(logging.WARNING)
+                    logger.addHandler(handler)
+                    self._logger = logger
+        return self._logger
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Slowest fingerprints (by p95 of recent executions) with counts and percentiles.
+        """
+        with self._lock:
+            snapshot = [
+                (fp, s.count, s.slow_count, s.total, s.max, sorted(s.samples))
+                for fp, s in self._stats.items()
+            ]
+        rows = []
+        for fp, count, slow_count, total, max_, samples in snapshot:
+            if not samples:
+                continue
+            rows.append({
+                "fingerprint": fp,
+                "count": count,
+                "slow_count": slow_count,
+                "mean_ms": round(total / count * 1000, 3),
+                "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+                "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+                "max_ms": round(max_ * 1000, 3),
+            })
+        rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,58 @@
+"""
+AsyncSession variants of app.crud.approval
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+from app.models.approval import Approval, ApprovalStatus
+from app.schemas.approval import ApprovalCreate, ApprovalUpdate
+from app.crud.approval import APPROVAL_ORDER, approvals_query
+from app.crud.pagination import Page, page_query, make_page
+
+async def get_approval(db: AsyncSession, approval_id: UUID) -> Optional[Approval]:
+    return await db.get(Approval, approval_id)
+
+async def get_approvals(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    requester_id: Optional[UUID] = None,
+    status: Optional[ApprovalStatus] = None
+) -> List[Approval]:
+    page = await get_approvals_page(db, skip=skip, limit=limit, requester_id=requester_id, status=status)
+    return page.items
+
+async def get_approvals_page(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    requester_id: Optional[UUID] = None,
+    status: Optional[ApprovalStatus] = None
+) -> Page[Approval]:
+    query = page_query(approvals_query(requester_id, status), APPROVAL_ORDER, limit, cursor, skip)
+    return make_page((await db.scalars(query)).all(), APPROVAL_ORDER, limit, cursor)
+
+async def create_approval(db: AsyncSession, approval_in: ApprovalCreate, requester_id: UUID) -> Approval:
+    db_approval = Approval(
+        **approval_in.model_dump(),
+        requester_id=requester_id,
+        status=ApprovalStatus.PENDING
+    )
+    db.add(db_approval)
+    await db.flush()
+    return db_approval
+
+async def update_approval(
+    db: AsyncSession,
+    db_approval: Approval,
+    approval_update: ApprovalUpdate,
+    approver_id: UUID
+) -> Approval:
+    db_approval.status = approval_update.status
+    db_approval.audit_log = approval_update.audit_log
+    db_approval.approver_id = approver_id
+
+    db.add(db_approval)
+    await db.flush()
+    return db_approval
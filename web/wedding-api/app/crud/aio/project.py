@@ -0,0 +1,12 @@
+"""
+AsyncSession variant of the project access query (deps.check_project_access_async)
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from uuid import UUID
+from app.models.project import Project
+from app.crud.project import project_with_lead_query
+
+async def get_project_with_lead(db: AsyncSession, project_id: UUID) -> Optional[Project]:
+    """Project + its lead (for owner checks) in one joined SELECT."""
+    return (await db.scalars(project_with_lead_query(project_id))).first()
@@ -1,8 +1,21 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 from app.models.approval import Approval, ApprovalStatus
 from app.schemas.approval import ApprovalCreate, ApprovalUpdate
+from app.crud.pagination import Page, SortKey, page_query, make_page
+
+APPROVAL_ORDER = (SortKey(Approval.id),)
+
+def approvals_query(requester_id: Optional[UUID] = None, status: Optional[ApprovalStatus] = None):
+    """Filtered approval SELECT; shared with app.crud.aio.approval."""
+    query = select(Approval)
+    if requester_id:
+        query = query.where(Approval.requester_id == requester_id)
+    if status:
+        query = query.where(Approval.status == status)
+    return query
 
 def get_approval(db: Session, approval_id: UUID) -> Optional[Approval]:
     return db.query(Approval).filter(Approval.id == approval_id).first()
@@ -14,12 +27,18 @@ def get_approvals(
     requester_id: Optional[UUID] = None,
     status: Optional[ApprovalStatus] = None
 ) -> List[Approval]:
-    query = db.query(Approval)
-    if requester_id:
-        query = query.filter(Approval.requester_id == requester_id)
-    if status:
-        query = query.filter(Approval.status == status)
-    return query.offset(skip).limit(limit).all()
+    return get_approvals_page(db, skip=skip, limit=limit, requester_id=requester_id, status=status).items
+
+def get_approvals_page(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    requester_id: Optional[UUID] = None,
+    status: Optional[ApprovalStatus] = None
+) -> Page[Approval]:
+    query = page_query(approvals_query(requester_id, status), APPROVAL_ORDER, limit, cursor, skip)
+    return make_page(db.scalars(query).all(), APPROVAL_ORDER, limit, cursor)
 
 def create_approval(db: Session, approval_in: ApprovalCreate, requester_id: UUID) -> Approval:
     db_approval = Approval(
@@ -28,8 +47,7 @@ def create_approval(db: Session, approval_in: ApprovalCreate, requester_id: UUID
         status=ApprovalStatus.PENDING
     )
     db.add(db_approval)
-    db.commit()
-    db.refresh(db_approval)
+    db.flush()
     return db_approval
 
 def update_approval(
@@ -43,6 +61,5 @@ def update_approval(
     db_approval.approver_id = approver_id
     
     db.add(db_approval)
-    db.commit()
-    db.refresh(db_approval)
+    db.flush()
     return db_approval
@@ -1,32 +1,278 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from decimal import Decimal, ROUND_HALF_UP
+import uuid
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session, contains_eager
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 from app.models.budget import BudgetItem
+from app.models.project import Project
 from app.schemas.budget import BudgetItemCreate, BudgetItemUpdate
 
 def get_budget_items(db: Session, project_id: UUID) -> List[BudgetItem]:
     return db.query(BudgetItem).filter(BudgetItem.project_id == project_id).all()
 
+def get_budget_item_rows(
+    db: Session, project_id: UUID, include_cost: bool = False, item_ids: Optional[Sequence[UUID]] = None
+) -> List[Tuple]:
+    """
+    Item columns as plain row tuples (no ORM instances), in the field order of
+    BudgetItemResponse; cost_price is appended only when `include_cost`.
+    `item_ids` limits the rows to those items, returned in that order.
+    """
+    columns = [
+        BudgetItem.category, BudgetItem.name, BudgetItem.quantity, BudgetItem.unit_price,
+        BudgetItem.id, BudgetItem.project_id,
+    ]
+    if include_cost:
+        columns.append(BudgetItem.cost_price)
+    query = select(*columns).where(BudgetItem.project_id == project_id)
+    if item_ids is None:
+        return db.execute(query).all()
+    if not item_ids:
+        return []
+    rows = {row.id: row for row in db.execute(query.where(BudgetItem.id.in_(item_ids)))}
+    return [rows[item_id] for item_id in item_ids if item_id in rows]
+
 def get_budget_item(db: Session, item_id: UUID) -> Optional[BudgetItem]:
     return db.query(BudgetItem).filter(BudgetItem.id == item_id).first()
 
+def get_budget_item_with_project(db: Session, item_id: UUID, for_update: bool = False) -> Optional[BudgetItem]:
+    """
+    Item + project + lead (for owner checks) in one joined SELECT. `for_update`
+    locks the item row (only that row) for a write that derives a totals delta from it.
+    """
+    query = db.query(BudgetItem)\
+              .join(BudgetItem.project)\
+              .join(Project.lead)\
+              .options(contains_eager(BudgetItem.project).contains_eager(Project.lead))\
+              .filter(BudgetItem.id == item_id)
+    if for_update:
+        query = query.with_for_update(of=BudgetItem).populate_existing()
+    return query.first()
+
+# --- Project budget totals (Project.budget_*) ---
+# Every write below adjusts the project's totals by the item's difference with an
+# UPDATE ... SET total = total + delta in the same transaction. Concurrent writers
+# queue on the project row instead of overwriting each other's sums. The delta is
+# computed from the item's old values, so updated/deleted items must be loaded with
+# their row locked (for_update=True): otherwise two edits of the same item would
+# both subtract the same old value.
+
+CENT = Decimal("0.01")
+
+def _money(value) -> Decimal:
+    # Numeric(10, 2) rounding of what gets stored (floats come from the schemas)
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def _line_totals(quantity, unit_price, cost_price) -> Tuple[Decimal, Decimal]:
+    quantity = quantity or 0
+    return _money(unit_price) * quantity, _money(cost_price) * quantity
+
+def item_totals(item) -> Tuple[Decimal, Decimal]:
+    # BudgetItem instance or a row dict of the same fields
+    if isinstance(item, dict):
+        return _line_totals(item["quantity"], item["unit_price"], item["cost_price"])
+    return _line_totals(item.quantity, item.unit_price, item.cost_price)
+
+def project_totals_delta(project_id: UUID, count: int, sale: Decimal, cost: Decimal):
+    """The UPDATE adding a delta to a project's totals; None when there is nothing to add."""
+    if not (count or sale or cost):
+        return None
+    return (
+        update(Project)
+        .where(Project.id == project_id)
+        .values(
+            budget_item_count=Project.budget_item_count + count,
+            budget_sale_total=Project.budget_sale_total + sale,
+            budget_cost_total=Project.budget_cost_total + cost,
+            budget_gross_profit=Project.budget_gross_profit + (sale - cost),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+
+def _adjust_project_totals(db: Session, project_id: UUID, count: int, sale: Decimal, cost: Decimal) -> None:
+    stmt = project_totals_delta(project_id, count, sale, cost)
+    if stmt is not None:
+        db.execute(stmt)
+
 def create_budget_item(db: Session, item_in: BudgetItemCreate) -> BudgetItem:
     db_item = BudgetItem(**item_in.model_dump())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    db.flush()
+    sale, cost = item_totals(db_item)
+    _adjust_project_totals(db, db_item.project_id, 1, sale, cost)
     return db_item
 
 def update_budget_item(db: Session, db_item: BudgetItem, item_update: BudgetItemUpdate) -> BudgetItem:
+    old_sale, old_cost = item_totals(db_item)
     update_data = item_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_item, key, value)
     
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    db.flush()
+    sale, cost = item_totals(db_item)
+    _adjust_project_totals(db, db_item.project_id, 0, sale - old_sale, cost - old_cost)
     return db_item
 
 def delete_budget_item(db: Session, db_item: BudgetItem) -> None:
+    sale, cost = item_totals(db_item)
     db.delete(db_item)
-    db.commit()
+    db.flush()
+    _adjust_project_totals(db, db_item.project_id, -1, -sale, -cost)
+
+# --- Summary ---
+
+PERCENT = Decimal("0.01")
+
+def margin_percent(sale: Decimal, profit: Decimal) -> Optional[Decimal]:
+    if not sale:
+        return None
+    return (profit * 100 / sale).quantize(PERCENT, rounding=ROUND_HALF_UP)
+
+def get_budget_summary(db: Session, project_id: UUID) -> Dict:
+    """
+    Per-category subtotals computed by the database (SUM ... GROUP BY category),
+    plus grand totals and margins, all as Decimal. Not role-masked: the endpoint
+    picks the schema.
+    """
+    rows = db.execute(
+        select(
+            BudgetItem.category,
+            func.count(),
+            func.coalesce(func.sum(BudgetItem.unit_price * BudgetItem.quantity), 0),
+            func.coalesce(func.sum(BudgetItem.cost_price * BudgetItem.quantity), 0),
+        )
+        .where(BudgetItem.project_id == project_id)
+        .group_by(BudgetItem.category)
+        .order_by(BudgetItem.category)
+    ).all()
+
+    categories = []
+    for category, count, sale, cost in rows:
+        # Quantize: SQLite hands back sums of Numeric columns as floats
+        sale, cost = Decimal(str(sale)).quantize(CENT), Decimal(str(cost)).quantize(CENT)
+        categories.append({
+            "category": category,
+            "item_count": count,
+            "total_sale_price": sale,
+            "total_cost_price": cost,
+            "gross_profit": sale - cost,
+            "margin_percent": margin_percent(sale, sale - cost),
+        })
+    # Sums of exact Decimals: the grand totals need no second query
+    sale = sum((c["total_sale_price"] for c in categories), Decimal("0.00"))
+    cost = sum((c["total_cost_price"] for c in categories), Decimal("0.00"))
+    return {
+        "project_id": project_id,
+        "item_count": sum(c["item_count"] for c in categories),
+        "total_sale_price": sale,
+        "total_cost_price": cost,
+        "gross_profit": sale - cost,
+        "margin_percent": margin_percent(sale, sale - cost),
+        "categories": categories,
+    }
+
+# --- Batch writes (报价单自动保存) ---
+
+BATCH_FIELDS = ("category", "name", "quantity", "unit_price", "cost_price")
+
+def get_project_items_by_ids(
+    db: Session, project_id: UUID, item_ids: Sequence[UUID], for_update: bool = False
+) -> Dict[UUID, BudgetItem]:
+    """
+    The given items of one project in a single SELECT; ids of other projects are left
+    out. `for_update` locks them (in id order, so overlapping batches can't deadlock).
+    """
+    if not item_ids:
+        return {}
+    query = db.query(BudgetItem)\
+              .filter(BudgetItem.project_id == project_id, BudgetItem.id.in_(item_ids))
+    if for_update:
+        query = query.order_by(BudgetItem.id).with_for_update().populate_existing()
+    return {item.id: item for item in query.all()}
+
+def apply_budget_batch(
+    db: Session,
+    project_id: UUID,
+    creates: Sequence[BudgetItemCreate],
+    updates: Sequence[Tuple[BudgetItem, BudgetItemUpdate]],
+    deletes: Sequence[BudgetItem],
+) -> Tuple[List[UUID], List[UUID], List[UUID]]:
+    """
+    Apply an editor batch for one project with at most one INSERT, one executemany
+    UPDATE and one DELETE, plus a single adjustment of the project totals.
+    Permission and lock checks are the caller's, as is loading `updates` / `deletes`
+    with get_project_items_by_ids(..., for_update=True). Returns (created, updated, deleted) ids.
+    Updated/deleted ORM instances are not refreshed; reload them if needed.
+    """
+    count, sale, cost = 0, Decimal(0), Decimal(0)
+
+    new_rows = [{**item_in.model_dump(), "id": uuid.uuid4()} for item_in in creates]
+    for row in new_rows:
+        line_sale, line_cost = item_totals(row)
+        count, sale, cost = count + 1, sale + line_sale, cost + line_cost
+    if new_rows:
+        db.execute(insert(BudgetItem), new_rows)
+
+    changed_rows = []
+    for db_item, item_update in updates:
+        changes = item_update.model_dump(exclude_unset=True)
+        if not changes:
+            continue
+        # Same keys on every row so the UPDATE runs as one executemany
+        row = {"id": db_item.id, **{f: changes.get(f, getattr(db_item, f)) for f in BATCH_FIELDS}}
+        old_sale, old_cost = item_totals(db_item)
+        new_sale, new_cost = item_totals(row)
+        sale, cost = sale + new_sale - old_sale, cost + new_cost - old_cost
+        changed_rows.append(row)
+    if changed_rows:
+        db.execute(update(BudgetItem), changed_rows)
+
+    deleted_ids = [db_item.id for db_item in deletes]
+    for db_item in deletes:
+        line_sale, line_cost = item_totals(db_item)
+        count, sale, cost = count - 1, sale - line_sale, cost - line_cost
+    if deleted_ids:
+        db.execute(
+            delete(BudgetItem).where(BudgetItem.id.in_(deleted_ids)).execution_options(synchronize_session=False)
+        )
+
+    _adjust_project_totals(db, project_id, count, sale, cost)
+    return [row["id"] for row in new_rows], [row["id"] for row in changed_rows], deleted_ids
+
+def repair_budget_totals(db: Session, project_ids: Sequence[UUID]) -> int:
+    """
+    Recompute the totals of `project_ids` from their items with one UPDATE, touching
+    only projects whose stored totals drifted. Returns the number of projects fixed.
+    """
+    if not project_ids:
+        return 0
+    items = select(BudgetItem).where(BudgetItem.project_id == Project.id)
+    count = items.with_only_columns(func.count()).scalar_subquery()
+    sale = items.with_only_columns(
+        func.coalesce(func.sum(BudgetItem.unit_price * BudgetItem.quantity), 0)
+    ).scalar_subquery()
+    cost = items.with_only_columns(
+        func.coalesce(func.sum(BudgetItem.cost_price * BudgetItem.quantity), 0)
+    ).scalar_subquery()
+    result = db.execute(
+        update(Project)
+        .where(
+            Project.id.in_(project_ids),
+            or_(
+                Project.budget_item_count != count,
+                Project.budget_sale_total != sale,
+                Project.budget_cost_total != cost,
+                Project.budget_gross_profit != sale - cost,
+            ),
+        )
+        .values(
+            budget_item_count=count,
+            budget_sale_total=sale,
+            budget_cost_total=cost,
+            budget_gross_profit=sale - cost,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -1,23 +1,71 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from sqlalchemy import select, update, func, case, text, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 from uuid import UUID
-from app.models.lead import Lead, LeadStatus
+from app.core.bloom import phone_bloom
+from app.core.phone import normalize_phone
+from app.core.search import ngrams, lead_grams, TRGM_MIN_LENGTH
+from app.models.lead import Lead, LeadStatus, LeadSearchGram
+from app.crud.pagination import Page, SortKey, paginate, page_query, make_page
+from app.config import settings
 from app.schemas.lead import LeadCreate, LeadUpdate
 
+def keyword_filter(keyword: str, dialect_name: str):
+    """
+    Substring match on customer_name or phone.
+    - PostgreSQL, keyword >= 3 chars: plain ILIKE, served by the pg_trgm GIN indexes
+    - otherwise: candidates from the bigram side table (every gram must match),
+      re-checked with ILIKE; single characters fall back to ILIKE alone
+    """
+    keyword = keyword.strip()
+    substring = Lead.customer_name.ilike(f"%{keyword}%") | Lead.phone.ilike(f"%{keyword}%")
+    if dialect_name == "postgresql" and len(keyword) >= TRGM_MIN_LENGTH:
+        return substring
+    grams = ngrams(keyword)
+    if not grams:
+        return substring
+    candidates = select(LeadSearchGram.lead_id)\
+        .where(LeadSearchGram.gram.in_(grams))\
+        .group_by(LeadSearchGram.lead_id)\
+        .having(func.count() == len(grams))
+    return Lead.id.in_(candidates) & substring
+
 def get_lead(db: Session, lead_id: UUID) -> Optional[Lead]:
     return db.query(Lead).filter(Lead.id == lead_id).first()
 
 def get_lead_by_phone(db: Session, phone: str) -> Optional[Lead]:
-    return db.query(Lead).filter(Lead.phone == phone).first()
+    """
+    Lead with the same phone in any notation ("+86 138-0000-0000" == "13800000000"),
+    looked up on the unique phone_normalized index. Phones that don't normalize
+    fall back to an exact match.
+    """
+    normalized = normalize_phone(phone)
+    if normalized is None:
+        return db.query(Lead).filter(Lead.phone == phone).first()
+    if not phone_bloom.might_exist(db, normalized):
+        return None
+    return db.query(Lead).filter(Lead.phone_normalized == normalized).first()
 
-def get_leads(
-    db: Session, 
-    skip: int = 0, 
-    limit: int = 100, 
+def existing_phones(db: Session, phones: Sequence[str]) -> Set[str]:
+    """The normalized `phones` that already belong to a lead, one IN query for the bloom filter's maybes."""
+    candidates = [p for p in phones if phone_bloom.might_exist(db, p)]
+    if not candidates:
+        return set()
+    return set(db.scalars(select(Lead.phone_normalized).where(Lead.phone_normalized.in_(candidates))))
+
+# Stable, unique sort key for pagination (leads have no creation timestamp)
+LEAD_ORDER = (SortKey(Lead.id),)
+
+def _leads_query(
+    db: Session,
     owner_id: Optional[UUID] = None,
     status: Optional[str] = None,
     keyword: Optional[str] = None
-) -> List[Lead]:
+):
     query = db.query(Lead)
     if owner_id:
         query = query.filter(Lead.owner_id == owner_id)
@@ -25,9 +73,29 @@ def get_leads(
         query = query.filter(Lead.status == status)
     if keyword:
         # Search in customer_name or phone
-        query = query.filter((Lead.customer_name.ilike(f"%{keyword}%")) | (Lead.phone.ilike(f"%{keyword}%")))
-        
-    return query.offset(skip).limit(limit).all()
+        query = query.filter(keyword_filter(keyword, db.get_bind().dialect.name))
+    return query
+
+def get_leads(
+    db: Session, 
+    skip: int = 0, 
+    limit: int = 100, 
+    owner_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    keyword: Optional[str] = None
+) -> List[Lead]:
+    return get_leads_page(db, skip=skip, limit=limit, owner_id=owner_id, status=status, keyword=keyword).items
+
+def get_leads_page(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    owner_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    keyword: Optional[str] = None
+) -> Page[Lead]:
+    return paginate(_leads_query(db, owner_id, status, keyword), LEAD_ORDER, limit, cursor, skip)
 
 def count_leads(
     db: Session,
@@ -35,14 +103,88 @@ def count_leads(
     status: Optional[str] = None,
     keyword: Optional[str] = None
 ) -> int:
-    query = db.query(Lead)
+    return _leads_query(db, owner_id, status, keyword).count()
+
+@dataclass
+class LeadList:
+    page: Page[Lead]
+    total: int
+    # LeadStatus value -> count, ignoring the status filter (one entry per status tab)
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    estimated: bool = False
+
+def get_leads_with_counts(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    owner_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    keyword: Optional[str] = None,
+    estimate: bool = False
+) -> LeadList:
+    """
+    Page + total + per-status counts in one statement:
+    a single aggregate over the filtered leads (one SUM(CASE) per status, status
+    filter not applied) LEFT JOINed to the page subquery.
+
+    estimate=True on an unfiltered list of a PostgreSQL table bigger than
+    LEAD_COUNT_ESTIMATE_THRESHOLD reads the counts from planner statistics
+    (pg_class.reltuples, pg_stats most-common values) instead of counting.
+    """
+    unfiltered = not (owner_id or status or keyword)
+    if estimate and unfiltered:
+        estimated = _estimated_status_counts(db)
+        if estimated is not None:
+            page = paginate(_leads_query(db), LEAD_ORDER, limit, cursor, skip)
+            total, status_counts = estimated
+            return LeadList(page=page, total=total, status_counts=status_counts, estimated=True)
+
+    base = select(Lead)
     if owner_id:
-        query = query.filter(Lead.owner_id == owner_id)
-    if status:
-        query = query.filter(Lead.status == status)
+        base = base.where(Lead.owner_id == owner_id)
     if keyword:
-        query = query.filter((Lead.customer_name.ilike(f"%{keyword}%")) | (Lead.phone.ilike(f"%{keyword}%")))
-    return query.count()
+        base = base.where(keyword_filter(keyword, db.get_bind().dialect.name))
+    paged = base.where(Lead.status == status) if status else base
+
+    facets = base.with_only_columns(
+        *[func.coalesce(func.sum(case((Lead.status == s, 1), else_=0)), 0).label(s.value) for s in LeadStatus]
+    ).subquery("facets")
+    page_subq = page_query(paged, LEAD_ORDER, limit, cursor, skip).subquery("page")
+    page_lead = aliased(Lead, page_subq)
+    stmt = select(facets, page_lead)\
+        .select_from(facets)\
+        .outerjoin(page_subq, true())\
+        .order_by(*[
+            getattr(page_lead, k.column.key).desc() if k.descending else getattr(page_lead, k.column.key).asc()
+            for k in LEAD_ORDER
+        ])
+    rows = db.execute(stmt).all()
+
+    status_counts = {s.value: int(rows[0]._mapping[s.value]) for s in LeadStatus}
+    leads = [row[-1] for row in rows if row[-1] is not None]
+    total = status_counts.get(str(getattr(status, "value", status)), 0) if status else sum(status_counts.values())
+    return LeadList(page=make_page(leads, LEAD_ORDER, limit, cursor), total=total, status_counts=status_counts)
+
+def _estimated_status_counts(db: Session) -> Optional[Tuple[int, Dict[str, int]]]:
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    row = db.execute(text("""
+        SELECT c.reltuples, s.most_common_vals::text::text[], s.most_common_freqs
+        FROM pg_class c
+        LEFT JOIN pg_stats s
+               ON s.schemaname = current_schema() AND s.tablename = 'leads' AND s.attname = 'status'
+        WHERE c.oid = 'leads'::regclass
+    """)).first()
+    # reltuples is -1 (PG14+) or 0 before the first ANALYZE
+    if row is None or row[0] < settings.LEAD_COUNT_ESTIMATE_THRESHOLD:
+        return None
+    reltuples, values, freqs = row
+    counts = {s.value: 0 for s in LeadStatus}
+    for value, freq in zip(values or [], freqs or []):
+        if value in counts:
+            counts[value] = int(round(reltuples * freq))
+    return int(reltuples), counts
 
 def create_lead(db: Session, lead: LeadCreate, owner_id: Optional[UUID] = None) -> Lead:
     db_lead = Lead(
@@ -51,22 +193,130 @@ def create_lead(db: Session, lead: LeadCreate, owner_id: Optional[UUID] = None)
         status=LeadStatus.NEW if owner_id else LeadStatus.PUBLIC_POOL
     )
     db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
+    db.flush()
+    phone_bloom.add([db_lead.phone_normalized])
     return db_lead
 
+# Dialects with INSERT ... ON CONFLICT DO NOTHING ... RETURNING
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def bulk_create_leads(db: Session, leads: Sequence[LeadCreate], owner_id: Optional[UUID] = None) -> Set[str]:
+    """
+    Insert a batch of leads (phones already normalized and unique within the batch),
+    skipping phones that already exist. Returns the phones that were inserted.
+    Core statements: no per-row ORM flush, so the search grams are written here too.
+    """
+    if not leads:
+        return set()
+    status = LeadStatus.NEW if owner_id else LeadStatus.PUBLIC_POOL
+    # Core insert skips the ORM events: start the recycle clock here (see app.models.lead)
+    last_contact_at = datetime.utcnow() if owner_id else None
+    rows = [
+        {
+            **lead.model_dump(), "phone_normalized": normalize_phone(lead.phone),
+            "id": uuid.uuid4(), "owner_id": owner_id, "status": status,
+            "last_contact_at": last_contact_at,
+        }
+        for lead in leads
+    ]
+    table = Lead.__table__
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is not None:
+        # One statement per batch; ON CONFLICT (either unique phone index) also
+        # covers leads created concurrently
+        stmt = insert(table).on_conflict_do_nothing()\
+            .returning(table.c.id, table.c.customer_name, table.c.phone)
+        inserted = db.execute(stmt, rows).all()
+    else:
+        taken = existing_phones(db, [r["phone_normalized"] for r in rows if r["phone_normalized"]])
+        rows = [r for r in rows if r["phone_normalized"] not in taken]
+        if rows:
+            db.execute(table.insert(), rows)
+        inserted = [(r["id"], r["customer_name"], r["phone"]) for r in rows]
+    phone_bloom.add(r["phone_normalized"] for r in rows)
+
+    grams = [
+        {"gram": gram, "lead_id": lead_id}
+        for lead_id, customer_name, phone in inserted
+        for gram in lead_grams((customer_name, phone))
+    ]
+    if grams:
+        db.execute(LeadSearchGram.__table__.insert(), grams)
+    return {phone for _, _, phone in inserted}
+
+# Owned leads still being worked on; WON/LOST stay with their owner
+RECYCLABLE_STATUSES = (LeadStatus.NEW, LeadStatus.CONTACTING, LeadStatus.VISITED, LeadStatus.INTENTIONAL)
+
+def recycle_stale_leads(db: Session, cutoff: datetime, limit: int) -> int:
+    """
+    Move up to `limit` owned leads last contacted before `cutoff` to the public pool
+    with one UPDATE (served by ix_leads_status_last_contact_at). On PostgreSQL rows
+    locked by a concurrent edit are skipped, never waited for. Returns the row count.
+    Owned leads that were never contacted count from their assignment: last_contact_at
+    is set on insert / reassignment (ORM events, bulk import, claims).
+    """
+    stale = (
+        Lead.owner_id.isnot(None),
+        Lead.status.in_(RECYCLABLE_STATUSES),
+        Lead.last_contact_at < cutoff,
+    )
+    batch = select(Lead.id).where(*stale).limit(limit).with_for_update(skip_locked=True)
+    result = db.execute(
+        update(Lead)
+        .where(Lead.id.in_(batch.scalar_subquery()), *stale)
+        .values(owner_id=None, status=LeadStatus.PUBLIC_POOL)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+# --- Public pool claims ---
+# Each claim is one conditional UPDATE ... RETURNING: the pool condition is
+# re-checked on the row itself, so two planners can never both get a lead.
+
+def _in_pool():
+    return (Lead.status == LeadStatus.PUBLIC_POOL, Lead.owner_id.is_(None))
+
+def _claim(db: Session, owner_id: UUID, *where) -> List[Lead]:
+    stmt = update(Lead)\
+        .where(*where)\
+        .values(owner_id=owner_id, status=LeadStatus.CONTACTING, last_contact_at=datetime.utcnow())\
+        .returning(Lead)
+    return list(db.scalars(stmt))
+
+def claim_leads(db: Session, owner_id: UUID, limit: int) -> List[Lead]:
+    """
+    Take up to `limit` leads from the public pool. SKIP LOCKED (PostgreSQL) makes
+    concurrent claimers lock different rows instead of queueing on the same ones.
+    """
+    batch = select(Lead.id).where(*_in_pool()).limit(limit).with_for_update(skip_locked=True)
+    return _claim(db, owner_id, Lead.id.in_(batch.scalar_subquery()), *_in_pool())
+
+def claim_lead(db: Session, lead_id: UUID, owner_id: UUID) -> Optional[Lead]:
+    """Claim one lead; None if it isn't (or is no longer) in the public pool."""
+    claimed = _claim(db, owner_id, Lead.id == lead_id, *_in_pool())
+    return claimed[0] if claimed else None
+
 def update_lead(db: Session, db_lead: Lead, lead_update: LeadUpdate) -> Lead:
     update_data = lead_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_lead, key, value)
     
     db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
+    db.flush()
+    if "phone" in update_data:
+        phone_bloom.add([db_lead.phone_normalized])
+    return db_lead
+
+def record_follow_up(db: Session, db_lead: Lead, status: Optional[LeadStatus] = None) -> Lead:
+    """The owner contacted the customer: restarts the recycle clock, optionally moving the status on."""
+    db_lead.last_contact_at = datetime.utcnow()
+    if status is not None:
+        db_lead.status = status
+    db.flush()
     return db_lead
 
 def delete_lead(db: Session, lead_id: UUID) -> None:
     db_lead = db.query(Lead).filter(Lead.id == lead_id).first()
     if db_lead:
         db.delete(db_lead)
-        db.commit()
+        db.flush()
@@ -0,0 +1,118 @@
+"""
+Shared pagination for list queries: legacy offset mode and opt-in keyset (cursor) mode.
+
+Cursor mode orders by a fixed, unique sort key and continues strictly after the
+last row of the previous page, so deep pages cost the same as the first one and
+concurrent inserts don't shift rows between pages. Cursors are opaque
+(base64-encoded sort key values of the last row).
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import and_, or_, tuple_
+
+T = TypeVar("T")
+
+class InvalidCursor(ValueError):
+    """The cursor can't be decoded for this list (mapped to HTTP 400 in app.main)."""
+
+@dataclass(frozen=True)
+class SortKey:
+    column: Any
+    descending: bool = False
+
+    def ordered(self):
+        return self.column.desc() if self.descending else self.column.asc()
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    # None when there is no further page, or in offset mode
+    next_cursor: Optional[str] = None
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):  # enum
+        return value.value
+    return value
+
+def _from_json(value: Any, column) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+def encode_cursor(row: Any, keys: Sequence[SortKey]) -> str:
+    values = [_to_json(getattr(row, key.column.key)) for key in keys]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("sort key mismatch")
+        return [_from_json(v, key.column) for v, key in zip(values, keys)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """Rows strictly after `values` in the order defined by `keys`."""
+    if len(keys) == 1:
+        key = keys[0]
+        return key.column < values[0] if key.descending else key.column > values[0]
+    if len({k.descending for k in keys}) == 1:
+        # Uniform direction: a single row-value comparison (index friendly on PostgreSQL)
+        left = tuple_(*(k.column for k in keys))
+        right = tuple(values)
+        return left < right if keys[0].descending else left > right
+    clauses = []
+    for i, key in enumerate(keys):
+        step = key.column < values[i] if key.descending else key.column > values[i]
+        clauses.append(and_(*(keys[j].column == values[j] for j in range(i)), step))
+    return or_(*clauses)
+
+def page_query(query, keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None, skip: int = 0):
+    """
+    Apply ordering and the page window to a Query or Select.
+    cursor=None: offset mode (skip/limit). cursor="" starts cursor mode from the
+    beginning; any other value continues after that cursor. In cursor mode one
+    extra row is fetched to detect whether a next page exists.
+    """
+    query = query.order_by(*(k.ordered() for k in keys))
+    if cursor is None:
+        return query.offset(skip).limit(limit)
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+    return query.limit(limit + 1)
+
+def make_page(rows: Sequence[T], keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None) -> Page[T]:
+    rows = list(rows)
+    if cursor is None or len(rows) <= limit:
+        return Page(items=rows)
+    rows = rows[:limit]
+    return Page(items=rows, next_cursor=encode_cursor(rows[-1], keys))
+
+def paginate(query, keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None, skip: int = 0) -> Page:
+    """Run a legacy `db.query(...)` through page_query/make_page."""
+    return make_page(page_query(query, keys, limit, cursor, skip).all(), keys, limit, cursor)
@@ -1,13 +1,49 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from typing import List, Optional
 from uuid import UUID
 from app.models.project import Project
 from app.models.lead import Lead, LeadStatus
+from app.models.approval import Approval, ApprovalStatus
+from app.models.proposal import Proposal
 from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.crud.pagination import Page, SortKey, paginate
+
+PROJECT_ORDER = (SortKey(Project.id),)
 
 def get_project(db: Session, project_id: UUID) -> Optional[Project]:
     return db.query(Project).filter(Project.id == project_id).first()
 
+def project_with_lead_query(project_id: UUID):
+    """Project + its lead (for owner checks) in one joined SELECT; shared with app.crud.aio."""
+    return select(Project)\
+        .join(Project.lead)\
+        .options(contains_eager(Project.lead))\
+        .where(Project.id == project_id)
+
+def get_project_with_lead(db: Session, project_id: UUID) -> Optional[Project]:
+    return db.scalars(project_with_lead_query(project_id)).first()
+
+def get_project_detail(db: Session, project_id: UUID) -> Optional[Project]:
+    """
+    Project + lead (joined) with proposals (without their JSON working copy) and
+    pending approvals: 3 SELECTs however many children. Budget totals are the
+    denormalized Project.budget_* columns. `project.approvals` only holds the
+    PENDING ones.
+    """
+    return db.query(Project)\
+             .join(Project.lead)\
+             .options(
+                 contains_eager(Project.lead),
+                 selectinload(Project.proposals).load_only(
+                     Proposal.id, Proposal.name, Proposal.status, Proposal.created_by,
+                     Proposal.created_at, Proposal.updated_at,
+                 ),
+                 selectinload(Project.approvals.and_(Approval.status == ApprovalStatus.PENDING)),
+             )\
+             .filter(Project.id == project_id)\
+             .first()
+
 def get_project_by_lead(db: Session, lead_id: UUID) -> Optional[Project]:
     return db.query(Project).filter(Project.lead_id == lead_id).first()
 
@@ -17,11 +53,20 @@ def get_projects(
     limit: int = 100, 
     owner_id: Optional[UUID] = None
 ) -> List[Project]:
+    return get_projects_page(db, skip=skip, limit=limit, owner_id=owner_id).items
+
+def get_projects_page(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    owner_id: Optional[UUID] = None
+) -> Page[Project]:
     query = db.query(Project)
     if owner_id:
         # Join with Lead to filter by owner
         query = query.join(Lead).filter(Lead.owner_id == owner_id)
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, PROJECT_ORDER, limit, cursor, skip)
 
 def create_project(db: Session, project_in: ProjectCreate) -> Project:
     # 1. Create Project
@@ -39,8 +84,7 @@ def create_project(db: Session, project_in: ProjectCreate) -> Project:
         lead.status = LeadStatus.WON
         db.add(lead)
         
-    db.commit()
-    db.refresh(db_project)
+    db.flush()
     return db_project
 
 def update_project(db: Session, db_project: Project, project_update: ProjectUpdate) -> Project:
@@ -49,6 +93,5 @@ def update_project(db: Session, db_project: Project, project_update: ProjectUpda
         setattr(db_project, key, value)
     
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    db.flush()
     return db_project
@@ -1,14 +1,28 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional
 from uuid import UUID
+from app.models.project import Project
 from app.models.proposal import Proposal, ProposalVersion, ProposalStatus, VersionChangeType
 from app.schemas.proposal import ProposalCreate, ProposalUpdate, ProposalVersionCreate
+from app.crud.pagination import Page, SortKey, paginate
+
+# Newest first; id breaks ties between versions saved in the same instant
+VERSION_ORDER = (SortKey(ProposalVersion.created_at, descending=True), SortKey(ProposalVersion.id, descending=True))
 
 # --- Proposal CRUD ---
 
 def get_proposal(db: Session, proposal_id: UUID) -> Optional[Proposal]:
     return db.query(Proposal).filter(Proposal.id == proposal_id).first()
 
+def get_proposal_with_project(db: Session, proposal_id: UUID) -> Optional[Proposal]:
+    """Proposal + project + lead (for owner checks) in one joined SELECT."""
+    return db.query(Proposal)\
+             .join(Proposal.project)\
+             .join(Project.lead)\
+             .options(contains_eager(Proposal.project).contains_eager(Project.lead))\
+             .filter(Proposal.id == proposal_id)\
+             .first()
+
 def get_proposals_by_project(db: Session, project_id: UUID) -> List[Proposal]:
     return db.query(Proposal).filter(Proposal.project_id == project_id).all()
 
@@ -20,8 +34,7 @@ def create_proposal(db: Session, proposal_in: ProposalCreate, creator_id: UUID)
         current_data={}
     )
     db.add(db_proposal)
-    db.commit()
-    db.refresh(db_proposal)
+    db.flush()
     return db_proposal
 
 def update_proposal(db: Session, db_proposal: Proposal, proposal_update: ProposalUpdate) -> Proposal:
@@ -30,8 +43,7 @@ def update_proposal(db: Session, db_proposal: Proposal, proposal_update: Proposa
         setattr(db_proposal, key, value)
     
     db.add(db_proposal)
-    db.commit()
-    db.refresh(db_proposal)
+    db.flush()
     return db_proposal
 
 # --- Version CRUD ---
@@ -40,11 +52,35 @@ def get_version(db: Session, version_id: UUID) -> Optional[ProposalVersion]:
     return db.query(ProposalVersion).filter(ProposalVersion.id == version_id).first()
 
 def get_versions(db: Session, proposal_id: UUID, skip: int = 0, limit: int = 100) -> List[ProposalVersion]:
-    return db.query(ProposalVersion).filter(
-        ProposalVersion.proposal_id == proposal_id
-    ).order_by(
-        ProposalVersion.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    return get_versions_page(db, proposal_id, skip=skip, limit=limit).items
+
+def get_versions_page(
+    db: Session, proposal_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> Page[ProposalVersion]:
+    query = db.query(ProposalVersion).filter(ProposalVersion.proposal_id == proposal_id)
+    return paginate(query, VERSION_ORDER, limit, cursor, skip)
+
+def next_version_number(last_version_number: Optional[str], change_type: VersionChangeType) -> str:
+    """
+    MAJOR bumps the major number and resets minor; anything else bumps minor.
+    The first version of a proposal is "1.0".
+    """
+    if last_version_number is None:
+        return "1.0"
+    try:
+        # Handle existing versions that might not have version_number yet (migration)
+        v_str = last_version_number if last_version_number else "1.0"
+        major, minor = map(int, v_str.split('.'))
+        
+        if change_type == VersionChangeType.MAJOR:
+            major += 1
+            minor = 0
+        else:
+            minor += 1
+        return f"{major}.{minor}"
+    except Exception:
+        # Fallback if parsing fails
+        return "1.0"
 
 def create_version(db: Session, version_in: ProposalVersionCreate, editor_id: UUID) -> ProposalVersion:
     # Calculate Version Number
@@ -52,22 +88,10 @@ def create_version(db: Session, version_in: ProposalVersionCreate, editor_id: UU
         ProposalVersion.proposal_id == version_in.proposal_id
     ).order_by(ProposalVersion.created_at.desc()).first()
     
-    new_version_number = "1.0"
-    if last_version:
-        try:
-            # Handle existing versions that might not have version_number yet (migration)
-            v_str = last_version.version_number if last_version.version_number else "1.0"
-            major, minor = map(int, v_str.split('.'))
-            
-            if version_in.change_type == VersionChangeType.MAJOR:
-                major += 1
-                minor = 0
-            else:
-                minor += 1
-            new_version_number = f"{major}.{minor}"
-        except Exception:
-            # Fallback if parsing fails
-            new_version_number = "1.0"
+    new_version_number = next_version_number(
+        last_version.version_number if last_version else None,
+        version_in.change_type,
+    )
 
     db_version = ProposalVersion(
         **version_in.model_dump(),
@@ -75,6 +99,5 @@ def create_version(db: Session, version_in: ProposalVersionCreate, editor_id: UU
         editor_id=editor_id
     )
     db.add(db_version)
-    db.commit()
-    db.refresh(db_version)
+    db.flush()
     return db_version
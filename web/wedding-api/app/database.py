@@ -1,15 +1,61 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
+from .core.db_pool import engine_pool_kwargs
+from .core.slow_query import SlowQueryLog
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_pool_kwargs(settings))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica; None when DATABASE_REPLICA_URL is unset (reads stay on the primary)
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, **engine_pool_kwargs(settings))
+    if settings.DATABASE_REPLICA_URL else None
+)
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None else None
+)
+
+# Async path: endpoints declared with `async def` use AsyncSession and never
+# block the event loop or occupy the threadpool.
+# expire_on_commit=False because lazy refreshes are not allowed on AsyncSession.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL, **engine_pool_kwargs(settings, async_engine=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Slow-query log for every engine in the process (primary, replica, async)
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    log_path=settings.SLOW_QUERY_LOG_PATH,
+    max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+    backup_count=settings.SLOW_QUERY_LOG_BACKUPS,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
+slow_query_log.listen(Engine)
+
 Base = declarative_base()
 
+# Transaction per request (unit of work): app.crud functions only flush, and the
+# request's session is committed once after the endpoint returned. An exception
+# skips the commit and close() rolls everything back.
+# Declare these with Depends(..., scope="function") so the COMMIT happens before
+# the response is sent; a failed commit then still becomes a 500 for the client.
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
+        db.commit()
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+        await db.commit()
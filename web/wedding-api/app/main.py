@@ -1,9 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
+from app.core.security import PasswordHashingBusy
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.lead_recycler import lead_recycler
+from app.crud.pagination import InvalidCursor
 from app.api.v1.api import api_router
 
-app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Daily public-pool recycling (see app.core.lead_recycler)
+    recycler = None
+    if settings.LEAD_RECYCLE_ENABLED:
+        recycler = asyncio.create_task(lead_recycler.run_daily(settings.LEAD_RECYCLE_HOUR))
+    yield
+    if recycler is not None:
+        recycler.cancel()
+        with suppress(asyncio.CancelledError):
+            await recycler
+
+app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -12,10 +31,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(PasswordHashingBusy)
+def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Invalid cursor"},
+    )
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Wedding SaaS API"}
@@ -1,8 +1,9 @@
 from .user import User, RoleType
-from .lead import Lead, LeadStatus
+from .lead import Lead, LeadStatus, LeadSearchGram
 from .project import Project, ProjectStage
 from .budget import BudgetItem
 from .approval import Approval, ApprovalType, ApprovalStatus
 from .proposal import Proposal, ProposalStatus, ProposalVersion, VersionActionType
 from .asset import Asset
-from .permission import Permission, RolePermission
\ No newline at end of file
+from .permission import Permission, RolePermission, PermissionGeneration
+from .lead_import import LeadImport, LeadImportStatus
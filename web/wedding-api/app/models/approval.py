@@ -1,6 +1,6 @@
 import uuid
 import enum
-from sqlalchemy import Column, ForeignKey, Enum, JSON, Text
+from sqlalchemy import Column, ForeignKey, Enum, JSON, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -27,13 +27,17 @@ class Approval(Base):
     记录所有需要上级确认的操作
     """
     __tablename__ = "approvals"
+    __table_args__ = (
+        # 审批列表: status 过滤 (经理), status + requester_id (申请人)
+        Index("ix_approvals_status_requester_id", "status", "requester_id"),
+    )
 
     # 基础信息
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="审批单ID")
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, comment="关联项目ID")
     
     # 人员
-    requester_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, comment="申请人ID")
+    requester_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True, comment="申请人ID")
     approver_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True, comment="审批人ID (处理后填充)")
     
     # 内容
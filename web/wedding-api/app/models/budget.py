@@ -16,7 +16,7 @@ class BudgetItem(Base):
 
     # 基础信息
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="明细项ID")
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, comment="所属项目ID")
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True, comment="所属项目ID")
     
     # 物料详情
     category = Column(String, nullable=False, comment="分类 (如: 鲜花, 灯光, 人员, 搭建)")
@@ -1,9 +1,12 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, ForeignKey, Numeric, TIMESTAMP, Date, Enum
+from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, Numeric, TIMESTAMP, Date, Enum, Index, DDL, event, delete, inspect
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..database import Base
+from ..core.search import lead_grams
+from ..core.phone import normalize_phone
 
 class LeadStatus(str, enum.Enum):
     """
@@ -24,11 +27,24 @@ class Lead(Base):
     CRM 核心表，存储潜在客户信息
     """
     __tablename__ = "leads"
+    __table_args__ = (
+        # 策划师线索列表: owner_id (+ status) 过滤
+        Index("ix_leads_owner_id_status", "owner_id", "status"),
+        # 公海回收任务: status IN (...) AND last_contact_at < 截止时间; 也覆盖按 status 的过滤/计数
+        Index("ix_leads_status_last_contact_at", "status", "last_contact_at"),
+        # 关键词搜索 (PostgreSQL, >= 3 字符): ILIKE '%kw%' 走 pg_trgm GIN 索引
+        Index("ix_leads_customer_name_trgm", "customer_name",
+              postgresql_using="gin", postgresql_ops={"customer_name": "gin_trgm_ops"}),
+        Index("ix_leads_phone_trgm", "phone",
+              postgresql_using="gin", postgresql_ops={"phone": "gin_trgm_ops"}),
+    )
 
     # 基础信息
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="线索唯一ID")
     customer_name = Column(String, nullable=False, comment="客户姓名")
     phone = Column(String, unique=True, index=True, nullable=False, comment="手机号 (唯一标识，用于查重)")
+    # "+86 138-0000-0000" 与 "13800000000" 视为同一客户; 无法识别的号码为 NULL (不参与查重)
+    phone_normalized = Column(String, unique=True, index=True, nullable=True, comment="规范化手机号 (纯数字，由 ORM 事件维护，用于撞单检测)")
     wedding_date = Column(Date, nullable=True, comment="预计婚期")
     
     # 预算范围
@@ -43,4 +59,69 @@ class Lead(Base):
 
     # 关系定义 (ORM)
     owner = relationship("User", back_populates="leads", doc="该线索的负责人")
-    project = relationship("Project", back_populates="lead", uselist=False, doc="关联的项目 (成交后生成)")
\ No newline at end of file
+    project = relationship("Project", back_populates="lead", uselist=False, doc="关联的项目 (成交后生成)")
+
+class LeadSearchGram(Base):
+    """
+    线索搜索 n-gram 倒排表 (lead_search_grams)
+    customer_name / phone 的二元字符片段 -> lead_id，支持 2 字中文姓名和手机号片段搜索
+    由 Lead 的 ORM 事件自动维护
+    """
+    __tablename__ = "lead_search_grams"
+
+    gram = Column(String, primary_key=True, comment="小写二元字符片段")
+    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True, index=True, comment="线索ID")
+
+# pg_trgm 索引依赖扩展 (create_all 时自动创建; 迁移中同样处理)
+event.listen(
+    Lead.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+def write_lead_grams(connection, lead_id, customer_name: str, phone: str, replace: bool = False) -> None:
+    """(Re)write the search grams of one lead on `connection`."""
+    table = LeadSearchGram.__table__
+    if replace:
+        connection.execute(delete(table).where(table.c.lead_id == lead_id))
+    grams = lead_grams((customer_name, phone))
+    if grams:
+        connection.execute(table.insert(), [{"gram": g, "lead_id": lead_id} for g in grams])
+
+# 公海回收按 last_contact_at 计时: 分配给负责人 (新建/重新分配) 时从当前时间开始,
+# 从未跟进的线索也会按期回收
+def _owned(target) -> bool:
+    # __dict__: never lazy-load the owner inside a flush
+    return target.owner_id is not None or target.__dict__.get("owner") is not None
+
+@event.listens_for(Lead, "before_insert")
+def _lead_normalize_phone(mapper, connection, target):
+    target.phone_normalized = normalize_phone(target.phone)
+    if target.last_contact_at is None and _owned(target):
+        target.last_contact_at = datetime.utcnow()
+
+@event.listens_for(Lead, "before_update")
+def _lead_phone_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.phone.history.has_changes():
+        target.phone_normalized = normalize_phone(target.phone)
+    # 重新分配或推进状态都算一次跟进
+    if (
+        state.attrs.owner_id.history.has_changes() or state.attrs.owner.history.has_changes()
+        or state.attrs.status.history.has_changes()
+    ) and _owned(target) and not state.attrs.last_contact_at.history.has_changes():
+        target.last_contact_at = datetime.utcnow()
+
+@event.listens_for(Lead, "after_insert")
+def _lead_inserted(mapper, connection, target):
+    write_lead_grams(connection, target.id, target.customer_name, target.phone)
+
+@event.listens_for(Lead, "after_update")
+def _lead_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.customer_name.history.has_changes() or state.attrs.phone.history.has_changes():
+        write_lead_grams(connection, target.id, target.customer_name, target.phone, replace=True)
+
+@event.listens_for(Lead, "before_delete")
+def _lead_deleted(mapper, connection, target):
+    table = LeadSearchGram.__table__
+    connection.execute(delete(table).where(table.c.lead_id == target.id))
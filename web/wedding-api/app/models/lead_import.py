@@ -0,0 +1,41 @@
+import uuid
+import enum
+from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, Integer, DateTime, Enum, JSON, Text
+from sqlalchemy.dialects.postgresql import UUID
+from ..database import Base
+
+class LeadImportStatus(str, enum.Enum):
+    """
+    批量导入任务状态
+    """
+    PENDING = "PENDING"   # 已上传，等待处理
+    RUNNING = "RUNNING"   # 导入中
+    DONE = "DONE"         # 已完成 (可能包含失败行)
+    FAILED = "FAILED"     # 整体失败 (文件无法解析等)
+
+class LeadImport(Base):
+    """
+    线索批量导入任务表 (lead_imports)
+    记录 CSV/XLSX 导入的进度与逐行错误报告，每处理完一批提交一次
+    """
+    __tablename__ = "lead_imports"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="导入任务ID")
+    filename = Column(String, nullable=False, comment="原始文件名")
+    status = Column(Enum(LeadImportStatus), default=LeadImportStatus.PENDING, nullable=False, comment="任务状态")
+
+    # 导入的线索归属 (为空表示进入公海)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True, comment="导入线索的负责人ID")
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, comment="发起人")
+
+    # 进度
+    processed_rows = Column(Integer, default=0, nullable=False, comment="已处理行数")
+    inserted = Column(Integer, default=0, nullable=False, comment="成功导入数")
+    duplicates = Column(Integer, default=0, nullable=False, comment="重复手机号行数 (文件内或已存在)")
+    failed = Column(Integer, default=0, nullable=False, comment="校验失败行数")
+    errors = Column(JSON, default=list, comment="逐行报告 [{row, phone, error}] (最多 LEAD_IMPORT_MAX_ERRORS 条)")
+    error = Column(Text, nullable=True, comment="任务级错误 (status=FAILED 时)")
+
+    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+    finished_at = Column(DateTime, nullable=True, comment="完成时间")
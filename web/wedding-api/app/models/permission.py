@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -23,10 +23,24 @@ class RolePermission(Base):
     存储每个角色拥有的权限
     """
     __tablename__ = "role_permissions"
-    
+    __table_args__ = (
+        # 权限矩阵 join: role -> permission_id
+        Index("ix_role_permissions_role_permission_id", "role", "permission_id"),
+    )
+
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    role = Column(String, nullable=False, index=True, comment="角色 Enum Value (e.g. 'ADMIN')")
+    role = Column(String, nullable=False, comment="角色 Enum Value (e.g. 'ADMIN')")
     permission_id = Column(UUID(as_uuid=True), ForeignKey("permissions.id"), nullable=False)
     
     # Relationships
     permission = relationship("Permission")
+
+class PermissionGeneration(Base):
+    """
+    权限矩阵版本号 (单行表)
+    每次修改角色权限时递增，各 worker 进程据此判断本地权限缓存是否过期
+    """
+    __tablename__ = "permission_generation"
+
+    id = Column(Integer, primary_key=True, default=1)
+    generation = Column(Integer, nullable=False, default=0, comment="当前权限矩阵版本号")
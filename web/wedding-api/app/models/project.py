@@ -1,6 +1,6 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, ForeignKey, Numeric, Date, Enum
+from sqlalchemy import Column, String, ForeignKey, Integer, Numeric, Date, Enum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -33,6 +33,13 @@ class Project(Base):
     
     # 财务概览
     total_budget = Column(Numeric(10, 2), default=0, comment="合同总金额 (元)")
+
+    # 报价单汇总 (冗余字段): crud.budget 增删改明细时在同一事务内按差额更新,
+    # app.core.budget_totals 定期按明细重算修复偏差
+    budget_item_count = Column(Integer, default=0, server_default="0", nullable=False, comment="报价单明细项数")
+    budget_sale_total = Column(Numeric(12, 2), default=0, server_default="0", nullable=False, comment="报价单销售总额 (元)")
+    budget_cost_total = Column(Numeric(12, 2), default=0, server_default="0", nullable=False, comment="报价单成本总额 (元) - 仅Admin/Manager可见")
+    budget_gross_profit = Column(Numeric(12, 2), default=0, server_default="0", nullable=False, comment="报价单毛利 (元) - 仅Admin/Manager可见")
     
     # 状态
     stage = Column(Enum(ProjectStage), default=ProjectStage.PREPARING, nullable=False, comment="当前项目阶段")
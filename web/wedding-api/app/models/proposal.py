@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, Enum, JSON, DateTime, Text
+from sqlalchemy import Column, String, ForeignKey, Enum, JSON, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -29,7 +29,7 @@ class Proposal(Base):
     __tablename__ = "proposals"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="方案ID")
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, comment="所属项目ID")
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True, comment="所属项目ID")
     
     name = Column(String, nullable=False, comment="方案名称 (如: 森系方案A)")
     description = Column(Text, nullable=True, comment="方案描述/备注")
@@ -54,6 +54,10 @@ class ProposalVersion(Base):
     方案版本历史表 (proposal_versions)
     """
     __tablename__ = "proposal_versions"
+    __table_args__ = (
+        # 版本历史: 按方案过滤 + created_at 倒序
+        Index("ix_proposal_versions_proposal_id_created_at", "proposal_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="版本ID")
     proposal_id = Column(UUID(as_uuid=True), ForeignKey("proposals.id"), nullable=False, comment="所属方案ID")
@@ -1,8 +1,8 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, Boolean, Enum, ForeignKey
+from sqlalchemy import Column, String, Boolean, Enum, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, object_session
 from ..database import Base
 
 class RoleType(str, enum.Enum):
@@ -44,6 +44,8 @@ class User(Base):
     
     # 状态
     is_active = Column(Boolean, default=True, comment="账户是否激活，False表示已禁用")
+    # 角色或启用状态变化时 +1; 携带角色声明的 token 记录签发时的值 (TOKEN_PERMISSION_CLAIMS)
+    auth_version = Column(Integer, nullable=False, default=0, server_default="0", comment="认证信息版本号 (角色/启用状态)")
 
     # 关系定义 (ORM)
     roles = relationship("UserRole", backref="user", cascade="all, delete-orphan")
@@ -87,23 +89,19 @@ class User(Base):
     def permissions(self):
         """
         动态获取该用户的具体权限列表 (合并所有角色)
+        权限矩阵来自进程级缓存 (app.core.permissions.role_permission_cache)，稳定状态下不访问数据库
         """
-        from app.core.permissions import get_role_permissions
-        from app.database import SessionLocal 
-        db = SessionLocal()
-        try:
-            all_perms = set()
-            for user_role in self.roles:
-                # user_role.role is a string
-                try:
-                    role_enum = RoleType(user_role.role)
-                    perms = get_role_permissions(db, role_enum)
-                    all_perms.update(perms)
-                except ValueError:
-                    continue # Ignore invalid roles
-            return list(all_perms)
-        finally:
-            db.close()
+        from app.core.permissions import get_permissions_for_roles, role_permission_cache
+        db = object_session(self)
+        if db is None:
+            # 游离对象: 缓存有效时不再额外占用连接池连接
+            cached = role_permission_cache.peek_many(self.role_list)
+            if cached is not None:
+                return sorted(cached)
+            from app.database import SessionLocal
+            with SessionLocal() as session:
+                return sorted(get_permissions_for_roles(session, self.role_list))
+        return sorted(get_permissions_for_roles(db, self.role_list))
             
     @property
     def role_list(self):
@@ -1,6 +1,8 @@
-from typing import Optional
+from decimal import Decimal
+from typing import Annotated, List, Optional
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, computed_field, model_validator
+from pydantic_core import to_json
 
 class BudgetItemBase(BaseModel):
     category: str
@@ -39,3 +41,123 @@ class BudgetItemAdminResponse(BudgetItemResponse):
     @computed_field
     def gross_profit(self) -> float:
         return self.total_sale_price - self.total_cost_price
+
+class BudgetTotals(BaseModel):
+    item_count: int = 0
+    total_sale_price: float = 0.0
+    # Admin/Manager only; None for planners
+    total_cost_price: Optional[float] = None
+    gross_profit: Optional[float] = None
+
+def budget_items_json(rows, include_cost: bool = False) -> bytes:
+    """
+    JSON array for large item lists, built straight from crud.budget.get_budget_item_rows
+    tuples: same fields, order and float arithmetic as BudgetItemResponse /
+    BudgetItemAdminResponse, without creating and re-validating a model per item.
+    """
+    items = []
+    for category, name, quantity, unit_price, item_id, project_id, *cost in rows:
+        unit_price = float(unit_price)
+        total_sale_price = unit_price * quantity
+        item = {
+            "category": category,
+            "name": name,
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "id": item_id,
+            "project_id": project_id,
+        }
+        # Fields first, then computed fields, as pydantic orders them
+        if include_cost:
+            cost_price = float(cost[0])
+            total_cost_price = cost_price * quantity
+            item["cost_price"] = cost_price
+            item["total_sale_price"] = total_sale_price
+            item["total_cost_price"] = total_cost_price
+            item["gross_profit"] = total_sale_price - total_cost_price
+        else:
+            item["total_sale_price"] = total_sale_price
+        items.append(item)
+    return to_json(items)
+
+# --- Batch upsert (报价单编辑器自动保存, D2) ---
+
+BUDGET_BATCH_MAX_ITEMS = 1000
+
+class BudgetItemBatchEntry(BaseModel):
+    """无 id: 新建; 有 id: 更新已提供的字段; is_deleted: 删除"""
+    id: Optional[UUID] = None
+    is_deleted: bool = False
+    category: Optional[str] = None
+    name: Optional[str] = None
+    quantity: Optional[int] = None
+    unit_price: Optional[float] = None
+    cost_price: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_action(self):
+        if self.id is None:
+            if self.is_deleted:
+                raise ValueError("is_deleted requires an id")
+            if not self.category or not self.name:
+                raise ValueError("new items require category and name")
+        # None means "not sent"; an explicit null can't be stored (or totalled) for any of these
+        nulls = sorted(f for f in self.model_fields_set - {"id", "is_deleted"} if getattr(self, f) is None)
+        if nulls:
+            raise ValueError(f"{', '.join(nulls)} may not be null")
+        return self
+
+class BudgetItemBatchUpdate(BaseModel):
+    items: List[BudgetItemBatchEntry] = Field(max_length=BUDGET_BATCH_MAX_ITEMS)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        ids = [entry.id for entry in self.items if entry.id is not None]
+        if len(ids) != len(set(ids)):
+            raise ValueError("each item id may appear only once")
+        return self
+
+class BudgetItemBatchResponse(BaseModel):
+    created: List[UUID]  # ids of the new items, in request order
+    updated: List[UUID]
+    deleted: List[UUID]
+    # The created and updated rows as stored, same fields as GET /budgets/project/{id}
+    items: List[BudgetItemResponse]
+
+class BudgetItemBatchAdminResponse(BudgetItemBatchResponse):
+    items: List[BudgetItemAdminResponse]
+
+def budget_batch_json(created, updated, deleted, rows, include_cost: bool = False) -> bytes:
+    """BudgetItemBatchResponse / BudgetItemBatchAdminResponse with the items via budget_items_json."""
+    return b"".join([
+        b'{"created":', to_json(created), b',"updated":', to_json(updated), b',"deleted":', to_json(deleted),
+        b',"items":', budget_items_json(rows, include_cost=include_cost), b"}",
+    ])
+
+# --- Summary (SQL-side totals) ---
+
+# Exact Decimal in Python; a plain JSON number on the wire like the other amounts
+Money = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+
+class BudgetCategorySummary(BaseModel):
+    category: str
+    item_count: int
+    total_sale_price: Money
+
+class BudgetCategoryAdminSummary(BudgetCategorySummary):
+    total_cost_price: Money
+    gross_profit: Money
+    # gross_profit / total_sale_price * 100; None when nothing is sold
+    margin_percent: Optional[Money] = None
+
+class BudgetSummary(BaseModel):
+    project_id: UUID
+    item_count: int
+    total_sale_price: Money
+    categories: List[BudgetCategorySummary]
+
+class BudgetAdminSummary(BudgetSummary):
+    total_cost_price: Money
+    gross_profit: Money
+    margin_percent: Optional[Money] = None
+    categories: List[BudgetCategoryAdminSummary]
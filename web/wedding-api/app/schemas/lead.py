@@ -1,8 +1,9 @@
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 from app.models.lead import LeadStatus
+from app.models.lead_import import LeadImportStatus
 
 class LeadBase(BaseModel):
     customer_name: str
@@ -25,6 +26,10 @@ class LeadUpdate(BaseModel):
     status: Optional[LeadStatus] = None
     owner_id: Optional[UUID] = None
 
+class LeadFollowUp(BaseModel):
+    # Optional status reached by this contact (e.g. VISITED after a store visit)
+    status: Optional[LeadStatus] = None
+
 class LeadResponse(LeadBase):
     id: UUID
     owner_id: Optional[UUID] = None
@@ -36,3 +41,32 @@ class LeadResponse(LeadBase):
 class LeadPagination(BaseModel):
     total: int
     list: List[LeadResponse]
+    # Only in cursor mode (?cursor=...); None on the last page
+    next_cursor: Optional[str] = None
+    # Per-status counts for the same filters minus the status filter
+    status_counts: Dict[str, int] = {}
+    # True when total/status_counts come from planner statistics (?estimate=true)
+    estimated: bool = False
+
+
+class LeadImportRowError(BaseModel):
+    row: int  # line in the file; the header is line 1
+    phone: Optional[str] = None
+    error: str
+
+class LeadImportResponse(BaseModel):
+    id: UUID
+    filename: str
+    status: LeadImportStatus
+    owner_id: Optional[UUID] = None
+    processed_rows: int
+    inserted: int
+    duplicates: int
+    failed: int
+    # Rows that were not imported (first LEAD_IMPORT_MAX_ERRORS)
+    errors: List[LeadImportRowError] = []
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
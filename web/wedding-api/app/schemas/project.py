@@ -1,8 +1,12 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional, Union
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 from app.models.project import ProjectStage
+from app.schemas.approval import ApprovalResponse
+from app.schemas.budget import BudgetTotals
+from app.schemas.lead import LeadResponse
+from app.schemas.proposal import ProposalSummary
 
 class ProjectBase(BaseModel):
     name: str
@@ -24,5 +28,20 @@ class ProjectResponse(ProjectBase):
     id: UUID
     lead_id: UUID
     stage: ProjectStage
+    # 报价单汇总 (由 crud.budget 维护)
+    budget_item_count: int = 0
+    budget_sale_total: float = 0.0
     
     model_config = ConfigDict(from_attributes=True)
+
+class ProjectAdminResponse(ProjectResponse):
+    budget_cost_total: float = 0.0
+    budget_gross_profit: float = 0.0
+
+class ProjectDetailResponse(BaseModel):
+    """项目详情聚合 (C1): 项目 + 线索 + 报价汇总 + 方案概要 + 待审批"""
+    project: Union[ProjectAdminResponse, ProjectResponse]
+    lead: LeadResponse
+    budget: BudgetTotals
+    proposals: List[ProposalSummary]
+    pending_approvals: List[ApprovalResponse]
@@ -47,6 +47,17 @@ class ProposalUpdate(BaseModel):
     status: Optional[ProposalStatus] = None
     current_data: Optional[Dict[str, Any]] = None
 
+class ProposalSummary(BaseModel):
+    """Proposal without its working copy (current_data), for overviews."""
+    id: UUID
+    name: str
+    status: ProposalStatus
+    created_by: UUID
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class ProposalResponse(ProposalBase):
     id: UUID
     project_id: UUID
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from uuid import UUID
 
@@ -8,3 +8,6 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[UUID] = None
+    # Only present on tokens issued with TOKEN_PERMISSION_CLAIMS enabled
+    roles: Optional[List[str]] = None
+    gen: Optional[int] = None  # users.auth_version at issue time
@@ -0,0 +1,101 @@
+"""
+Login storm benchmark.
+
+Runs concurrent logins against a live API while probing a non-auth endpoint,
+and reports login throughput plus the probe latency percentiles. Use it to
+check that bcrypt load stays inside the password hashing pool instead of
+stalling unrelated requests.
+
+Usage:
+    uvicorn main:app --workers 1
+    python benchmarks/bench_login.py --base-url http://127.0.0.1:8000 \
+        --logins 32 --probes 8 --duration 20
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+import httpx
+
+API_V1_STR = "/api/v1"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_worker(client: httpx.AsyncClient, username: str, password: str, deadline: float, stats: dict):
+    while time.perf_counter() < deadline:
+        resp = await client.post(
+            f"{API_V1_STR}/auth/login/access-token",
+            data={"username": username, "password": password},
+        )
+        if resp.status_code == 200:
+            stats["ok"] += 1
+        elif resp.status_code == 503:
+            stats["rejected"] += 1
+        else:
+            stats["failed"] += 1
+
+
+async def probe_worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: List[float]):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def measure_probes(client: httpx.AsyncClient, path: str, probes: int, duration: float) -> List[float]:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(probe_worker(client, path, deadline, latencies) for _ in range(probes)))
+    return latencies
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.logins + args.probes)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        username = f"bench_{uuid.uuid4().hex[:12]}"
+        password = "bench-password"
+        await client.post(
+            f"{API_V1_STR}/auth/register",
+            json={"username": username, "password": password, "roles": ["PLANNER"]},
+        )
+
+        baseline = await measure_probes(client, args.probe_path, args.probes, min(5.0, args.duration))
+
+        stats = {"ok": 0, "rejected": 0, "failed": 0}
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        under_load, _ = await asyncio.gather(
+            measure_probes(client, args.probe_path, args.probes, args.duration),
+            asyncio.gather(*(
+                login_worker(client, username, password, deadline, stats)
+                for _ in range(args.logins)
+            )),
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"logins: {stats['ok']} ok, {stats['rejected']} rejected (503), {stats['failed']} failed")
+    print(f"login throughput: {stats['ok'] / elapsed:.1f} req/s over {elapsed:.1f}s")
+    for label, samples in (("idle", baseline), ("during logins", under_load)):
+        print(
+            f"{args.probe_path} {label}: n={len(samples)} "
+            f"p50={percentile(samples, 50):.1f}ms p99={percentile(samples, 99):.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login loops")
+    parser.add_argument("--probes", type=int, default=8, help="concurrent non-auth probe loops")
+    parser.add_argument("--probe-path", default="/health")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds under load")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,55 @@
+"""
+Per-request token verification overhead, with and without the verified-token cache.
+
+Compares the old path (`jwt.decode` + `TokenPayload(**payload)` on every request)
+with `security.decode_access_token`, which serves repeated tokens from the LRU.
+No server or database connection is needed, but the settings must load, so run
+it from the project root where `.env` lives.
+
+Usage:
+    python benchmarks/bench_token_cache.py --iterations 50000 --tokens 100
+"""
+import argparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.core import security  # noqa: E402
+from app.schemas.token import TokenPayload  # noqa: E402
+
+
+def uncached(token: str) -> TokenPayload:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return TokenPayload(**payload)
+
+
+def main(args: argparse.Namespace) -> None:
+    tokens = [security.create_access_token(uuid.uuid4()) for _ in range(args.tokens)]
+    security.token_cache.clear()
+
+    def run(fn):
+        for i in range(args.iterations):
+            fn(tokens[i % len(tokens)])
+
+    before = timeit.timeit(lambda: run(uncached), number=1)
+    run(security.decode_access_token)  # warm the cache
+    after = timeit.timeit(lambda: run(security.decode_access_token), number=1)
+
+    per_before = before / args.iterations * 1e6
+    per_after = after / args.iterations * 1e6
+    print(f"{args.iterations} verifications over {len(tokens)} distinct tokens")
+    print(f"jwt.decode + TokenPayload: {per_before:.1f} us/request")
+    print(f"decode_access_token (LRU): {per_after:.1f} us/request ({per_before / per_after:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--tokens", type=int, default=100, help="distinct tokens in rotation")
+    main(parser.parse_args())
@@ -0,0 +1,64 @@
+import asyncio
+from uuid import UUID
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.crud.aio import project as crud_project
+from app.crud.aio import approval as crud_approval
+from app.models.approval import ApprovalStatus, ApprovalType
+from app.schemas.approval import ApprovalCreate
+from tests.utils import get_auth_headers
+from tests.api.v1.test_approvals import create_project_helper
+
+def test_async_approval_endpoints(sqlite_client: TestClient):
+    """
+    Approval endpoints run on AsyncSession; exercise them on aiosqlite.
+    """
+    planner_headers = get_auth_headers(sqlite_client, role="PLANNER")
+    manager_headers = get_auth_headers(sqlite_client, role="MANAGER")
+    project_id = create_project_helper(sqlite_client, planner_headers)
+
+    create_resp = sqlite_client.post(
+        f"{settings.API_V1_STR}/approvals/",
+        headers=planner_headers,
+        json={"project_id": project_id, "type": "DISCOUNT", "current_data": {"discount_amount": 300}},
+    )
+    assert create_resp.status_code == 200
+    approval_id = create_resp.json()["id"]
+
+    other_headers = get_auth_headers(sqlite_client, role="PLANNER")
+    resp = sqlite_client.post(
+        f"{settings.API_V1_STR}/approvals/",
+        headers=other_headers,
+        json={"project_id": project_id, "type": "DISCOUNT"},
+    )
+    assert resp.status_code == 403
+
+    list_resp = sqlite_client.get(f"{settings.API_V1_STR}/approvals/", headers=planner_headers)
+    assert [a["id"] for a in list_resp.json()] == [approval_id]
+
+    process_resp = sqlite_client.put(
+        f"{settings.API_V1_STR}/approvals/{approval_id}/process",
+        headers=manager_headers,
+        json={"status": "APPROVED"},
+    )
+    assert process_resp.status_code == 200
+    assert process_resp.json()["status"] == "APPROVED"
+
+def test_async_crud_modules(sqlite_client: TestClient, sqlite_sessionmakers):
+    _, AsyncSessionLocal = sqlite_sessionmakers
+    planner_headers = get_auth_headers(sqlite_client, role="PLANNER")
+    owner_id = UUID(sqlite_client.get(f"{settings.API_V1_STR}/users/me", headers=planner_headers).json()["id"])
+    project_id = UUID(create_project_helper(sqlite_client, planner_headers))
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            loaded = await crud_project.get_project_with_lead(db, project_id)
+            assert loaded.lead.owner_id == owner_id
+
+            approval = await crud_approval.create_approval(
+                db, ApprovalCreate(project_id=project_id, type=ApprovalType.REFUND), requester_id=owner_id
+            )
+            pending = await crud_approval.get_approvals(db, requester_id=owner_id, status=ApprovalStatus.PENDING)
+            assert [a.id for a in pending] == [approval.id]
+
+    asyncio.run(scenario())
@@ -1,5 +1,11 @@
+import threading
+import pytest
 from fastapi.testclient import TestClient
+from jose import jwt
 from app.config import settings
+from app.api import deps
+from app.core import security
+from tests.utils import get_auth_headers, random_lower_string
 
 def test_register_new_user(client: TestClient):
     response = client.post(
@@ -54,3 +60,99 @@ def test_login_wrong_password(client: TestClient):
         data=login_data,
     )
     assert response.status_code == 401
+
+def test_token_permission_claims(client: TestClient, monkeypatch):
+    """
+    Claims-mode tokens authorize GETs from the token; deactivation bumps the
+    user's auth_version so the token falls back to the DB and is rejected.
+    """
+    monkeypatch.setattr(settings, "TOKEN_PERMISSION_CLAIMS", True)
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    planner_headers = get_auth_headers(client, role="PLANNER")
+
+    token = planner_headers["Authorization"].split(" ")[1]
+    claims = jwt.get_unverified_claims(token)
+    assert claims["roles"] == ["PLANNER"]
+    assert "gen" in claims
+
+    response = client.get(f"{settings.API_V1_STR}/projects/", headers=planner_headers)
+    assert response.status_code == 200
+
+    planner_id = client.get(f"{settings.API_V1_STR}/users/me", headers=planner_headers).json()["id"]
+    response = client.put(
+        f"{settings.API_V1_STR}/users/{planner_id}",
+        headers=admin_headers,
+        json={"is_active": False},
+    )
+    assert response.status_code == 200
+
+    response = client.get(f"{settings.API_V1_STR}/projects/", headers=planner_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+def test_claims_survive_other_users_changes(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_PERMISSION_CLAIMS", True)
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    other_headers = get_auth_headers(client, role="PLANNER")
+    planner_id = client.get(f"{settings.API_V1_STR}/users/me", headers=planner_headers).json()["id"]
+    other_id = client.get(f"{settings.API_V1_STR}/users/me", headers=other_headers).json()["id"]
+
+    def authorized_from_claims(headers) -> bool:
+        # Without the DB loader only the claims path can authorize the request
+        with monkeypatch.context() as m:
+            m.setattr(deps, "load_principal", lambda db, user_id: None)
+            return client.get(f"{settings.API_V1_STR}/projects/", headers=headers).status_code == 200
+
+    assert authorized_from_claims(planner_headers)
+
+    # Another user's role change, and a no-op is_active / roles update of this one
+    url = f"{settings.API_V1_STR}/users"
+    assert client.put(f"{url}/{other_id}", headers=admin_headers, json={"roles": ["MANAGER"]}).status_code == 200
+    assert client.put(f"{url}/{planner_id}", headers=admin_headers, json={"is_active": True, "roles": ["PLANNER"]}).status_code == 200
+    assert authorized_from_claims(planner_headers)
+    assert not authorized_from_claims(other_headers)
+
+    # A real change of this user's roles retires the claims
+    assert client.put(f"{url}/{planner_id}", headers=admin_headers, json={"roles": ["PLANNER", "FINANCE"]}).status_code == 200
+    assert not authorized_from_claims(planner_headers)
+
+def test_login_fails_fast_when_hashing_pool_full(client: TestClient, monkeypatch):
+    # Simulate a saturated hashing pool: no free slots
+    monkeypatch.setattr(security, "_hash_slots", threading.BoundedSemaphore(0))
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": "test_login_user", "password": "password123"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_hashing_slot_released_when_submit_fails(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(security, "_hash_slots", slots)
+    class ShutDownExecutor:
+        def submit(self, fn, *args):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+    monkeypatch.setattr(security, "_hash_executor", ShutDownExecutor())
+    with pytest.raises(RuntimeError):
+        security._submit_hashing(security.get_password_hash, "password123")
+    assert slots.acquire(blocking=False)
+
+def test_verified_token_cache_purged_on_user_update(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    token = headers["Authorization"].split(" ")[1]
+
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=headers).json()
+    assert security.token_cache.get(token) is not None
+
+    response = client.put(
+        f"{settings.API_V1_STR}/users/{me['id']}",
+        headers=headers,
+        json={"username": random_lower_string()},
+    )
+    assert response.status_code == 200
+    assert security.token_cache.get(token) is None
+
+    # Token is still valid; it is simply verified again and re-cached
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 200
+    assert security.token_cache.get(token) is not None
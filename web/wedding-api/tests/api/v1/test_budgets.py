@@ -1,6 +1,17 @@
+import json
+from typing import List
+from uuid import UUID
+
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import update
 from app.config import settings
-from tests.utils import get_auth_headers, random_phone, random_lower_string
+from app.crud import budget as crud_budget
+from app.database import SessionLocal
+from app.models.budget import BudgetItem
+from app.models.project import Project
+from app.schemas.budget import BudgetItemResponse, BudgetItemAdminResponse
+from tests.utils import get_auth_headers, random_phone, random_lower_string, query_count, assert_query_budget
 
 def create_project_helper(client, headers):
     # 1. Create Lead
@@ -126,3 +137,182 @@ def test_planner_cannot_update_cost_price(client: TestClient):
     item = check_resp.json()[0]
     assert item["unit_price"] == 2500.0 # Changed
     assert item["cost_price"] == 1000.0 # Unchanged (Silent Ignore worked)
+
+def _project(client, headers, project_id):
+    return client.get(f"{settings.API_V1_STR}/projects/{project_id}", headers=headers).json()
+
+def test_project_budget_totals_follow_items(client: TestClient):
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    manager_headers = get_auth_headers(client, role="MANAGER")
+    project_id = create_project_helper(client, planner_headers)
+
+    ids = [
+        client.post(f"{settings.API_V1_STR}/budgets/", headers=planner_headers, json={
+            "project_id": project_id, "category": "Decor", "name": name,
+            "quantity": quantity, "unit_price": unit_price, "cost_price": cost_price,
+        }).json()["id"]
+        for name, quantity, unit_price, cost_price in [("Flowers", 10, 99.99, 40), ("Host", 1, 3000, 2000)]
+    ]
+    client.put(f"{settings.API_V1_STR}/budgets/{ids[0]}", headers=manager_headers, json={"quantity": 20, "cost_price": 45})
+    client.post(f"{settings.API_V1_STR}/budgets/", headers=planner_headers, json={
+        "project_id": project_id, "category": "Staff", "name": "Removed", "unit_price": 500, "cost_price": 100,
+    })
+    removed = client.get(f"{settings.API_V1_STR}/budgets/project/{project_id}", headers=planner_headers).json()
+    client.delete(f"{settings.API_V1_STR}/budgets/{[i for i in removed if i['name'] == 'Removed'][0]['id']}", headers=planner_headers)
+
+    project = _project(client, manager_headers, project_id)
+    assert (project["budget_item_count"], project["budget_sale_total"]) == (2, 4999.8)
+    assert (project["budget_cost_total"], project["budget_gross_profit"]) == (2900.0, 2099.8)
+
+    # Planners get the sale side only, in the list too
+    project = _project(client, planner_headers, project_id)
+    assert project["budget_sale_total"] == 4999.8
+    assert "budget_cost_total" not in project and "budget_gross_profit" not in project
+    listed = client.get(f"{settings.API_V1_STR}/projects/", headers=planner_headers).json()
+    assert all("budget_cost_total" not in p for p in listed)
+
+def test_repair_budget_totals(client: TestClient):
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    project_id = create_project_helper(client, planner_headers)
+    client.post(f"{settings.API_V1_STR}/budgets/", headers=planner_headers, json={
+        "project_id": project_id, "category": "Decor", "name": "Arch", "quantity": 2, "unit_price": 800, "cost_price": 300,
+    })
+
+    # Drift, e.g. an item edited with plain SQL
+    with SessionLocal() as db:
+        db.execute(update(Project).where(Project.id == UUID(project_id)).values(budget_sale_total=0, budget_item_count=7))
+        db.commit()
+
+    assert client.post(f"{settings.API_V1_STR}/system/budget-totals/repair", headers=planner_headers).status_code == 403
+    run = client.post(f"{settings.API_V1_STR}/system/budget-totals/repair", headers=admin_headers).json()
+    assert run["repaired"] == 1 and run["checked"] >= 1
+    project = _project(client, admin_headers, project_id)
+    assert (project["budget_item_count"], project["budget_sale_total"], project["budget_gross_profit"]) == (1, 1600.0, 1000.0)
+    assert client.post(f"{settings.API_V1_STR}/system/budget-totals/repair", headers=admin_headers).json()["repaired"] == 0
+
+def test_batch_update_budget_items(client: TestClient):
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    manager_headers = get_auth_headers(client, role="MANAGER")
+    auth_only = query_count(client.get(f"{settings.API_V1_STR}/users/me", headers=planner_headers))
+    project_id = create_project_helper(client, planner_headers)
+    url = f"{settings.API_V1_STR}/budgets/project/{project_id}/batch"
+
+    # 200 new rows in one request
+    response = client.put(url, headers=planner_headers, json={"items": [
+        {"category": "Decor", "name": f"Item {i}", "quantity": 2, "unit_price": 10, "cost_price": 4} for i in range(200)
+    ]})
+    assert response.status_code == 200
+    created = response.json()["created"]
+    assert len(created) == 200
+    # Planners get the stored rows without cost fields
+    first = response.json()["items"][0]
+    assert first["id"] == created[0] and "cost_price" not in first
+    assert (first["quantity"], first["unit_price"], first["total_sale_price"]) == (2, 10.0, 20.0)
+    # Access check + INSERT + project totals + returned rows
+    assert_query_budget(response, auth_only + 4)
+
+    # Mixed edit: updates (planner's cost_price ignored), deletes and a create
+    response = client.put(url, headers=planner_headers, json={"items": [
+        *({"id": item_id, "quantity": 3, "cost_price": 1} for item_id in created[:100]),
+        *({"id": item_id, "is_deleted": True} for item_id in created[100:150]),
+        {"category": "Staff", "name": "Host", "unit_price": 3000, "cost_price": 2000},
+    ]})
+    assert response.status_code == 200
+    content = response.json()
+    assert (len(content["created"]), len(content["updated"]), len(content["deleted"])) == (1, 100, 50)
+    assert [i["id"] for i in content["items"]] == content["created"] + content["updated"]
+    assert content["items"][1]["quantity"] == 3
+    # Access check + items SELECT + INSERT + UPDATE + DELETE + project totals + returned rows
+    assert_query_budget(response, auth_only + 7)
+
+    items = {i["id"]: i for i in client.get(f"{settings.API_V1_STR}/budgets/project/{project_id}", headers=manager_headers).json()}
+    assert len(items) == 151
+    assert (items[created[0]]["quantity"], items[created[0]]["cost_price"]) == (3, 4.0)
+    assert created[120] not in items
+    project = _project(client, manager_headers, project_id)
+    # 100 * 3 * 10 + 50 * 2 * 10 + 3000 sale; 100 * 3 * 4 + 50 * 2 * 4 + 2000 cost
+    assert (project["budget_item_count"], project["budget_sale_total"], project["budget_cost_total"]) == (151, 7000.0, 3600.0)
+
+    # Managers may change cost prices
+    response = client.put(url, headers=manager_headers, json={"items": [{"id": created[0], "cost_price": 1}]})
+    assert response.json()["items"] == [{
+        "category": "Decor", "name": "Item 0", "quantity": 3, "unit_price": 10.0, "id": created[0],
+        "project_id": project_id, "cost_price": 1.0, "total_sale_price": 30.0, "total_cost_price": 3.0,
+        "gross_profit": 27.0,
+    }]
+    assert _project(client, manager_headers, project_id)["budget_cost_total"] == 3591.0
+
+    # Explicit nulls are rejected, not silently dropped
+    for field in ("unit_price", "cost_price", "quantity", "name"):
+        assert client.put(url, headers=manager_headers, json={"items": [{"id": created[0], field: None}]}).status_code == 422
+    assert _project(client, manager_headers, project_id)["budget_cost_total"] == 3591.0
+
+    # All or nothing: a locked or foreign item rejects the whole batch
+    with SessionLocal() as db:
+        db.execute(update(BudgetItem).where(BudgetItem.id == UUID(created[1])).values(is_locked=True))
+        db.commit()
+    locked = client.put(url, headers=planner_headers, json={"items": [
+        {"id": created[2], "quantity": 9}, {"id": created[1], "is_deleted": True},
+    ]})
+    assert locked.status_code == 400
+    other_project = create_project_helper(client, planner_headers)
+    foreign = client.put(f"{settings.API_V1_STR}/budgets/project/{other_project}/batch", headers=planner_headers,
+                         json={"items": [{"id": created[2], "quantity": 9}]})
+    assert foreign.status_code == 404
+    items = {i["id"]: i for i in client.get(f"{settings.API_V1_STR}/budgets/project/{project_id}", headers=planner_headers).json()}
+    assert (len(items), items[created[2]]["quantity"]) == (151, 3)
+
+    assert client.put(url, headers=planner_headers, json={"items": [{"name": "No category"}]}).status_code == 422
+    assert client.put(url, headers=get_auth_headers(client, role="PLANNER"), json={"items": []}).status_code == 403
+
+def test_budget_summary(client: TestClient):
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    manager_headers = get_auth_headers(client, role="MANAGER")
+    project_id = create_project_helper(client, planner_headers)
+    # 0.1 + 0.2 style amounts that drift when summed as floats
+    client.put(f"{settings.API_V1_STR}/budgets/project/{project_id}/batch", headers=planner_headers, json={"items": [
+        *({"category": "鲜花", "name": f"Rose {i}", "unit_price": 0.1, "cost_price": 0.07} for i in range(10)),
+        {"category": "鲜花", "name": "Lily", "quantity": 3, "unit_price": 0.2, "cost_price": 0.15},
+        {"category": "人员", "name": "Host", "unit_price": 3000, "cost_price": 2000},
+        {"category": "灯光", "name": "Free", "unit_price": 0, "cost_price": 50},
+    ]})
+    url = f"{settings.API_V1_STR}/budgets/project/{project_id}/summary"
+
+    summary = client.get(url, headers=manager_headers).json()
+    assert (summary["item_count"], summary["total_sale_price"], summary["total_cost_price"]) == (13, 3001.6, 2051.15)
+    assert (summary["gross_profit"], summary["margin_percent"]) == (950.45, 31.66)
+    categories = {c["category"]: c for c in summary["categories"]}
+    assert categories["鲜花"] == {
+        "category": "鲜花", "item_count": 11, "total_sale_price": 1.6, "total_cost_price": 1.15,
+        "gross_profit": 0.45, "margin_percent": 28.13,
+    }
+    assert (categories["灯光"]["gross_profit"], categories["灯光"]["margin_percent"]) == (-50.0, None)
+
+    summary = client.get(url, headers=planner_headers).json()
+    assert set(summary) == {"project_id", "item_count", "total_sale_price", "categories"}
+    assert summary["total_sale_price"] == 3001.6
+    assert all(set(c) == {"category", "item_count", "total_sale_price"} for c in summary["categories"])
+
+    assert client.get(url, headers=get_auth_headers(client, role="PLANNER")).status_code == 403
+
+def test_budget_list_fast_path_matches_schemas(client: TestClient):
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    manager_headers = get_auth_headers(client, role="MANAGER")
+    project_id = create_project_helper(client, planner_headers)
+    client.put(f"{settings.API_V1_STR}/budgets/project/{project_id}/batch", headers=planner_headers, json={"items": [
+        {"category": "鲜花", "name": f"Item {i}", "quantity": i % 4 + 1, "unit_price": 19.99 * i, "cost_price": 7.5 * i}
+        for i in range(25)
+    ]})
+
+    with SessionLocal() as db:
+        items = crud_budget.get_budget_items(db, UUID(project_id))
+        expected = {
+            schema: json.loads(TypeAdapter(List[schema]).dump_json([schema.model_validate(item) for item in items]))
+            for schema in (BudgetItemResponse, BudgetItemAdminResponse)
+        }
+    for headers, schema in [(planner_headers, BudgetItemResponse), (manager_headers, BudgetItemAdminResponse)]:
+        response = client.get(f"{settings.API_V1_STR}/budgets/project/{project_id}", headers=headers)
+        assert response.headers["content-type"] == "application/json"
+        by_id = lambda items: sorted((list(item.items()) for item in items), key=lambda fields: dict(fields)["id"])
+        assert by_id(response.json()) == by_id(expected[schema])
@@ -0,0 +1,94 @@
+import threading
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.crud import lead as crud_lead
+from app.database import SessionLocal
+from app.models.lead import Lead, LeadStatus
+from app.models.user import User
+from tests.utils import get_auth_headers, random_phone, random_lower_string
+
+def _seed_pool(count: int):
+    with SessionLocal() as db:
+        leads = [
+            Lead(customer_name="Pool", phone=random_phone(), status=LeadStatus.PUBLIC_POOL)
+            for _ in range(count)
+        ]
+        db.add_all(leads)
+        db.commit()
+        return {lead.id for lead in leads}
+
+def _pool_size() -> int:
+    with SessionLocal() as db:
+        return db.query(Lead).filter(Lead.status == LeadStatus.PUBLIC_POOL, Lead.owner_id.is_(None)).count()
+
+def test_concurrent_claims_never_double_assign():
+    seeded = _seed_pool(60)
+    with SessionLocal() as db:
+        planners = [User(username=random_lower_string(), password_hash="x") for _ in range(16)]
+        db.add_all(planners)
+        db.commit()
+        planner_ids = [p.id for p in planners]
+
+    claims = []  # (lead_id, planner_id)
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(planner_ids))
+
+    def planner(planner_id):
+        barrier.wait()
+        try:
+            while True:
+                with SessionLocal() as db:
+                    leads = crud_lead.claim_leads(db, owner_id=planner_id, limit=3)
+                    claimed = [(lead.id, planner_id) for lead in leads]
+                    db.commit()
+                if not claimed:
+                    return
+                with lock:
+                    claims.extend(claimed)
+        except Exception as e:  # surfaced below; a thread exception alone wouldn't fail the test
+            errors.append(e)
+
+    threads = [threading.Thread(target=planner, args=(pid,)) for pid in planner_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    counts = Counter(lead_id for lead_id, _ in claims)
+    assert [lead_id for lead_id, n in counts.items() if n > 1] == []
+    assert seeded <= set(counts)
+    assert _pool_size() == 0
+
+    with SessionLocal() as db:
+        owners = dict(db.query(Lead.id, Lead.owner_id).filter(Lead.id.in_(seeded)))
+        statuses = {s for (s,) in db.query(Lead.status).filter(Lead.id.in_(seeded))}
+    assert all(owners[lead_id] == planner_id for lead_id, planner_id in claims if lead_id in seeded)
+    assert statuses == {LeadStatus.CONTACTING}
+
+def test_claim_endpoints(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    other_headers = get_auth_headers(client, role="PLANNER")
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=headers).json()["id"]
+
+    _seed_pool(3)
+    response = client.post(f"{settings.API_V1_STR}/leads/claim", headers=headers, params={"count": 2})
+    assert response.status_code == 200
+    leads = response.json()
+    assert len(leads) == 2
+    assert {(lead["owner_id"], lead["status"]) for lead in leads} == {(me, "CONTACTING")}
+    assert all(lead["last_contact_at"] for lead in leads)
+
+    (lead_id,) = _seed_pool(1)
+    response = client.put(f"{settings.API_V1_STR}/leads/{lead_id}/claim", headers=other_headers)
+    assert response.status_code == 200
+    # Already taken
+    assert client.put(f"{settings.API_V1_STR}/leads/{lead_id}/claim", headers=headers).status_code == 409
+    assert client.put(f"{settings.API_V1_STR}/leads/{leads[0]['id']}/claim", headers=headers).status_code == 409
+
+    vendor_headers = get_auth_headers(client, role="VENDOR")
+    assert client.post(f"{settings.API_V1_STR}/leads/claim", headers=vendor_headers).status_code == 403
@@ -0,0 +1,108 @@
+import io
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.phone import normalize_phone
+from tests.utils import get_auth_headers, random_phone
+
+def _upload(client: TestClient, headers, content: bytes, filename: str = "leads.csv", **params):
+    return client.post(
+        f"{settings.API_V1_STR}/leads/import",
+        headers=headers,
+        params=params,
+        files={"file": (filename, io.BytesIO(content), "text/csv")},
+    )
+
+def test_normalize_phone():
+    assert normalize_phone("+86 138-0000-0000") == "13800000000"
+    assert normalize_phone("0086 13800000000") == "13800000000"
+    assert normalize_phone("8613800000000") == "13800000000"
+    assert normalize_phone(13800000000.0) == "13800000000"
+    assert normalize_phone("021-6888 8888") == "02168888888"
+    assert normalize_phone("not a phone") is None
+    assert normalize_phone("123") is None
+
+def test_import_csv_report(client: TestClient, monkeypatch):
+    # Small batches so in-file duplicates span batch boundaries
+    monkeypatch.setattr(settings, "LEAD_IMPORT_BATCH_SIZE", 2)
+    headers = get_auth_headers(client, role="PLANNER")
+    existing, first, second = random_phone(), random_phone(), random_phone()
+    client.post(f"{settings.API_V1_STR}/leads/", headers=headers, json={"customer_name": "老客户", "phone": existing})
+
+    csv_text = "\n".join([
+        "客户姓名,手机号,婚期,来源",
+        f"王芳,{first},2027-05-20,小红书",
+        f"李娜,+86 {second[:3]}-{second[3:7]}-{second[7:]},,",
+        ",,,",
+        f"重复,{first},,",
+        f"老客户,{existing},,",
+        "张伟,12ab,,",
+        f",{random_phone()},,",
+        f"赵敏,{random_phone()},not-a-date,",
+    ])
+    response = _upload(client, headers, csv_text.encode("utf-8-sig"))
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    job = client.get(f"{settings.API_V1_STR}/leads/import/{job_id}", headers=headers).json()
+    assert job["status"] == "DONE"
+    assert (job["processed_rows"], job["inserted"], job["duplicates"], job["failed"]) == (7, 2, 2, 3)
+    report = {e["row"]: e["error"] for e in job["errors"]}
+    assert report[5] == "duplicate phone (row 2)"
+    assert report[6] == "phone already exists"
+    assert report[7] == "invalid phone number"
+    assert report[8] == "customer_name is required"
+    assert report[9].startswith("wedding_date")
+
+    # Imported leads belong to the planner, are normalized and searchable
+    leads = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"keyword": second}).json()["list"]
+    assert [(lead["customer_name"], lead["phone"], lead["status"]) for lead in leads] == [("李娜", second, "NEW")]
+
+def test_import_gbk_csv_to_public_pool(client: TestClient):
+    headers = get_auth_headers(client, role="MANAGER")
+    phone = random_phone()
+    response = _upload(client, headers, f"姓名,电话\n陈静,{phone}\n".encode("gbk"))
+    job = client.get(f"{settings.API_V1_STR}/leads/import/{response.json()['id']}", headers=headers).json()
+    assert (job["status"], job["inserted"]) == ("DONE", 1)
+
+    leads = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"keyword": phone}).json()["list"]
+    assert [(lead["customer_name"], lead["owner_id"], lead["status"]) for lead in leads] == [("陈静", None, "PUBLIC_POOL")]
+
+def test_import_xlsx(client: TestClient):
+    openpyxl = pytest.importorskip("openpyxl")
+    headers = get_auth_headers(client, role="PLANNER")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["customer_name", "phone", "budget_min"])
+    sheet.append(["Xlsx Lead", int(random_phone()), 30000])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    response = _upload(client, headers, buffer.getvalue(), filename="leads.xlsx")
+    job = client.get(f"{settings.API_V1_STR}/leads/import/{response.json()['id']}", headers=headers).json()
+    assert (job["status"], job["inserted"], job["failed"]) == ("DONE", 1, 0)
+
+def test_import_rejected_files(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    assert _upload(client, headers, b"x", filename="leads.txt").status_code == 400
+
+    response = _upload(client, headers, b"name,email\nfoo,bar\n")
+    job = client.get(f"{settings.API_V1_STR}/leads/import/{response.json()['id']}", headers=headers).json()
+    assert job["status"] == "FAILED"
+    assert job["error"] == "Missing column(s): phone"
+
+    admin = get_auth_headers(client, role="ADMIN")
+    response = _upload(client, admin, f"name,phone\nA,{random_phone()}\n".encode(), owner_id=str(uuid.uuid4()))
+    assert (response.status_code, response.json()["detail"]) == (400, "Owner not found")
+
+def test_import_permissions(client: TestClient):
+    planner = get_auth_headers(client, role="PLANNER")
+    other = get_auth_headers(client, role="PLANNER")
+    other_id = client.get(f"{settings.API_V1_STR}/users/me", headers=other).json()["id"]
+    assert _upload(client, planner, b"name,phone\n", owner_id=other_id).status_code == 403
+
+    job_id = _upload(client, planner, f"name,phone\nA,{random_phone()}\n".encode()).json()["id"]
+    assert client.get(f"{settings.API_V1_STR}/leads/import/{job_id}", headers=other).status_code == 403
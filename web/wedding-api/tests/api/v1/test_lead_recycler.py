@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.lead_recycler import LeadRecycler
+from app.crud import lead as crud_lead
+from app.database import SessionLocal
+from app.models import lead as lead_model
+from app.models.lead import Lead, LeadStatus
+from app.models.user import User
+from app.schemas.lead import LeadCreate
+from tests.utils import get_auth_headers, random_phone, random_lower_string
+
+def _seed(days_ago, status=LeadStatus.CONTACTING, owned=True):
+    with SessionLocal() as db:
+        owner = User(username=random_lower_string(), password_hash="x")
+        db.add(owner)
+        lead = Lead(
+            customer_name="Recycle",
+            phone=random_phone(),
+            owner=owner if owned else None,
+            status=status,
+            last_contact_at=None if days_ago is None else datetime.utcnow() - timedelta(days=days_ago),
+        )
+        db.add(lead)
+        db.commit()
+        return lead.id
+
+def _state(lead_id):
+    with SessionLocal() as db:
+        lead = db.get(Lead, lead_id)
+        return lead.status, lead.owner_id is not None
+
+def test_recycle_stale_leads_in_batches():
+    stale = [_seed(20) for _ in range(5)]
+    kept = [
+        _seed(3),                                  # contacted recently
+        _seed(None),                               # never contacted, just assigned
+        _seed(30, status=LeadStatus.WON),
+        _seed(30, status=LeadStatus.LOST),
+    ]
+    recycler = LeadRecycler(stale_days=15, batch_size=2, max_per_run=4)
+
+    run = recycler.run_once()
+    assert (run.recycled, run.batches, run.capped, run.error) == (4, 2, True, None)
+    run = recycler.run_once()
+    assert (run.recycled, run.capped) == (1, False)
+    assert recycler.run_once().recycled == 0
+
+    assert {_state(lead_id) for lead_id in stale} == {(LeadStatus.PUBLIC_POOL, False)}
+    assert [_state(lead_id) for lead_id in kept] == [
+        (LeadStatus.CONTACTING, True),
+        (LeadStatus.CONTACTING, True),
+        (LeadStatus.WON, True),
+        (LeadStatus.LOST, True),
+    ]
+    metrics = recycler.metrics()
+    assert (metrics["runs"], metrics["recycled"], metrics["failures"]) == (3, 5, 0)
+
+def test_lead_recycler_endpoints(client: TestClient):
+    lead_id = _seed(40)
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    assert client.post(f"{settings.API_V1_STR}/system/lead-recycler/run", headers=planner_headers).status_code == 403
+
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    run = client.post(f"{settings.API_V1_STR}/system/lead-recycler/run", headers=admin_headers).json()
+    assert run["recycled"] >= 1
+    assert _state(lead_id) == (LeadStatus.PUBLIC_POOL, False)
+
+    metrics = client.get(f"{settings.API_V1_STR}/system/lead-recycler", headers=admin_headers).json()
+    assert metrics["last_run"]["recycled"] == run["recycled"]
+    assert metrics["stale_days"] == settings.LEAD_RECYCLE_STALE_DAYS
+
+def test_never_contacted_leads_are_recycled(client: TestClient, monkeypatch):
+    # Created / imported with an owner 20 days ago and never followed up
+    assigned_at = datetime.utcnow() - timedelta(days=20)
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return assigned_at
+    monkeypatch.setattr(lead_model, "datetime", Clock)
+    monkeypatch.setattr(crud_lead, "datetime", Clock)
+
+    headers = get_auth_headers(client, role="PLANNER")
+    response = client.post(f"{settings.API_V1_STR}/leads/", headers=headers, json={"customer_name": "Untouched", "phone": random_phone()})
+    assert response.status_code == 200
+    created_id = UUID(response.json()["id"])
+    owner_id = UUID(response.json()["owner_id"])
+    imported_phone = random_phone()
+    with SessionLocal() as db:
+        crud_lead.bulk_create_leads(db, [LeadCreate(customer_name="Untouched import", phone=imported_phone)], owner_id=owner_id)
+        db.commit()
+        imported_id = db.query(Lead.id).filter(Lead.phone == imported_phone).scalar()
+    monkeypatch.undo()
+
+    assert LeadRecycler(stale_days=15, batch_size=100, max_per_run=100_000).run_once().recycled >= 2
+    assert _state(created_id) == (LeadStatus.PUBLIC_POOL, False)
+    assert _state(imported_id) == (LeadStatus.PUBLIC_POOL, False)
+
+def test_follow_up_restarts_recycle_clock(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    owner_id = UUID(client.get(f"{settings.API_V1_STR}/users/me", headers=headers).json()["id"])
+    with SessionLocal() as db:
+        lead = Lead(customer_name="Worked", phone=random_phone(), owner_id=owner_id, status=LeadStatus.CONTACTING,
+                    last_contact_at=datetime.utcnow() - timedelta(days=20))
+        db.add(lead)
+        db.commit()
+        lead_id = lead.id
+
+    other = get_auth_headers(client, role="PLANNER")
+    url = f"{settings.API_V1_STR}/leads/{lead_id}/follow-up"
+    assert client.post(url, headers=other, json={}).status_code == 403
+    assert client.post(url, headers=headers, json={"status": "WON"}).status_code == 400
+
+    response = client.post(url, headers=headers, json={"status": "VISITED"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "VISITED"
+    assert datetime.fromisoformat(response.json()["last_contact_at"]) > datetime.utcnow() - timedelta(minutes=1)
+
+    LeadRecycler(stale_days=15, batch_size=100, max_per_run=100_000).run_once()
+    assert _state(lead_id) == (LeadStatus.VISITED, True)
@@ -1,6 +1,6 @@
 from fastapi.testclient import TestClient
 from app.config import settings
-from tests.utils import get_auth_headers, random_phone, random_lower_string
+from tests.utils import get_auth_headers, random_phone, random_lower_string, query_count, assert_query_budget
 
 def test_create_lead(client: TestClient):
     headers = get_auth_headers(client, role="PLANNER")
@@ -115,3 +115,79 @@ def test_read_leads_isolation(client: TestClient):
     resp_list_b = client.get(f"{settings.API_V1_STR}/leads/", headers=headers_b)
     phones_b = [l["phone"] for l in resp_list_b.json()]
     assert marker_phone not in phones_b
+
+def test_search_leads_by_keyword(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    tag = random_lower_string()[:6]
+    phone = random_phone()
+    created = client.post(
+        f"{settings.API_V1_STR}/leads/",
+        headers=headers,
+        json={"customer_name": f"张伟{tag}", "phone": phone},
+    ).json()
+    client.post(
+        f"{settings.API_V1_STR}/leads/",
+        headers=headers,
+        json={"customer_name": f"王芳{tag}", "phone": random_phone()},
+    )
+
+    def search(keyword):
+        response = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"keyword": keyword})
+        assert response.status_code == 200
+        return response.json()
+
+    # 2-character Chinese name (bigram side table)
+    result = search("张伟")
+    assert result["total"] == 1
+    assert result["list"][0]["id"] == created["id"]
+    # Phone substrings, short and long
+    assert created["id"] in [i["id"] for i in search(phone[3:5])["list"]]
+    assert search(phone[2:9])["total"] == 1
+    # Longer keyword, mixed case
+    assert search(tag.upper())["total"] == 2
+    # All grams present but not contiguous: no match
+    assert search("伟张")["total"] == 0
+    # Deleting a lead drops its grams
+    manager_headers = get_auth_headers(client, role="MANAGER")
+    response = client.delete(f"{settings.API_V1_STR}/leads/{created['id']}", headers=manager_headers)
+    assert response.status_code == 204
+    assert search(phone[2:9])["total"] == 0
+
+def test_read_leads_status_counts(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    lead_ids = [
+        client.post(
+            f"{settings.API_V1_STR}/leads/",
+            headers=headers,
+            json={"customer_name": f"Facet Lead {i}", "phone": random_phone()},
+        ).json()["id"]
+        for i in range(3)
+    ]
+    # Converting a lead into a project marks it WON
+    client.post(
+        f"{settings.API_V1_STR}/projects/",
+        headers=headers,
+        json={"lead_id": lead_ids[0], "name": "Facet Project", "wedding_date": "2026-05-20"},
+    )
+
+    auth_only = query_count(client.get(f"{settings.API_V1_STR}/users/me", headers=headers))
+    response = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"size": 2})
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["list"]) == 2
+    assert data["status_counts"]["NEW"] == 2
+    assert data["status_counts"]["WON"] == 1
+    assert data["estimated"] is False
+    # Page, total and facets come from a single statement on top of authentication
+    assert_query_budget(response, auth_only + 1)
+
+    data = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"status": "WON"}).json()
+    assert data["total"] == 1
+    assert [item["id"] for item in data["list"]] == [lead_ids[0]]
+    # Facet counts ignore the status filter
+    assert data["status_counts"]["NEW"] == 2
+
+    # Estimates only apply to large unfiltered PostgreSQL tables; otherwise exact
+    data = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"estimate": True}).json()
+    assert data["total"] == 3
+    assert data["estimated"] is False
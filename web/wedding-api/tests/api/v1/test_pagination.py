@@ -0,0 +1,65 @@
+from fastapi.testclient import TestClient
+from app.config import settings
+from tests.utils import get_auth_headers, random_phone
+from tests.api.v1.test_approvals import create_project_helper
+
+def test_leads_cursor_pagination(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    for i in range(5):
+        client.post(
+            f"{settings.API_V1_STR}/leads/",
+            headers=headers,
+            json={"customer_name": f"Cursor Lead {i}", "phone": random_phone()},
+        )
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"size": 2, "cursor": cursor})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 5
+        assert len(data["list"]) <= 2
+        seen.extend(item["id"] for item in data["list"])
+        cursor = data["next_cursor"]
+    assert len(seen) == len(set(seen)) == 5
+
+    # Offset mode is unchanged and returns no cursor
+    offset = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"size": 10}).json()
+    assert offset["next_cursor"] is None
+    assert sorted(item["id"] for item in offset["list"]) == sorted(seen)
+
+def test_versions_cursor_pagination(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    project_id = create_project_helper(client, headers)
+    proposal_id = client.post(
+        f"{settings.API_V1_STR}/proposals/project/{project_id}",
+        headers=headers,
+        json={"project_id": project_id, "name": "Cursor Plan"},
+    ).json()["id"]
+    for i in range(5):
+        client.post(
+            f"{settings.API_V1_STR}/proposals/{proposal_id}/versions",
+            headers=headers,
+            json={"proposal_id": proposal_id, "snapshot_data": {"v": i}},
+        )
+
+    url = f"{settings.API_V1_STR}/proposals/{proposal_id}/versions"
+    seen = []
+    params = {"limit": 2, "cursor": ""}
+    while True:
+        response = client.get(url, headers=headers, params=params)
+        assert response.status_code == 200
+        seen.extend(v["id"] for v in response.json())
+        next_cursor = response.headers.get("x-next-cursor")
+        if not next_cursor:
+            break
+        params["cursor"] = next_cursor
+    # Same order as the offset listing (newest first)
+    assert seen == [v["id"] for v in client.get(url, headers=headers).json()]
+    assert len(seen) == 5
+
+def test_invalid_cursor(client: TestClient):
+    headers = get_auth_headers(client, role="ADMIN")
+    response = client.get(f"{settings.API_V1_STR}/users/", headers=headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -53,4 +53,35 @@ def test_sync_and_rbac(client: TestClient):
     target_user = next(u for u in user_list if u["username"] == username)
     assert isinstance(target_user["permissions"], list)
     assert Permissions.LEAD_VIEW_OWN in target_user["permissions"]
-    assert Permissions.USER_MANAGE not in target_user["permissions"]
\ No newline at end of file
+    assert Permissions.USER_MANAGE not in target_user["permissions"]
+
+def test_role_permission_update_visible_immediately(client: TestClient):
+    """
+    PUT /permissions/roles/{role} bumps the generation and drops the cached matrix.
+    """
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    client.post(f"{settings.API_V1_STR}/permissions/sync", headers=admin_headers)
+    vendor_headers = get_auth_headers(client, role="VENDOR")
+
+    matrix = client.get(f"{settings.API_V1_STR}/permissions/matrix", headers=admin_headers).json()
+    original = matrix.get("VENDOR", [])
+
+    try:
+        resp = client.put(
+            f"{settings.API_V1_STR}/permissions/roles/VENDOR",
+            headers=admin_headers,
+            json=[Permissions.DASHBOARD_VIEW_PERSONAL],
+        )
+        assert resp.status_code == 200
+
+        me = client.get(f"{settings.API_V1_STR}/users/me", headers=vendor_headers).json()
+        assert me["permissions"] == [Permissions.DASHBOARD_VIEW_PERSONAL]
+    finally:
+        client.put(
+            f"{settings.API_V1_STR}/permissions/roles/VENDOR",
+            headers=admin_headers,
+            json=original,
+        )
+
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=vendor_headers).json()
+    assert sorted(me["permissions"]) == sorted(original)
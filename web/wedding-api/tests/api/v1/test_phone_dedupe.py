@@ -0,0 +1,91 @@
+import threading
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.bloom import BloomFilter, phone_bloom
+from app.database import SessionLocal
+from app.models.lead import Lead
+from tests.utils import get_auth_headers, random_phone
+
+def _create(client: TestClient, headers, phone: str):
+    return client.post(f"{settings.API_V1_STR}/leads/", headers=headers, json={"customer_name": "Dedupe", "phone": phone})
+
+@pytest.fixture
+def bloom_enabled(monkeypatch):
+    monkeypatch.setattr(phone_bloom, "enabled", True)
+    phone_bloom.reset()
+    yield phone_bloom
+    phone_bloom.reset()
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    phones = [f"139{i:08d}" for i in range(10_000)]
+    bloom.update(phones)
+    assert all(p in bloom for p in phones)
+    false_positives = sum(f"137{i:08d}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+def test_formatted_phone_is_a_duplicate(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    phone = random_phone()
+    response = _create(client, headers, f"+86 {phone[:3]}-{phone[3:7]}-{phone[7:]}")
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        assert db.get(Lead, UUID(response.json()["id"])).phone_normalized == phone
+
+    assert _create(client, headers, phone).status_code == 400
+    assert _create(client, headers, f"0086{phone}").status_code == 400
+
+def test_bloom_prefilter_keeps_duplicates_out(client: TestClient, bloom_enabled):
+    headers = get_auth_headers(client, role="PLANNER")
+    phone = random_phone()
+    assert _create(client, headers, phone).status_code == 200
+    # Added by this process: caught by the lookup
+    assert _create(client, headers, f"+86{phone}").status_code == 400
+
+    # Written behind the filter's back (another worker): the unique index still refuses it
+    other = random_phone()
+    with SessionLocal() as db:
+        phone_bloom.refresh(db)
+        assert not phone_bloom.might_exist(db, other)
+        db.add(Lead(customer_name="Other worker", phone=other))
+        db.commit()
+    assert _create(client, headers, f"{other[:3]} {other[3:7]} {other[7:]}").status_code == 400
+
+    # A rebuild picks it up
+    with SessionLocal() as db:
+        phone_bloom.refresh(db)
+        assert phone_bloom.might_exist(db, other)
+
+def test_stale_bloom_filter_rebuilt_in_background(bloom_enabled, monkeypatch):
+    with SessionLocal() as db:
+        phone_bloom.refresh(db)
+    known, added_during_build = random_phone(), random_phone()
+    phone_bloom.add([known])
+
+    started, release = threading.Event(), threading.Event()
+    build = phone_bloom.build
+    def slow_build(db):
+        started.set()
+        release.wait(5)
+        return build(db)
+    monkeypatch.setattr(phone_bloom, "build", slow_build)
+
+    monkeypatch.setattr(phone_bloom, "refresh_seconds", 0)
+    with SessionLocal() as db:
+        # Stale: the old filter keeps answering while the new one is built
+        assert phone_bloom.might_exist(db, known)
+        assert started.wait(5)
+        assert not phone_bloom.might_exist(db, added_during_build)
+        phone_bloom.add([added_during_build])
+    monkeypatch.setattr(phone_bloom, "refresh_seconds", 3600)
+    release.set()
+    phone_bloom.wait_for_refresh(5)
+
+    with SessionLocal() as db:
+        # Swapped in, with the phones recorded while it was scanning
+        assert phone_bloom.might_exist(db, added_during_build)
+        assert not phone_bloom.might_exist(db, random_phone())
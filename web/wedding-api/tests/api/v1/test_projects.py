@@ -1,6 +1,6 @@
 from fastapi.testclient import TestClient
 from app.config import settings
-from tests.utils import get_auth_headers, random_phone, random_lower_string
+from tests.utils import get_auth_headers, random_phone, random_lower_string, query_count, assert_query_budget
 
 def test_create_project(client: TestClient):
     headers = get_auth_headers(client, role="PLANNER")
@@ -94,3 +94,87 @@ def test_read_projects_isolation(client: TestClient):
     # Ensure no project with name "Project A" is in the list (assuming unique names for test simplicity, though not enforced)
     names_b = [p["name"] for p in projects_b]
     assert "Project A" not in names_b
+
+def test_project_access_guard(client: TestClient):
+    headers_a = get_auth_headers(client, role="PLANNER")
+    headers_b = get_auth_headers(client, role="PLANNER")
+    manager_headers = get_auth_headers(client, role="MANAGER")
+
+    lead_resp = client.post(
+        f"{settings.API_V1_STR}/leads/",
+        headers=headers_a,
+        json={"customer_name": "Guarded Lead", "phone": random_phone()},
+    )
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/",
+        headers=headers_a,
+        json={"lead_id": lead_resp.json()["id"], "name": "Guarded", "wedding_date": "2025-12-01"},
+    ).json()["id"]
+
+    assert client.get(f"{settings.API_V1_STR}/projects/{project_id}", headers=headers_a).status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/projects/{project_id}", headers=manager_headers).status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/projects/{project_id}", headers=headers_b).status_code == 403
+    assert client.get(
+        f"{settings.API_V1_STR}/projects/00000000-0000-0000-0000-000000000000", headers=headers_a
+    ).status_code == 404
+
+    # Owner can update; another planner cannot
+    resp = client.put(f"{settings.API_V1_STR}/projects/{project_id}", headers=headers_a, json={"hotel_name": "Grand"})
+    assert resp.status_code == 200
+    assert resp.json()["hotel_name"] == "Grand"
+    resp = client.put(f"{settings.API_V1_STR}/projects/{project_id}", headers=headers_b, json={"hotel_name": "X"})
+    assert resp.status_code == 403
+
+def test_project_overview(client: TestClient):
+    planner = get_auth_headers(client, role="PLANNER")
+    manager = get_auth_headers(client, role="MANAGER")
+    auth_only = query_count(client.get(f"{settings.API_V1_STR}/users/me", headers=planner))
+
+    lead_id = client.post(
+        f"{settings.API_V1_STR}/leads/", headers=planner,
+        json={"customer_name": "Overview Lead", "phone": random_phone()},
+    ).json()["id"]
+    project_id = client.post(
+        f"{settings.API_V1_STR}/projects/", headers=planner,
+        json={"lead_id": lead_id, "name": "Overview Project", "wedding_date": "2025-12-01"},
+    ).json()["id"]
+    for name, quantity, unit_price, cost_price in [("Flowers", 10, 100.5, 50), ("Host", 1, 3000, 2000)]:
+        client.post(f"{settings.API_V1_STR}/budgets/", headers=planner, json={
+            "project_id": project_id, "category": "Decor", "name": name,
+            "quantity": quantity, "unit_price": unit_price, "cost_price": cost_price,
+        })
+    for name in ["Plan A", "Plan B"]:
+        client.post(f"{settings.API_V1_STR}/proposals/project/{project_id}", headers=planner,
+                    json={"project_id": project_id, "name": name})
+    approval_ids = [
+        client.post(f"{settings.API_V1_STR}/approvals/", headers=planner,
+                    json={"project_id": project_id, "type": "DISCOUNT"}).json()["id"]
+        for _ in range(2)
+    ]
+    client.put(f"{settings.API_V1_STR}/approvals/{approval_ids[0]}/process", headers=manager, json={"status": "APPROVED"})
+
+    url = f"{settings.API_V1_STR}/projects/{project_id}/overview"
+    response = client.get(url, headers=planner)
+    assert response.status_code == 200
+    # Project + lead (with budget totals), proposals, pending approvals
+    assert_query_budget(response, auth_only + 3)
+    content = response.json()
+    assert (content["project"]["id"], content["lead"]["id"]) == (project_id, lead_id)
+    assert content["budget"] == {"item_count": 2, "total_sale_price": 4005.0, "total_cost_price": None, "gross_profit": None}
+    assert [p["name"] for p in content["proposals"]] == ["Plan B", "Plan A"]
+    assert "current_data" not in content["proposals"][0]
+    assert [a["id"] for a in content["pending_approvals"]] == [approval_ids[1]]
+
+    # Unchanged: 304 without a body; any change produces a new ETag
+    etag = response.headers["etag"]
+    cached = client.get(url, headers={**planner, "If-None-Match": etag})
+    assert (cached.status_code, cached.content) == (304, b"")
+    client.post(f"{settings.API_V1_STR}/proposals/project/{project_id}", headers=planner,
+                json={"project_id": project_id, "name": "Plan C"})
+    assert client.get(url, headers={**planner, "If-None-Match": etag}).status_code == 200
+
+    budget = client.get(url, headers=manager).json()["budget"]
+    assert (budget["total_cost_price"], budget["gross_profit"]) == (2500.0, 1505.0)
+
+    other = get_auth_headers(client, role="PLANNER")
+    assert client.get(url, headers=other).status_code == 403
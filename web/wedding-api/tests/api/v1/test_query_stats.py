@@ -0,0 +1,58 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.core.query_stats import QueryStatsMiddleware, capture_queries, statement_shape
+from tests.utils import get_auth_headers, query_count, assert_query_budget
+
+def test_server_timing_header(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert query_count(response) >= 1
+
+def test_read_users_query_budget(client: TestClient):
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    first = client.get(f"{settings.API_V1_STR}/users/", headers=admin_headers)
+    for _ in range(5):
+        get_auth_headers(client, role=["PLANNER", "VENDOR"])
+    second = client.get(f"{settings.API_V1_STR}/users/", headers=admin_headers)
+    assert second.status_code == 200
+    # Roles are eager-loaded: the statement count doesn't grow with the page
+    assert query_count(second) == query_count(first)
+    assert_query_budget(second, 4)
+
+def test_read_projects_query_budget(client: TestClient):
+    headers = get_auth_headers(client, role="MANAGER")
+    response = client.get(f"{settings.API_V1_STR}/projects/", headers=headers)
+    assert response.status_code == 200
+    assert_query_budget(response, 3)
+
+def test_statement_shape_folds_in_lists():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == statement_shape("SELECT * FROM t WHERE id IN (?, ?)")
+
+def test_repeated_statement_warning(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'n1.db'}")
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=2)
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        with engine.connect() as conn:
+            for i in range(3):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        response = TestClient(app).get("/n-plus-one")
+    assert query_count(response) == 3
+    assert "executed 3 times" in caplog.text
+
+    with capture_queries() as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert stats.count == 1
+    engine.dispose()
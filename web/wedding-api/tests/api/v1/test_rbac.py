@@ -1,4 +1,6 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from app.config import settings
 from app.models.user import RoleType, User
 from tests.utils import get_auth_headers, random_lower_string
@@ -59,4 +61,29 @@ def test_admin_permissions(client: TestClient):
     # Ensure admin has permissions (requires DB sync typically, but tests/utils creates admin first)
     # The get_auth_headers util creates a user, but does it set roles in DB?
     # We need to update get_auth_headers to handle roles list
-    assert "permissions" in data
\ No newline at end of file
+    assert "permissions" in data
+
+def test_current_user_resolved_in_single_query(client: TestClient):
+    """
+    Authenticated requests load user + roles with one statement; permissions
+    come from the role cache.
+    """
+    headers = get_auth_headers(client, role=["PLANNER", "MANAGER"])
+    # Warm the process-wide role -> permission cache
+    client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        resp = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+
+    assert resp.status_code == 200
+    assert len(statements) == 1
+    data = resp.json()
+    assert set(data["roles"]) == {"PLANNER", "MANAGER"}
+    assert isinstance(data["permissions"], list)
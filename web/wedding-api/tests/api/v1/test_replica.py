@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.core.replica import primary_pins
+from tests.utils import get_auth_headers, random_phone
+
+def test_reads_routed_to_replica(sqlite_client: TestClient, sqlite_replica):
+    headers = get_auth_headers(sqlite_client, role="PLANNER")
+    response = sqlite_client.post(
+        f"{settings.API_V1_STR}/leads/",
+        headers=headers,
+        json={"customer_name": "Replica Lead", "phone": random_phone()},
+    )
+    assert response.status_code == 200
+    lead_id = response.json()["id"]
+
+    # Read-your-own-write: the writer is pinned to the primary
+    response = sqlite_client.get(f"{settings.API_V1_STR}/leads/", headers=headers)
+    assert response.json()["total"] == 1
+    response = sqlite_client.get(f"{settings.API_V1_STR}/leads/{lead_id}", headers=headers)
+    assert response.status_code == 200
+
+    # Pin expired: list reads go to the (empty) replica
+    primary_pins.clear()
+    response = sqlite_client.get(f"{settings.API_V1_STR}/leads/", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+    response = sqlite_client.get(f"{settings.API_V1_STR}/leads/{lead_id}", headers=headers)
+    assert response.status_code == 404
+
+def test_reads_without_replica_use_primary(sqlite_client: TestClient):
+    headers = get_auth_headers(sqlite_client, role="PLANNER")
+    sqlite_client.post(
+        f"{settings.API_V1_STR}/leads/",
+        headers=headers,
+        json={"customer_name": "Primary Lead", "phone": random_phone()},
+    )
+    primary_pins.clear()
+    response = sqlite_client.get(f"{settings.API_V1_STR}/leads/", headers=headers)
+    assert response.json()["total"] == 1
+
+def test_claim_pins_writer_to_primary(sqlite_client: TestClient, sqlite_sessionmakers, sqlite_replica):
+    # Claims are a Core UPDATE ... RETURNING (no flush): they must still pin the claimer
+    from app.models.lead import Lead, LeadStatus
+    TestingSessionLocal, _ = sqlite_sessionmakers
+    headers = get_auth_headers(sqlite_client, role="PLANNER")
+    with TestingSessionLocal() as db:
+        lead = Lead(customer_name="Pool Lead", phone=random_phone(), status=LeadStatus.PUBLIC_POOL)
+        db.add(lead)
+        db.commit()
+        lead_id = lead.id
+
+    primary_pins.clear()
+    response = sqlite_client.put(f"{settings.API_V1_STR}/leads/{lead_id}/claim", headers=headers)
+    assert response.status_code == 200
+    assert primary_pins.is_pinned(response.json()["owner_id"])
+
+    # The claimed lead is read back from the primary, not the (empty) replica
+    response = sqlite_client.get(f"{settings.API_V1_STR}/leads/{lead_id}", headers=headers)
+    assert response.status_code == 200
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from app.config import settings
+from tests.utils import get_auth_headers
+
+def test_db_pool_metrics(client: TestClient):
+    admin_headers = get_auth_headers(client, role="ADMIN")
+    response = client.get(f"{settings.API_V1_STR}/system/db-pool", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["config"]["pool_size"] == settings.DB_POOL_SIZE
+    sync_pool = data["sync"]
+    if "checked_out" in sync_pool:
+        # The request being served holds at least one connection
+        assert sync_pool["checked_out"] >= 1
+        assert sync_pool["overflow"] >= 0
+
+def test_db_pool_metrics_admin_only(client: TestClient):
+    planner_headers = get_auth_headers(client, role="PLANNER")
+    response = client.get(f"{settings.API_V1_STR}/system/db-pool", headers=planner_headers)
+    assert response.status_code == 403
+
+def test_slow_query_log(client: TestClient, tmp_path, monkeypatch):
+    from app import database
+    log_path = tmp_path / "slow.log"
+    monkeypatch.setattr(database.slow_query_log, "threshold_ms", 0)
+    monkeypatch.setattr(database.slow_query_log, "log_path", str(log_path))
+    monkeypatch.setattr(database.slow_query_log, "_logger", None)
+    monkeypatch.setattr(database.slow_query_log, "explain_interval", 0)
+
+    headers = get_auth_headers(client, role="ADMIN")
+    response = client.get(f"{settings.API_V1_STR}/leads/?keyword=secretkeyword", headers=headers)
+    assert response.status_code == 200
+
+    for handler in database.slow_query_log._logger.handlers:
+        handler.close()
+    content = log_path.read_text(encoding="utf-8")
+    assert "leads" in content
+    assert "plan" in content
+    # Bound values are redacted
+    assert "secretkeyword" not in content
+
+    response = client.get(f"{settings.API_V1_STR}/system/slow-queries?limit=5", headers=headers)
+    assert response.status_code == 200
+    fingerprints = response.json()["fingerprints"]
+    assert 0 < len(fingerprints) <= 5
+    assert {"fingerprint", "count", "p50_ms", "p95_ms", "p99_ms"} <= set(fingerprints[0])
@@ -0,0 +1,48 @@
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import lead as crud_lead
+from app.database import SessionLocal, get_db
+from app.models.lead import Lead
+from app.schemas.lead import LeadCreate
+from tests.utils import get_auth_headers, random_phone, query_count, assert_query_budget
+
+def test_create_lead_round_trips(client: TestClient):
+    headers = get_auth_headers(client, role="PLANNER")
+    auth_only = query_count(client.get(f"{settings.API_V1_STR}/users/me", headers=headers))
+
+    phone = random_phone()
+    response = client.post(
+        f"{settings.API_V1_STR}/leads/", headers=headers, json={"customer_name": "张伟", "phone": phone}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "NEW"
+    # Duplicate-phone check, INSERT lead, INSERT search grams; no refresh SELECT after the write
+    assert_query_budget(response, auth_only + 3)
+
+    # Committed by the request's dependency
+    listed = client.get(f"{settings.API_V1_STR}/leads/", headers=headers, params={"keyword": phone}).json()
+    assert [lead["id"] for lead in listed["list"]] == [response.json()["id"]]
+
+def test_request_transaction_rolls_back_on_error():
+    app = FastAPI()
+
+    @app.post("/leads/{phone}")
+    def create(phone: str, fail: bool = False, db: Session = Depends(get_db, scope="function")):
+        lead = crud_lead.create_lead(db, LeadCreate(customer_name="Unit of work", phone=phone))
+        # Generated values are available right after the flush
+        assert lead.id is not None and lead.status is not None
+        if fail:
+            raise HTTPException(status_code=409, detail="conflict")
+        return {"id": str(lead.id)}
+
+    client = TestClient(app)
+    kept, discarded = random_phone(), random_phone()
+    assert client.post(f"/leads/{kept}").status_code == 200
+    assert client.post(f"/leads/{discarded}", params={"fail": True}).status_code == 409
+
+    with SessionLocal() as db:
+        phones = {p for (p,) in db.query(Lead.phone).filter(Lead.phone.in_([kept, discarded]))}
+    assert phones == {kept}
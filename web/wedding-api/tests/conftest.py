@@ -5,7 +5,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.database import Base, get_db, get_async_db
+from app.core.permissions import sync_permissions, role_permission_cache
 from app.main import app
 # Import all models to ensure they are registered with Base
 from app.models import * 
@@ -32,3 +35,70 @@ def client() -> Generator:
 
 # Let's try to override get_db to use a transaction that rolls back.
 # However, `TestClient` runs in the same thread/process usually, so it's possible.
+
+
+# Local configuration for the AsyncSession path: one throwaway SQLite file, opened
+# through pysqlite for sync sessions and aiosqlite for async sessions. Needs no
+# Postgres, so `async def` endpoints and app.crud.aio can be exercised anywhere.
+
+@pytest.fixture(scope="module")
+def sqlite_sessionmakers(tmp_path_factory):
+    path = tmp_path_factory.mktemp("db") / "wedding.db"
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    with TestingSessionLocal() as db:
+        sync_permissions(db)
+
+    yield TestingSessionLocal, TestingAsyncSessionLocal
+
+    async_engine.sync_engine.dispose()
+    sync_engine.dispose()
+
+@pytest.fixture(scope="module")
+def sqlite_client(sqlite_sessionmakers) -> Generator:
+    TestingSessionLocal, TestingAsyncSessionLocal = sqlite_sessionmakers
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+            await db.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # The role -> permission cache is process-wide; don't reuse another DB's matrix
+    role_permission_cache.invalidate()
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_async_db, None)
+    role_permission_cache.invalidate()
+
+@pytest.fixture
+def sqlite_replica(tmp_path, monkeypatch):
+    """
+    A second, empty SQLite database installed as the read replica.
+    Rows only reach it if the test copies them, so reads served from it are observable.
+    """
+    from app import database
+    from app.core.replica import primary_pins
+
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(replica_engine)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", ReplicaSessionLocal)
+    primary_pins.clear()
+    yield ReplicaSessionLocal
+    primary_pins.clear()
+    replica_engine.dispose()
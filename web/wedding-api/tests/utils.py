@@ -1,4 +1,5 @@
 import random
+import re
 import string
 from typing import Dict, List, Union
 from fastapi.testclient import TestClient
@@ -41,4 +42,18 @@ def get_auth_headers(client: TestClient, username: str = None, role: Union[str,
         
     data = response.json()
     token = data["access_token"]
-    return {"Authorization": f"Bearer {token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {token}"}
+
+def query_count(response) -> int:
+    """
+    Number of SQL statements the request issued, from the Server-Timing header
+    written by app.core.query_stats.QueryStatsMiddleware.
+    """
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    if not match:
+        raise AssertionError("Response has no db Server-Timing entry")
+    return int(match.group(1))
+
+def assert_query_budget(response, max_queries: int) -> None:
+    count = query_count(response)
+    assert count <= max_queries, f"{response.request.method} {response.request.url.path} issued {count} queries (budget {max_queries})"